@@ -0,0 +1,471 @@
+"""
+In-process S3 stand-in for benchmarks.
+
+FakeS3 answers a real boto3 client's requests from memory by hooking
+botocore's before-send event, so everything above the HTTP layer (request
+serialization, response parsing, retries, the needs-retry/after-call hooks
+used by AdaptiveLimiter and Metrics) runs exactly as against S3. Objects
+keep only size/ETag/LastModified; GETs return zero bytes of the right
+length. Seeded key sets are virtual (key i is computed, not stored), so
+listing benchmarks can use millions of keys without holding them.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import hashlib
+import io
+import random
+import threading
+import time
+import uuid
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from s3_utils.concurrency import TokenBucket
+from s3_utils.core import pool_size_for
+
+ENDPOINT = "http://s3.benchmark.invalid"
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_HTTP_DATE = "%a, %d %b %Y %H:%M:%S GMT"
+_MAX_CHAR = "\U0010ffff"
+
+
+def size_for(i: int, min_size: int, max_size: int, skew: float) -> int:
+    """
+    Deterministic skewed size of seeded key i: u in [0, 1) from a hash of i,
+    then min_size * (max_size / min_size) ** (u ** skew). skew 1 spreads
+    sizes log-uniformly; larger values make most objects small and a few
+    large, as in typical buckets.
+    """
+    if max_size <= min_size:
+        return min_size
+    u = ((i * 2654435761) & 0xFFFFFFFF) / 2 ** 32
+    return int(min_size * (max_size / min_size) ** (u ** skew))
+
+
+class SeededKeys:
+    """Virtual sorted key sequence prefix + zero-padded i for i in range(n); bisect works on it."""
+
+    def __init__(self, n: int, prefix: str = "", suffix: str = "", min_size: int = 1024,
+                 max_size: int = 1024 * 1024, skew: float = 3.0):
+        self.n = n
+        self.prefix = prefix
+        self.suffix = suffix
+        self.width = max(len(str(max(n - 1, 0))), 1)
+        self.min_size, self.max_size, self.skew = min_size, max_size, skew
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return f"{self.prefix}{i:0{self.width}d}{self.suffix}"
+
+    def index(self, key: str) -> Optional[int]:
+        digits = key[len(self.prefix):len(key) - len(self.suffix)] if self.suffix else key[len(self.prefix):]
+        if not key.startswith(self.prefix) or not key.endswith(self.suffix) or len(digits) != self.width:
+            return None
+        if not digits.isdigit() or int(digits) >= self.n:
+            return None
+        return int(digits)
+
+    def meta(self, i: int) -> Tuple[int, str, datetime]:
+        return size_for(i, self.min_size, self.max_size, self.skew), f'"{i:032x}"', _EPOCH
+
+
+class _Bucket:
+    def __init__(self):
+        self.seeded: Optional[SeededKeys] = None
+        self.removed: set = set()  # deleted seeded keys
+        self.objects: Dict[str, Tuple[int, str, datetime]] = {}
+        self.keys: List[str] = []  # sorted keys of self.objects
+
+    def get(self, key: str) -> Optional[Tuple[int, str, datetime]]:
+        meta = self.objects.get(key)
+        if meta is not None:
+            return meta
+        if self.seeded is not None and key not in self.removed:
+            i = self.seeded.index(key)
+            if i is not None:
+                return self.seeded.meta(i)
+        return None
+
+    def put(self, key: str, meta: Tuple[int, str, datetime]) -> None:
+        if key not in self.objects:
+            insort(self.keys, key)
+        self.objects[key] = meta
+        self.removed.discard(key)
+
+    def delete(self, key: str) -> None:
+        if self.objects.pop(key, None) is not None:
+            del self.keys[bisect_left(self.keys, key)]
+        if self.seeded is not None and self.seeded.index(key) is not None:
+            self.removed.add(key)
+
+    def iter_from(self, start: str) -> Iterator[str]:
+        """Keys >= start in order: seeded and written keys merged, deleted ones skipped."""
+        seeded = self.seeded if self.seeded is not None else []
+        i, j = bisect_left(seeded, start), bisect_left(self.keys, start)
+        while True:
+            a = seeded[i] if i < len(seeded) else None
+            b = self.keys[j] if j < len(self.keys) else None
+            if a is None and b is None:
+                return
+            if b is None or (a is not None and a < b):
+                i += 1
+                if a not in self.removed:
+                    yield a
+            else:
+                j += 1
+                if a == b:
+                    i += 1
+                yield b
+
+
+class _ZeroStream:
+    """Raw response body of n zero bytes for botocore's StreamingBody."""
+
+    def __init__(self, n: int):
+        self.left = n
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        n = self.left if amt is None else min(amt, self.left)
+        self.left -= n
+        return bytes(n)
+
+    def stream(self, **kwargs) -> Iterator[bytes]:
+        while self.left:
+            yield self.read(1024 * 1024)
+
+    def close(self) -> None:
+        self.left = 0
+
+
+class _BytesRaw:
+    def __init__(self, data: bytes):
+        self._f = io.BytesIO(data)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._f.read(amt)
+
+    def stream(self, **kwargs) -> Iterator[bytes]:
+        yield self._f.read()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _body_bytes(body: Any) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode()
+    return body.read()
+
+
+def _xml(root: str, inner: str, ns: bool = True) -> bytes:
+    attr = ' xmlns="http://s3.amazonaws.com/doc/2006-03-01/"' if ns else ""
+    return f'<?xml version="1.0" encoding="UTF-8"?><{root}{attr}>{inner}</{root}>'.encode()
+
+
+def _etag(data: str) -> str:
+    return f'"{hashlib.md5(data.encode()).hexdigest()}"'
+
+
+class FakeS3:
+    """
+    In-memory S3 for benchmarks. latency (+ up to jitter) seconds are slept
+    per request attempt; throttle is the chance of answering 503 SlowDown and
+    max_rps caps accepted requests per second (the rest get SlowDown), so
+    retries and adaptive concurrency are exercised. Listings return at most
+    page_size keys per page (S3: 1000). requests counts accepted and
+    throttled attempts per operation.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, throttle: float = 0.0,
+                 max_rps: Optional[float] = None, seed: int = 0, page_size: int = 1000):
+        self.latency = latency
+        self.page_size = page_size
+        self.jitter = jitter
+        self.throttle = throttle
+        self.buckets: Dict[str, _Bucket] = {}
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self._uploads: Dict[str, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._rate = TokenBucket(max_rps) if max_rps else None
+
+    # ---- setup ----
+    def bucket(self, name: str) -> _Bucket:
+        with self._lock:
+            return self.buckets.setdefault(name, _Bucket())
+
+    def seed(self, bucket: str, n: int, prefix: str = "", suffix: str = "", min_size: int = 1024,
+             max_size: int = 1024 * 1024, skew: float = 3.0) -> SeededKeys:
+        """Give bucket n virtual keys prefix + zero-padded index (+ suffix) with skewed sizes."""
+        keys = SeededKeys(n, prefix, suffix, min_size, max_size, skew)
+        b = self.bucket(bucket)
+        b.seeded, b.removed = keys, set()
+        return keys
+
+    def client(self, max_workers: int = 8, transfer_config=None, retries_max_attempts: int = 8):
+        """boto3 client wired to this fake, configured like core.get_s3_client."""
+        options: Dict[str, Any] = dict(
+            retries={"max_attempts": retries_max_attempts, "mode": "standard"},
+            max_pool_connections=pool_size_for(max_workers, transfer_config, extra=8),
+            s3={"addressing_style": "path"},
+        )
+        try:  # botocore >= 1.36 adds checksums to uploads unless told otherwise
+            cfg = Config(**options, request_checksum_calculation="when_required",
+                         response_checksum_validation="when_required")
+        except TypeError:
+            cfg = Config(**options)
+        s3 = boto3.session.Session().client(
+            "s3", region_name="us-east-1", endpoint_url=ENDPOINT, config=cfg,
+            aws_access_key_id="benchmark", aws_secret_access_key="benchmark",
+        )
+        s3.meta.events.register("before-send.s3", self._handle)
+        return s3
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled.clear()
+
+    # ---- request handling ----
+    def _handle(self, request, **kwargs) -> AWSResponse:
+        url = urlsplit(request.url)
+        path = url.path.lstrip("/")
+        bucket, _, key = path.partition("/")
+        bucket, key = unquote(bucket), unquote(key)
+        query = parse_qs(url.query, keep_blank_values=True)
+        headers = {k.lower(): v.decode() if isinstance(v, bytes) else v for k, v in request.headers.items()}
+        op = self._operation(request.method, key, query, headers)
+
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            limited = self._rate is not None and not self._rate.try_take()
+            if limited or (self.throttle and self._rng.random() < self.throttle):
+                self.throttled[op] += 1
+                return self._error(request, 503, "SlowDown", "Please reduce your request rate.")
+            self.requests[op] += 1
+        b = self.buckets.get(bucket)
+        if b is None and op != "CreateBucket":
+            return self._error(request, 404, "NoSuchBucket", "The specified bucket does not exist")
+        return getattr(self, f"_{op}")(request, b, bucket, key, query, headers)
+
+    @staticmethod
+    def _operation(method: str, key: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> str:
+        if not key:
+            if method == "GET" and "list-type" in query:
+                return "ListObjectsV2"
+            if method == "POST" and "delete" in query:
+                return "DeleteObjects"
+            return {"PUT": "CreateBucket", "HEAD": "HeadBucket"}.get(method, "Unsupported")
+        if method == "PUT":
+            if "x-amz-copy-source" in headers:
+                return "UploadPartCopy" if "partNumber" in query else "CopyObject"
+            return "UploadPart" if "partNumber" in query else "PutObject"
+        if method == "POST":
+            return "CreateMultipartUpload" if "uploads" in query else "CompleteMultipartUpload"
+        if method == "DELETE":
+            return "AbortMultipartUpload" if "uploadId" in query else "DeleteObject"
+        return {"GET": "GetObject", "HEAD": "HeadObject"}.get(method, "Unsupported")
+
+    @staticmethod
+    def _response(request, status: int = 200, headers: Optional[Dict[str, str]] = None,
+                  body: bytes = b"") -> AWSResponse:
+        headers = {"Content-Length": str(len(body)), **(headers or {})}
+        return AWSResponse(request.url, status, headers, _BytesRaw(body))
+
+    def _error(self, request, status: int, code: str, message: str) -> AWSResponse:
+        return self._response(request, status, body=_xml("Error", f"<Code>{code}</Code><Message>{message}</Message>", ns=False))
+
+    def _Unsupported(self, request, *args) -> AWSResponse:
+        return self._error(request, 501, "NotImplemented", "Not supported by the benchmark fake")
+
+    def _CreateBucket(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        self.bucket(bucket)
+        return self._response(request)
+
+    def _HeadBucket(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        return self._response(request)
+
+    def _ListObjectsV2(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        q = {k: v[0] for k, v in query.items()}
+        prefix = q.get("prefix", "")
+        delimiter = q.get("delimiter", "")
+        max_keys = min(int(q.get("max-keys", 1000)), self.page_size)
+        after = q.get("continuation-token") or q.get("start-after", "")
+        contents: List[str] = []
+        prefixes: List[str] = []
+        last = None
+        truncated = False
+        with self._lock:
+            it = b.iter_from(max(prefix, after))
+            while True:
+                k = next(it, None)
+                if k is None or not k.startswith(prefix):
+                    break
+                if k == after:
+                    continue
+                if len(contents) + len(prefixes) >= max_keys:
+                    truncated = True
+                    break
+                cut = k.find(delimiter, len(prefix)) if delimiter else -1
+                if cut >= 0:
+                    # roll the rest of this "folder" into one CommonPrefixes entry
+                    cp = k[:cut + len(delimiter)]
+                    prefixes.append(cp)
+                    last = cp + _MAX_CHAR
+                    it = b.iter_from(last)
+                    continue
+                size, etag, lm = b.get(k)
+                contents.append(
+                    f"<Contents><Key>{escape(k)}</Key><LastModified>{lm.strftime('%Y-%m-%dT%H:%M:%S.000Z')}"
+                    f"</LastModified><ETag>{escape(etag)}</ETag><Size>{size}</Size>"
+                    f"<StorageClass>STANDARD</StorageClass></Contents>"
+                )
+                last = k
+        inner = (
+            f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix><MaxKeys>{max_keys}</MaxKeys>"
+            f"<KeyCount>{len(contents) + len(prefixes)}</KeyCount><IsTruncated>{str(truncated).lower()}</IsTruncated>"
+            + "".join(contents)
+            + "".join(f"<CommonPrefixes><Prefix>{escape(p)}</Prefix></CommonPrefixes>" for p in prefixes)
+            + (f"<NextContinuationToken>{escape(last)}</NextContinuationToken>" if truncated else "")
+        )
+        return self._response(request, body=_xml("ListBucketResult", inner))
+
+    def _object_headers(self, size: int, etag: str, lm: datetime) -> Dict[str, str]:
+        return {"ETag": etag, "Last-Modified": lm.strftime(_HTTP_DATE), "Content-Length": str(size)}
+
+    def _HeadObject(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        with self._lock:
+            meta = b.get(key)
+        if meta is None:
+            return self._response(request, 404)
+        return AWSResponse(request.url, 200, self._object_headers(*meta), _BytesRaw(b""))
+
+    def _GetObject(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        with self._lock:
+            meta = b.get(key)
+        if meta is None:
+            return self._error(request, 404, "NoSuchKey", "The specified key does not exist.")
+        size, etag, lm = meta
+        h = self._object_headers(size, etag, lm)
+        rng = headers.get("range")
+        if rng and rng.startswith("bytes="):
+            first, _, end = rng[6:].partition("-")
+            start, stop = int(first), min(int(end) if end else size - 1, size - 1)
+            h.update({"Content-Length": str(stop - start + 1), "Content-Range": f"bytes {start}-{stop}/{size}"})
+            return AWSResponse(request.url, 206, h, _ZeroStream(stop - start + 1))
+        return AWSResponse(request.url, 200, h, _ZeroStream(size))
+
+    def _PutObject(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        size = len(_body_bytes(request.body))
+        etag = _etag(f"{bucket}/{key}/{size}")
+        with self._lock:
+            b.put(key, (size, etag, datetime.now(timezone.utc)))
+        return self._response(request, headers={"ETag": etag})
+
+    def _source(self, headers: Dict[str, str]) -> Optional[Tuple[int, str, datetime]]:
+        src = unquote(headers["x-amz-copy-source"]).lstrip("/").split("?versionId=")[0]
+        sb, _, sk = src.partition("/")
+        with self._lock:
+            b = self.buckets.get(sb)
+            return b.get(sk) if b is not None else None
+
+    def _CopyObject(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        meta = self._source(headers)
+        if meta is None:
+            return self._error(request, 404, "NoSuchKey", "The specified key does not exist.")
+        size, etag, _ = meta
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            b.put(key, (size, etag, now))
+        inner = f"<LastModified>{now.strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified><ETag>{escape(etag)}</ETag>"
+        return self._response(request, body=_xml("CopyObjectResult", inner))
+
+    def _CreateMultipartUpload(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {}
+        inner = f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>"
+        return self._response(request, body=_xml("InitiateMultipartUploadResult", inner))
+
+    def _part(self, request, query, size: int) -> Optional[str]:
+        upload_id, number = query["uploadId"][0], int(query["partNumber"][0])
+        with self._lock:
+            parts = self._uploads.get(upload_id)
+            if parts is None:
+                return None
+            parts[number] = size
+        return _etag(f"{upload_id}/{number}/{size}")
+
+    def _UploadPart(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        etag = self._part(request, query, len(_body_bytes(request.body)))
+        if etag is None:
+            return self._error(request, 404, "NoSuchUpload", "The specified upload does not exist.")
+        return self._response(request, headers={"ETag": etag})
+
+    def _UploadPartCopy(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        meta = self._source(headers)
+        if meta is None:
+            return self._error(request, 404, "NoSuchKey", "The specified key does not exist.")
+        rng = headers.get("x-amz-copy-source-range", "")
+        if rng.startswith("bytes="):
+            first, _, end = rng[6:].partition("-")
+            size = int(end) - int(first) + 1
+        else:
+            size = meta[0]
+        etag = self._part(request, query, size)
+        if etag is None:
+            return self._error(request, 404, "NoSuchUpload", "The specified upload does not exist.")
+        inner = f"<LastModified>{_EPOCH.strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified><ETag>{escape(etag)}</ETag>"
+        return self._response(request, body=_xml("CopyPartResult", inner))
+
+    def _CompleteMultipartUpload(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        _body_bytes(request.body)
+        upload_id = query["uploadId"][0]
+        with self._lock:
+            parts = self._uploads.pop(upload_id, None)
+            if parts is not None:
+                etag = f'"{hashlib.md5(upload_id.encode()).hexdigest()}-{len(parts)}"'
+                b.put(key, (sum(parts.values()), etag, datetime.now(timezone.utc)))
+        if parts is None:
+            return self._error(request, 404, "NoSuchUpload", "The specified upload does not exist.")
+        inner = f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><ETag>{escape(etag)}</ETag>"
+        return self._response(request, body=_xml("CompleteMultipartUploadResult", inner))
+
+    def _AbortMultipartUpload(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        with self._lock:
+            self._uploads.pop(query["uploadId"][0], None)
+        return self._response(request, 204)
+
+    def _DeleteObject(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        with self._lock:
+            b.delete(key)
+        return self._response(request, 204)
+
+    def _DeleteObjects(self, request, b, bucket, key, query, headers) -> AWSResponse:
+        root = ElementTree.fromstring(_body_bytes(request.body))
+        keys = [el.text or "" for el in root.iter() if el.tag.endswith("Key")]
+        quiet = any(el.tag.endswith("Quiet") and (el.text or "").lower() == "true" for el in root.iter())
+        with self._lock:
+            for k in keys:
+                b.delete(k)
+        inner = "" if quiet else "".join(f"<Deleted><Key>{escape(k)}</Key></Deleted>" for k in keys)
+        return self._response(request, body=_xml("DeleteResult", inner))
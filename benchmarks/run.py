@@ -0,0 +1,303 @@
+"""
+Offline benchmarks of the s3_utils entry points against benchmarks.fake_s3.
+
+    python -m benchmarks.run --keys 1000,100000 --bench list,copy --out results.json
+    python -m benchmarks.run --keys 10000 --latency 0.02 --throttle 0.01 --adaptive
+    python -m benchmarks.run --keys 10000 --compare base.json
+
+Every case gets a fresh fake with a seeded source bucket and reports wall
+time, objects/s and bytes/s, the Python heap peak (tracemalloc) and the S3
+requests the fake answered, per operation. Results are JSON (with the git
+commit they were measured at), so two runs can be compared with --compare.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import botocore
+
+from s3_utils.copy import copy_by_mask
+from s3_utils.core import list_objects
+from s3_utils.delete import delete_by_mask
+from s3_utils.download import download_by_mask
+from s3_utils.metrics import Metrics
+from s3_utils.move import move_by_mask
+from s3_utils.sync import sync_prefix
+from s3_utils.transfer import MB, make_transfer_config
+from s3_utils.upload import upload_by_mask
+
+from .fake_s3 import FakeS3, size_for
+
+BENCHES = ("list", "copy", "sync", "download", "upload", "move", "rm")
+SRC, DST, PREFIX = "bench-src", "bench-dst", "data/"
+
+
+# Each benchmark runs one job on the seeded fake and returns its result;
+# jobs count their objects/bytes into the Metrics they are given.
+def _bench_list(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    with metrics.watch(s3):
+        n = sum(1 for _ in list_objects(s3, SRC, PREFIX, shards=args.list_shards))
+        metrics.count(n)
+    return {}
+
+
+def _bench_copy(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return copy_by_mask(
+        s3, SRC, DST, PREFIX, prefix_dst=PREFIX, max_workers=args.max_workers, list_shards=args.list_shards,
+        transfer_config=args.transfer_config, adaptive=args.adaptive, metrics=metrics,
+    )
+
+
+def _seed_sync_dst(fake: FakeS3, args) -> None:
+    # Destination starts as a copy of the source with every 10th key changed
+    # and every 10th (offset 5) missing, so the diff has work of each kind.
+    seeded = fake.seed(DST, args.n, PREFIX, min_size=args.min_size, max_size=args.max_size, skew=args.skew)
+    dst = fake.bucket(DST)
+    for i in range(0, args.n, 10):
+        size, etag, lm = seeded.meta(i)
+        dst.put(seeded[i], (size + 1, etag, lm))
+    for i in range(5, args.n, 10):
+        dst.delete(seeded[i])
+
+
+def _bench_sync(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return sync_prefix(
+        s3, SRC, DST, PREFIX, PREFIX, compare_mode="size", max_workers=args.max_workers,
+        list_shards=args.list_shards, transfer_config=args.transfer_config, adaptive=args.adaptive,
+        metrics=metrics,
+    )
+
+
+def _bench_download(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return download_by_mask(
+        s3, SRC, PREFIX, dst_root=workdir, max_workers=args.max_workers, list_shards=args.list_shards,
+        transfer_config=args.transfer_config, adaptive=args.adaptive, metrics=metrics,
+    )
+
+
+def _local_files(root: Path, args) -> None:
+    # Sparse files with the seeded size distribution
+    for i in range(args.n):
+        p = root / f"{i:0{len(str(max(args.n - 1, 0)))}d}"
+        with open(p, "wb") as f:
+            f.truncate(size_for(i, args.min_size, args.max_size, args.skew))
+
+
+def _bench_upload(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return upload_by_mask(
+        s3, workdir, DST, PREFIX, max_workers=args.max_workers, transfer_config=args.transfer_config,
+        adaptive=args.adaptive, metrics=metrics,
+    )
+
+
+def _bench_move(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return move_by_mask(
+        s3, SRC, DST, PREFIX, prefix_dst=PREFIX, max_workers=args.max_workers, list_shards=args.list_shards,
+        transfer_config=args.transfer_config, adaptive=args.adaptive, metrics=metrics,
+    )
+
+
+def _bench_rm(fake: FakeS3, s3, args, metrics: Metrics, workdir: Path) -> Dict[str, Any]:
+    return delete_by_mask(
+        s3, SRC, PREFIX, max_workers=args.max_workers, list_shards=args.list_shards, adaptive=args.adaptive,
+        metrics=metrics,
+    )
+
+
+_RUNNERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "list": _bench_list,
+    "copy": _bench_copy,
+    "sync": _bench_sync,
+    "download": _bench_download,
+    "upload": _bench_upload,
+    "move": _bench_move,
+    "rm": _bench_rm,
+}
+
+
+def run_case(bench: str, n: int, args) -> Dict[str, Any]:
+    """Run one benchmark on n seeded keys and return its result record."""
+    args.n = n
+    fake = FakeS3(latency=args.latency, jitter=args.jitter, throttle=args.throttle, max_rps=args.max_rps)
+    fake.seed(SRC, n, PREFIX, min_size=args.min_size, max_size=args.max_size, skew=args.skew)
+    fake.bucket(DST)
+    s3 = fake.client(max_workers=args.max_workers, transfer_config=args.transfer_config)
+    workdir = Path(tempfile.mkdtemp(prefix=f"s3flow-bench-{bench}-"))
+    try:
+        if bench == "sync":
+            _seed_sync_dst(fake, args)
+        elif bench == "upload":
+            _local_files(workdir, args)
+        metrics = Metrics()
+        if args.memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        try:
+            res = _RUNNERS[bench](fake, s3, args, metrics, workdir)
+            seconds = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] if args.memory else None
+        finally:
+            if args.memory:
+                tracemalloc.stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = metrics.report()
+    return {
+        "bench": bench,
+        "keys": n,
+        "seconds": round(seconds, 3),
+        "objects": report["objects"],
+        "bytes": report["bytes"],
+        "objects_per_sec": round(report["objects"] / seconds, 2) if seconds else None,
+        "bytes_per_sec": round(report["bytes"] / seconds, 2) if seconds else None,
+        "peak_memory_bytes": peak,
+        "requests": sum(fake.requests.values()),
+        "throttled": sum(fake.throttled.values()),
+        "retries": report["retries"],
+        "errors": sum(len(res.get(k) or []) for k in ("errors", "errors_copy", "errors_delete")),
+        "requests_by_op": dict(sorted(fake.requests.items())),
+        "latency_mean": {op: a["latency"]["mean"] for op, a in report["apis"].items()},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _fmt_bytes(n: Optional[float]) -> str:
+    if n is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TiB"
+
+
+def _summary(r: Dict[str, Any]) -> str:
+    return (
+        f"{r['bench']:<9}{r['keys']:>10} keys  {r['seconds']:>8.2f}s  {r['objects_per_sec'] or 0:>10.0f} obj/s  "
+        f"{_fmt_bytes(r['bytes_per_sec']):>9}/s  peak {_fmt_bytes(r['peak_memory_bytes']):>9}  "
+        f"{r['requests']:>8} req  {r['throttled']} throttled  {r['errors']} errors"
+    )
+
+
+def compare(base: Dict[str, Any], results: List[Dict[str, Any]]) -> List[str]:
+    """Per (bench, keys) change in objects/s, peak memory and requests against a base run."""
+    before = {(r["bench"], r["keys"]): r for r in base.get("results", [])}
+    lines: List[str] = []
+
+    def _delta(new: Optional[float], old: Optional[float]) -> str:
+        if not new or not old:
+            return "    n/a"
+        return f"{(new - old) / old * 100:+6.1f}%"
+
+    for r in results:
+        b = before.get((r["bench"], r["keys"]))
+        if b is None:
+            continue
+        lines.append(
+            f"{r['bench']:<9}{r['keys']:>10} keys  obj/s {_delta(r['objects_per_sec'], b['objects_per_sec'])}  "
+            f"peak {_delta(r['peak_memory_bytes'], b['peak_memory_bytes'])}  "
+            f"requests {_delta(r['requests'], b['requests'])}"
+        )
+    return lines
+
+
+def _csv(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _parse_args(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0].strip())
+    p.add_argument("--keys", default="1000,10000", help="Comma-separated key counts (1k..10M)")
+    p.add_argument("--bench", default=",".join(BENCHES), help=f"Comma-separated benchmarks: {','.join(BENCHES)}")
+    p.add_argument("--min-size", type=int, default=1024, help="Smallest seeded object size in bytes")
+    p.add_argument("--max-size", type=int, default=1024 * 1024, help="Largest seeded object size in bytes")
+    p.add_argument("--skew", type=float, default=3.0, help="Size skew: 1 log-uniform, higher = mostly small objects")
+    p.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    p.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds per request, random")
+    p.add_argument("--throttle", type=float, default=0.0, help="Chance of answering a request with 503 SlowDown")
+    p.add_argument("--max-rps", type=float, default=None, help="Requests/s the fake accepts; the rest get SlowDown")
+    p.add_argument("--max-workers", type=int, default=16)
+    p.add_argument("--list-shards", type=int, default=1)
+    p.add_argument("--multipart-threshold", type=int, default=8 * MB,
+                   help="Bytes; downloads/uploads only (copies stay one CopyObject up to 5 GB)")
+    p.add_argument("--multipart-chunksize", type=int, default=8 * MB, help="Bytes; downloads/uploads only")
+    p.add_argument("--adaptive", action="store_true", help="Run jobs with adaptive concurrency")
+    p.add_argument("--no-memory", dest="memory", action="store_false",
+                   help="Skip tracemalloc (it slows Python-heavy paths noticeably)")
+    p.add_argument("--out", default=None, help="Write JSON results here (default: stdout)")
+    p.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = p.parse_args(argv)
+
+    unknown = set(_csv(args.bench)) - set(BENCHES)
+    if unknown:
+        p.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    args.benches = _csv(args.bench)
+    args.key_counts = [int(float(k)) for k in _csv(args.keys)]
+    args.transfer_config = make_transfer_config(
+        multipart_threshold=args.multipart_threshold,
+        multipart_chunksize=args.multipart_chunksize,
+        max_concurrency=args.max_workers,
+    )
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    results: List[Dict[str, Any]] = []
+    for n in args.key_counts:
+        for bench in args.benches:
+            r = run_case(bench, n, args)
+            results.append(r)
+            print(_summary(r), file=sys.stderr)
+
+    doc = {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "botocore": botocore.__version__,
+        "cpus": os.cpu_count(),
+        "params": {
+            k: getattr(args, k) for k in (
+                "min_size", "max_size", "skew", "latency", "jitter", "throttle", "max_rps", "max_workers",
+                "list_shards", "multipart_threshold", "multipart_chunksize", "adaptive", "memory",
+            )
+        },
+        "results": results,
+    }
+    text = json.dumps(doc, indent=2) + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"vs {args.compare} (commit {base.get('commit') or '?'}):", file=sys.stderr)
+        for line in compare(base, results):
+            print("  " + line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
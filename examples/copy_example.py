@@ -8,8 +8,11 @@ if __name__ == "__main__":
     cfg = read_yaml(CONFIG_PATH)
     s3 = get_s3_client(aws_profile=cfg["aws"]["profile"], region_name=cfg["aws"]["region"])
     ex = cfg["examples"]["copy"]
-    keys = copy_by_mask(
+    res = copy_by_mask(
         s3, ex["source_bucket"], ex["target_bucket"],
-        prefix=ex["prefix"], suffix=ex["suffix"], prefix_dst=ex["prefix_dst"]
+        prefix=ex["prefix"], suffix=ex["suffix"], prefix_dst=ex["prefix_dst"],
+        max_workers=ex.get("max_workers", 8), progress=True
     )
-    print(f"Copied {len(keys)} objects.")
+    print(f"Copied {len(res['copied'])} objects, errors: {len(res['errors'])}.")
+    for e in res["errors"]:
+        print(f"[COPY ERROR] {e}")
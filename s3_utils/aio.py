@@ -0,0 +1,682 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import os
+
+from tqdm import tqdm
+
+from .core import ObjectRecord
+from .delete import DEFAULT_DELETE_WORKERS, OnBatch
+from .download import SkipMode, write_manifest
+from .errors import ErrorRecord
+from .sync import COMPARE_MODES, Decision, join_step, plan_decision
+from .transfer import (
+    COPY_OBJECT_MAX_SIZE,
+    DEFAULT_COPY_PART_SIZE,
+    multipart_copy_args,
+    part_size_for,
+    partial_path,
+)
+from .utils import compile_patterns, ensure_dir, prefixes_overlap, set_mtime
+
+# Optional backend: everything here needs aiobotocore (pip install aiobotocore).
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import AioSession
+except ImportError:  # pragma: no cover - optional dependency
+    AioConfig = None
+    AioSession = None
+
+DEFAULT_CONCURRENCY = 256
+_READ_CHUNK = 1024 * 1024
+_PART_CONCURRENCY = 16
+
+
+def _require_aiobotocore() -> None:
+    if AioSession is None:
+        raise ImportError("The asyncio backend needs aiobotocore: pip install aiobotocore")
+
+
+@asynccontextmanager
+async def get_async_s3_client(
+    aws_profile: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    region_name: Optional[str] = None,
+    retries_max_attempts: int = 8,
+    retries_mode: str = "standard",
+    connect_timeout: int = 10,
+    read_timeout: int = 60,
+    max_pool_connections: int = DEFAULT_CONCURRENCY,
+):
+    """
+    Async counterpart of core.get_s3_client (aiobotocore). Use as
+    `async with get_async_s3_client(...) as client:`.
+    """
+    _require_aiobotocore()
+    session = AioSession(profile=aws_profile) if aws_profile else AioSession()
+    cfg = AioConfig(
+        retries={"max_attempts": retries_max_attempts, "mode": retries_mode},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        max_pool_connections=max_pool_connections,
+    )
+    kwargs: Dict[str, Any] = {"region_name": region_name, "config": cfg}
+    if not aws_profile and aws_access_key_id:
+        kwargs.update(aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key)
+    async with session.create_client("s3", **kwargs) as client:
+        yield client
+
+
+def run_async(func: Callable[..., Awaitable[Any]], *args, client_kwargs: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+    """
+    Run one of the *_async entry points from synchronous code: creates the
+    async client from client_kwargs (see get_async_s3_client), passes it as
+    the first argument and returns the result.
+    """
+    async def _main():
+        async with get_async_s3_client(**(client_kwargs or {})) as client:
+            return await func(client, *args, **kwargs)
+
+    return asyncio.run(_main())
+
+
+# ---------------- Building blocks ----------------
+async def alist_object_records(client, bucket: str, prefix: str = "", suffix: str = "") -> AsyncIterator[ObjectRecord]:
+    """
+    Async counterpart of core.list_object_records (key order).
+    """
+    paginator = client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []) or []:
+            key = obj.get("Key")
+            if key and key.startswith(prefix) and key.endswith(suffix):
+                yield ObjectRecord.from_listing(obj)
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def abounded_imap(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Union[Iterable[Any], AsyncIterator[Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Async counterpart of concurrency.bounded_imap: pulls items lazily, keeps
+    at most `concurrency` coroutines in flight and yields (item, result, error)
+    as they complete.
+    """
+    limit = max(int(concurrency), 1)
+    it = _aiter(items).__aiter__()
+    pending: Dict[asyncio.Task, Any] = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = await it.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(fn(item))] = item
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                item = pending.pop(t)
+                err = t.exception()
+                yield item, (None if err is not None else t.result()), err
+    finally:
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _aprefetch(items: AsyncIterator[Any], size: int = 1000) -> AsyncIterator[Any]:
+    """
+    Drain an async iterator in a background task so two listings progress
+    concurrently while one of them is being consumed.
+    """
+    q: asyncio.Queue = asyncio.Queue(maxsize=size)
+    end = object()
+
+    async def _run():
+        try:
+            async for item in items:
+                await q.put(item)
+            await q.put(end)
+        except BaseException as e:
+            await q.put(e)
+
+    task = asyncio.ensure_future(_run())
+    try:
+        while True:
+            item = await q.get()
+            if item is end:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def acopy_object(
+    client,
+    source_bucket: str,
+    source_key: str,
+    target_bucket: str,
+    target_key: str,
+    size: Optional[int] = None,
+    extra_args: Optional[Dict] = None,
+) -> None:
+    """
+    Async server-side copy: one CopyObject up to 5 GB, concurrent
+    UploadPartCopy parts above that, carrying over the source's content
+    headers and pinned to its ETag like transfer.MultipartCopier.
+    """
+    source = {"Bucket": source_bucket, "Key": source_key}
+    head: Dict[str, Any] = {}
+    if size is None or size > COPY_OBJECT_MAX_SIZE:
+        head = await client.head_object(Bucket=source_bucket, Key=source_key)
+        size = head["ContentLength"]
+    if size <= COPY_OBJECT_MAX_SIZE:
+        await client.copy_object(CopySource=source, Bucket=target_bucket, Key=target_key, **(extra_args or {}))
+        return
+
+    upload_id = (await client.create_multipart_upload(
+        Bucket=target_bucket, Key=target_key, **multipart_copy_args(head, extra_args)
+    ))["UploadId"]
+    ps = part_size_for(size, DEFAULT_COPY_PART_SIZE)
+    sem = asyncio.Semaphore(_PART_CONCURRENCY)
+    etag = head.get("ETag")
+
+    async def _part(number: int, start: int) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "Bucket": target_bucket,
+            "Key": target_key,
+            "UploadId": upload_id,
+            "PartNumber": number,
+            "CopySource": source,
+            "CopySourceRange": f"bytes={start}-{min(start + ps, size) - 1}",
+        }
+        if etag:
+            kwargs["CopySourceIfMatch"] = etag
+        async with sem:
+            resp = await client.upload_part_copy(**kwargs)
+        return {"PartNumber": number, "ETag": resp["CopyPartResult"]["ETag"]}
+
+    try:
+        parts = await asyncio.gather(*(_part(i + 1, start) for i, start in enumerate(range(0, size, ps))))
+        await client.complete_multipart_upload(
+            Bucket=target_bucket, Key=target_key, UploadId=upload_id, MultipartUpload={"Parts": list(parts)}
+        )
+    except BaseException:
+        await client.abort_multipart_upload(Bucket=target_bucket, Key=target_key, UploadId=upload_id)
+        raise
+
+
+async def adownload_file(
+    client,
+    bucket: str,
+    key: str,
+    dst_path: Union[str, Path],
+    overwrite: bool = False,
+    preserve_mtime: bool = False,
+    last_modified=None,
+) -> Path:
+    """
+    Async counterpart of download.download_file: the body is streamed into
+    a `.part` file next to dst (transfer.partial_path; file I/O off the
+    event loop) and renamed when complete.
+    """
+    dst = Path(dst_path)
+    if dst.exists() and not overwrite:
+        return dst
+    ensure_dir(dst.parent)
+    resp = await client.get_object(Bucket=bucket, Key=key)
+    tmp = partial_path(dst, key)
+    f = await asyncio.to_thread(open, tmp, "wb")
+    body = resp["Body"]
+    try:
+        while True:
+            chunk = await body.read(_READ_CHUNK)
+            if not chunk:
+                break
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        f.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    finally:
+        body.close()
+    await asyncio.to_thread(f.close)
+    os.replace(tmp, dst)
+    lm = last_modified or (resp.get("LastModified") if preserve_mtime else None)
+    if preserve_mtime and lm:
+        set_mtime(dst, lm)
+    return dst
+
+
+async def _adelete_chunk(client, bucket: str, chunk: List[str]) -> Tuple[List[str], List[ErrorRecord]]:
+    try:
+        resp = await client.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True}
+        )
+    except Exception as e:
+        return [], [ErrorRecord.from_exception("delete", k, e, bucket=bucket) for k in chunk]
+    failed = {e.get("Key") for e in resp.get("Errors", []) or []}
+    errors = [ErrorRecord.from_delete_error(e, bucket=bucket) for e in resp.get("Errors", []) or []]
+    return [k for k in chunk if k not in failed], errors
+
+
+class _ADeleteQueue:
+    """
+    Async counterpart of delete.DeleteQueue: keys put() while another job
+    runs are deleted in batch_size batches as soon as a batch fills, with
+    up to `workers` batches in flight (put() waits for a free slot, so keys
+    never pile up). Each batch's outcome goes to on_batch(chunk, deleted,
+    errors); close() deletes the last partial batch and waits for the rest.
+    """
+
+    def __init__(
+        self, client, bucket: str, on_batch: OnBatch, batch_size: int = 1000, workers: int = DEFAULT_DELETE_WORKERS
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.on_batch = on_batch
+        self.batch_size = min(max(int(batch_size), 1), 1000)
+        self._sem = asyncio.Semaphore(max(int(workers), 1))
+        self._chunk: List[str] = []
+        self._tasks: set = set()
+
+    async def put(self, key: str) -> None:
+        self._chunk.append(key)
+        if len(self._chunk) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+        await self._sem.acquire()
+        task = asyncio.ensure_future(self._run(chunk))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, chunk: List[str]) -> None:
+        try:
+            self.on_batch(chunk, *await _adelete_chunk(self.client, self.bucket, chunk))
+        finally:
+            self._sem.release()
+
+    async def close(self) -> None:
+        await self._flush()
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+
+async def _amerge_join(
+    src: AsyncIterator[ObjectRecord],
+    dst: AsyncIterator[ObjectRecord],
+    prefix_src: str = "",
+    prefix_dst: str = "",
+) -> AsyncIterator[Decision]:
+    """Async counterpart of sync.merge_join (same decisions, via sync.join_step)."""
+    async def _next(it):
+        try:
+            return await it.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    s, d = await _next(src), await _next(dst)
+    while s is not None or d is not None:
+        decision = join_step(s, d, prefix_src, prefix_dst)
+        yield decision
+        if decision[0] != "delete":
+            s = await _next(src)
+        if decision[0] != "copy":
+            d = await _next(dst)
+
+
+# ---------------- Entry points ----------------
+async def copy_prefix_async(
+    client,
+    source_bucket: str,
+    target_bucket: str,
+    src_prefix: str,
+    dst_prefix: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, int]:
+    """
+    Async counterpart of copy._copy_prefix.
+    """
+    if source_bucket == target_bucket and src_prefix.rstrip("/") == dst_prefix.rstrip("/"):
+        raise ValueError("src_prefix and dst_prefix must differ")
+
+    async def _do(rec: ObjectRecord) -> None:
+        dst_key = f"{dst_prefix}{rec.key[len(src_prefix):].lstrip('/')}"
+        await acopy_object(client, source_bucket, rec.key, target_bucket, dst_key, size=rec.size)
+
+    records: AsyncIterator[ObjectRecord] = alist_object_records(client, source_bucket, prefix=src_prefix)
+    if prefixes_overlap(source_bucket, src_prefix, target_bucket, dst_prefix):
+        records = _aiter([r async for r in records])  # copies would land inside the listing in progress
+    oks = errs = 0
+    async for _, _, err in abounded_imap(_do, records, concurrency=concurrency):
+        if err is None:
+            oks += 1
+        else:
+            errs += 1
+    return {"copied": oks, "errors": errs}
+
+
+async def download_by_mask_async(
+    client,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    dst_root: Union[str, Path] = ".",
+    keep_structure: bool = True,
+    overwrite: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress: bool = False,
+    dry_run: bool = False,
+    skip_if: SkipMode = "none",
+    preserve_mtime: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    manifest_path: Optional[Union[str, Path]] = None,
+) -> Dict[str, List]:
+    """
+    Async counterpart of download.download_by_mask (same result shape).
+    """
+    matcher = compile_patterns(includes=include, excludes=exclude) if (include or exclude) else (lambda _: True)
+    dst_root = Path(dst_root)
+    total = 0
+
+    async def _pairs() -> AsyncIterator[Tuple[ObjectRecord, Path]]:
+        nonlocal total
+        async for rec in alist_object_records(client, bucket, prefix=prefix, suffix=suffix):
+            if not matcher(rec.key):
+                continue
+            r = rec.key[len(prefix):] if prefix else rec.key
+            total += 1
+            yield (rec, dst_root / r if keep_structure else dst_root / Path(r).name)
+
+    if dry_run:
+        planned = [(rec.key, str(p)) async for (rec, p) in _pairs()]
+        return {
+            "downloaded": [],
+            "errors": [],
+            "stats": {
+                "bucket": bucket,
+                "prefix": prefix,
+                "suffix": suffix,
+                "dst_root": str(dst_root),
+                "keep_structure": keep_structure,
+                "overwrite": overwrite,
+                "dry_run": True,
+                "total": total,
+                "planned": planned,
+            },
+        }
+
+    async def _do(pair: Tuple[ObjectRecord, Path]) -> Optional[Tuple[str, Path]]:
+        rec, dst = pair
+        if skip_if == "size" and dst.exists() and rec.size is not None and dst.stat().st_size == rec.size:
+            return None
+        p = await adownload_file(
+            client, bucket, rec.key, dst,
+            overwrite=overwrite, preserve_mtime=preserve_mtime, last_modified=rec.last_modified,
+        )
+        return (rec.key, p)
+
+    downloaded: List[Tuple[str, Path]] = []
+    errors: List[ErrorRecord] = []
+    bar = tqdm(desc="Download", unit="obj") if progress else None
+    async for (rec, dst), item, err in abounded_imap(_do, _pairs(), concurrency=concurrency):
+        if err is not None:
+            errors.append(ErrorRecord.from_exception("download", rec.key, err, bucket=bucket, target=str(dst)))
+        elif item is not None:
+            downloaded.append(item)
+        if bar is not None:
+            bar.update(1)
+    if bar is not None:
+        bar.close()
+    downloaded.sort(key=lambda x: x[0])
+
+    if manifest_path:
+        write_manifest(manifest_path, downloaded)
+
+    return {
+        "downloaded": [(k, str(p)) for (k, p) in downloaded],
+        "errors": errors,
+        "stats": {
+            "bucket": bucket,
+            "prefix": prefix,
+            "suffix": suffix,
+            "dst_root": str(dst_root),
+            "keep_structure": keep_structure,
+            "overwrite": overwrite,
+            "dry_run": False,
+            "skip_if": skip_if,
+            "preserve_mtime": preserve_mtime,
+            "total": total,
+            "downloaded": len(downloaded),
+            "errors_count": len(errors),
+        },
+    }
+
+
+async def move_by_mask_async(
+    client,
+    source_bucket: str,
+    target_bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    prefix_dst: str = "",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress: bool = False,
+    extra_args: Optional[Dict] = None,
+    dry_run: bool = False,
+    delete_batch_size: int = 1000,
+) -> Dict[str, List]:
+    """
+    Async counterpart of move.move_by_mask (same result shape): copies start
+    while the source is still listed and each copied source key goes to a
+    delete batch right away (delete_batch_size keys, several in flight).
+    """
+    totals = {"total": 0, "total_bytes": 0}
+    records: AsyncIterator[ObjectRecord] = alist_object_records(client, source_bucket, prefix=prefix, suffix=suffix)
+    if prefixes_overlap(source_bucket, prefix, target_bucket, prefix_dst):
+        # Copies would land inside the listing still in progress; snapshot it first.
+        records = _aiter([r async for r in records])
+
+    async def _pairs() -> AsyncIterator[Tuple[ObjectRecord, str]]:
+        async for rec in records:
+            totals["total"] += 1
+            totals["total_bytes"] += rec.size or 0
+            yield (rec, f"{prefix_dst}{rec.key[len(prefix):]}")
+
+    def _stats() -> Dict[str, Any]:
+        return {
+            "source_bucket": source_bucket,
+            "target_bucket": target_bucket,
+            "prefix": prefix,
+            "prefix_dst": prefix_dst,
+            "suffix": suffix,
+            **totals,
+            "dry_run": dry_run,
+        }
+
+    if dry_run:
+        moved = [(rec.key, dk) async for (rec, dk) in _pairs()]
+        return {
+            "moved": moved,
+            "errors_copy": [],
+            "deleted_source": [sk for (sk, _) in moved],
+            "errors_delete": [],
+            "stats": _stats(),
+        }
+
+    deleted: List[str] = []
+    errors_delete: List[ErrorRecord] = []
+    delete_bar = tqdm(desc="Delete", unit="obj") if progress else None
+
+    def _on_deleted(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        deleted.extend(ok)
+        errors_delete.extend(errs)
+        if delete_bar is not None:
+            delete_bar.update(len(chunk))
+
+    deletes = _ADeleteQueue(client, source_bucket, _on_deleted, batch_size=delete_batch_size)
+
+    async def _do(pair: Tuple[ObjectRecord, str]) -> Tuple[str, str]:
+        rec, dk = pair
+        await acopy_object(client, source_bucket, rec.key, target_bucket, dk, size=rec.size, extra_args=extra_args)
+        return (rec.key, dk)
+
+    moved: List[Tuple[str, str]] = []
+    errors_copy: List[ErrorRecord] = []
+    bar = tqdm(desc="Copy", unit="obj") if progress else None
+    try:
+        async for (rec, dk), result, err in abounded_imap(_do, _pairs(), concurrency=concurrency):
+            if err is None:
+                moved.append(result)
+                await deletes.put(rec.key)
+            else:
+                errors_copy.append(ErrorRecord.from_exception(
+                    "move", rec.key, err, bucket=source_bucket, target=dk, target_bucket=target_bucket
+                ))
+            if bar is not None:
+                bar.update(1)
+        await deletes.close()
+    finally:
+        if bar is not None:
+            bar.close()
+        if delete_bar is not None:
+            delete_bar.close()
+    moved.sort()
+    deleted.sort()
+
+    return {
+        "moved": moved,
+        "errors_copy": errors_copy,
+        "deleted_source": deleted,
+        "errors_delete": errors_delete,
+        "stats": _stats(),
+    }
+
+
+async def sync_prefix_async(
+    client,
+    source_bucket: str,
+    target_bucket: str,
+    prefix_src: str = "",
+    prefix_dst: str = "",
+    delete_extra: bool = False,
+    compare_mode: str = "key",
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress: bool = False,
+) -> Dict[str, List]:
+    """
+    Async counterpart of sync.sync_prefix (same result shape): both listings
+    are merge-joined as they stream and copies run `concurrency` at a time,
+    with extra target keys (delete_extra) deleted in 1000-key batches
+    alongside them.
+    """
+    compare_mode = (compare_mode or "key").lower()
+    if compare_mode not in COMPARE_MODES:
+        raise ValueError(f"compare_mode must be one of {', '.join(COMPARE_MODES)}")
+
+    src: AsyncIterator[ObjectRecord] = alist_object_records(client, source_bucket, prefix=prefix_src)
+    dst: AsyncIterator[ObjectRecord] = alist_object_records(client, target_bucket, prefix=prefix_dst)
+    if prefixes_overlap(source_bucket, prefix_src, target_bucket, prefix_dst):
+        # Nested prefixes: new copies would show up in a listing still in
+        # progress, so snapshot both sides before acting (as sync_prefix).
+        src = _aiter([r async for r in src])
+        dst = _aiter([r async for r in dst])
+    counts = {"total_src": 0, "total_dst": 0, "to_copy": 0, "to_delete": 0}
+    decisions = {"missing": 0, "changed": 0, "unchanged": 0, "extra": 0}
+
+    deleted: List[str] = []
+    errors_delete: List[ErrorRecord] = []
+    delete_bar = tqdm(desc="Delete", unit="obj") if progress and delete_extra and not dry_run else None
+
+    def _on_deleted(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        deleted.extend(ok)
+        errors_delete.extend(errs)
+        if delete_bar is not None:
+            delete_bar.update(len(chunk))
+
+    deletes = _ADeleteQueue(client, target_bucket, _on_deleted) if delete_extra and not dry_run else None
+
+    async def _tasks() -> AsyncIterator[Tuple[ObjectRecord, str]]:
+        async for decision in _amerge_join(_aprefetch(src), _aprefetch(dst), prefix_src, prefix_dst):
+            todo = plan_decision(decision, compare_mode, delete_extra, counts, decisions)
+            _, rel, s, d = decision
+            if todo == "copy":
+                yield (s, f"{prefix_dst}{rel}")
+            elif todo == "delete":
+                if deletes is None:
+                    deleted.append(d.key)
+                else:
+                    await deletes.put(d.key)
+
+    async def _copy(task: Tuple[ObjectRecord, str]) -> None:
+        rec, dst_key = task
+        if not dry_run:
+            await acopy_object(client, source_bucket, rec.key, target_bucket, dst_key, size=rec.size)
+
+    copied: List[Tuple[str, str]] = []
+    errors_copy: List[ErrorRecord] = []
+    bar = tqdm(desc="Copy", unit="obj") if progress else None
+    try:
+        async for (rec, dst_key), _, err in abounded_imap(_copy, _tasks(), concurrency=concurrency):
+            if err is None:
+                copied.append((rec.key, dst_key))
+            else:
+                errors_copy.append(ErrorRecord.from_exception(
+                    "copy", rec.key, err, bucket=source_bucket, target=dst_key, target_bucket=target_bucket
+                ))
+            if bar is not None:
+                bar.update(1)
+        if deletes is not None:
+            await deletes.close()
+    finally:
+        if bar is not None:
+            bar.close()
+        if delete_bar is not None:
+            delete_bar.close()
+    copied.sort()
+    deleted.sort()
+
+    return {
+        "copied": copied,
+        "errors_copy": errors_copy,
+        "deleted": deleted,
+        "errors_delete": errors_delete,
+        "stats": {
+            "source_bucket": source_bucket,
+            "target_bucket": target_bucket,
+            "prefix_src": prefix_src,
+            "prefix_dst": prefix_dst,
+            "delete_extra": delete_extra,
+            "compare_mode": compare_mode,
+            "dry_run": dry_run,
+            **counts,
+            "decisions": decisions,
+        },
+    }
@@ -8,12 +8,27 @@ from typing import Optional, List
 import typer
 import click
 
-from .core import get_s3_client
+from .copy import copy_by_mask, copy_common_and_addon_from_roots
+from .core import get_s3_client, pool_size_for
+from .delete import delete_by_mask
 from .download import download_by_mask
+from .metrics import Metrics, write_metrics
 from .move import move_by_mask
-from .sync import sync_prefix
-from .utils import read_yaml, parse_s3_uri
+from .retry import read_failures, retry_failures
+from .sinks import sink_for_path
+from .state import MoveJournal, SyncState
+from .sync import sync_local_to_s3, sync_prefix, sync_s3_to_local
+from .upload import upload_by_mask
+from .transfer import MB, TransferConfig, make_transfer_config
+from .utils import human_bytes, is_s3_uri, read_yaml, parse_s3_uri
 from .errors import setup_logging
+from .aio import (
+    DEFAULT_CONCURRENCY,
+    download_by_mask_async,
+    move_by_mask_async,
+    run_async,
+    sync_prefix_async,
+)
 
 app = typer.Typer(add_completion=False, help="S3 Toolkit CLI")
 
@@ -25,6 +40,7 @@ class Settings:
     aws_region: Optional[str] = None
 
 DEFAULT_CONFIG = "config/config.yaml"
+BACKENDS = ["thread", "asyncio"]
 
 # ---------------- Helpers ----------------
 def _load_cfg(config_path: Optional[str]) -> dict:
@@ -41,13 +57,29 @@ def _load_cfg(config_path: Optional[str]) -> dict:
         return {}
     return cfg
 
-def _client_from_cfg(cfg: dict, settings: Settings):
+def _client_from_cfg(
+    cfg: dict,
+    settings: Settings,
+    max_workers: int = 0,
+    transfer_config: Optional[TransferConfig] = None,
+    list_shards: int = 0,
+):
     """
     Resolve AWS auth/region with priority:
     CLI flags -> ENV (handled inside boto3) -> YAML.
+    The connection pool is aws.max_pool_connections, or sized for the
+    command's workers, transfer threads and listing shards.
+    """
+    aws = (cfg.get("aws") or {}) if cfg else {}
+    pool = aws.get("max_pool_connections") or pool_size_for(max_workers, transfer_config, extra=list_shards)
+    return get_s3_client(**_aws_kwargs(cfg, settings), max_pool_connections=pool)
+
+def _aws_kwargs(cfg: dict, settings: Settings) -> dict:
+    """
+    Client arguments shared by the thread and asyncio backends.
     """
     aws = (cfg.get("aws") or {}) if cfg else {}
-    return get_s3_client(
+    return dict(
         aws_profile=settings.aws_profile or aws.get("profile"),
         aws_access_key_id=aws.get("access_key_id"),
         aws_secret_access_key=aws.get("secret_access_key"),
@@ -58,6 +90,37 @@ def _client_from_cfg(cfg: dict, settings: Settings):
         read_timeout=aws.get("read_timeout", 60),
     )
 
+def _async_client_kwargs(cfg: dict, settings: Settings, concurrency: int) -> dict:
+    """
+    Arguments for aio.get_async_s3_client: one connection per in-flight request
+    unless aws.max_pool_connections is set.
+    """
+    aws = (cfg.get("aws") or {}) if cfg else {}
+    return {**_aws_kwargs(cfg, settings), "max_pool_connections": aws.get("max_pool_connections") or concurrency}
+
+def _transfer_from_cfg(
+    cfg: dict,
+    multipart_threshold_mb: Optional[int],
+    part_size_mb: Optional[int],
+    part_workers: Optional[int],
+) -> Optional[TransferConfig]:
+    """
+    Build a shared TransferConfig with priority CLI flags -> YAML `transfer:`.
+    Returns None (library defaults) when nothing is set.
+    """
+    tcfg = (cfg.get("transfer") or {}) if cfg else {}
+    threshold = multipart_threshold_mb if multipart_threshold_mb is not None else tcfg.get("multipart_threshold_mb")
+    chunk = part_size_mb if part_size_mb is not None else tcfg.get("part_size_mb")
+    workers = part_workers if part_workers is not None else tcfg.get("part_workers")
+    kwargs = {}
+    if threshold is not None:
+        kwargs["multipart_threshold"] = int(threshold) * MB
+    if chunk is not None:
+        kwargs["multipart_chunksize"] = int(chunk) * MB
+    if workers is not None:
+        kwargs["max_concurrency"] = int(workers)
+    return make_transfer_config(**kwargs) if kwargs else None
+
 def _parse_patterns(csv: Optional[str]) -> Optional[List[str]]:
     if csv is None:
         return None
@@ -66,6 +129,47 @@ def _parse_patterns(csv: Optional[str]) -> Optional[List[str]]:
         return []
     return [p.strip() for p in csv.split(",") if p.strip()]
 
+def _echo_concurrency(stats: dict) -> None:
+    c = stats.get("concurrency")
+    if c:
+        typer.echo(f"Concurrency: final {c['final']} (min {c['min']}, max {c['max']}), Throttled: {c['throttles']}")
+
+def _echo_metrics(stats: dict, metrics_file: Optional[str], job: str) -> None:
+    """Print the request summary of stats["metrics"] and write it to metrics_file."""
+    m = stats.get("metrics")
+    if not m:
+        return
+    typer.echo(
+        f"Requests: {m['requests']} (retries {m['retries']}, throttled {m['throttles']}), "
+        f"{m['objects_per_sec'] or 0:.1f} obj/s, {human_bytes(int(m['bytes_per_sec'] or 0))}/s"
+    )
+    if metrics_file:
+        write_metrics(metrics_file, m, job=job)
+
+def _count(res: dict, kind: str) -> int:
+    """Items of one result kind, whether kept in res or streamed to a --results file."""
+    results = res["stats"].get("results")
+    return results.get(kind, 0) if results is not None else len(res[kind])
+
+def _echo_sync(res: dict, show_errors: bool) -> None:
+    typer.echo(
+        f"Synced. Copied: {_count(res, 'copied')}, Deleted: {_count(res, 'deleted')}, "
+        f"Errors(copy/delete): {_count(res, 'errors_copy')}/{_count(res, 'errors_delete')}, "
+        f"Mode: {res['stats']['compare_mode']}, Dry-run: {res['stats']['dry_run']}"
+    )
+    d = res["stats"]["decisions"]
+    typer.echo(f"Missing: {d['missing']}, Changed: {d['changed']}, Unchanged: {d['unchanged']}, Extra: {d['extra']}")
+    _echo_concurrency(res["stats"])
+    st = res["stats"].get("state")
+    if st:
+        typer.echo(f"State: {st['mode']}" + (f" (after {st['start_after']})" if st["start_after"] else ""))
+
+    if show_errors:
+        for e in res.get("errors_copy", []):
+            typer.echo(f"[COPY ERROR] {e}")
+        for e in res.get("errors_delete", []):
+            typer.echo(f"[DELETE ERROR] {e}")
+
 # ---------------- Root options (global) ----------------
 @app.callback()
 def _root(
@@ -90,59 +194,136 @@ def _root(
 @app.command("sync")
 def cmd_sync(
     ctx: typer.Context,
-    source: Optional[str] = typer.Option(None, "--src", help="Source S3 URI (e.g. s3://bucket/prefix/)"),
-    target: Optional[str] = typer.Option(None, "--dst", help="Destination S3 URI"),
-    delete_extra: bool = typer.Option(False, help="Delete extra keys on target"),
+    source: Optional[str] = typer.Option(None, "--src", help="Source S3 URI (e.g. s3://bucket/prefix/) or local directory"),
+    target: Optional[str] = typer.Option(None, "--dst", help="Destination S3 URI or local directory"),
+    delete_extra: bool = typer.Option(False, help="Delete extra keys (or local files) on target"),
     compare_mode: str = typer.Option(
         "name",
         help="Comparison mode",
         case_sensitive=False,
-        click_type=click.Choice(["name", "etag", "size"], case_sensitive=False),
+        click_type=click.Choice(["name", "etag", "size", "mtime"], case_sensitive=False),
     ),
     dry_run: bool = typer.Option(False, help="Plan only; do not modify anything"),
     max_workers: int = typer.Option(8, help="Parallel workers"),
     progress: bool = typer.Option(False, help="Show progress bar"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    multipart_threshold_mb: Optional[int] = typer.Option(None, help="Objects above this size (MB) are transferred in parts"),
+    part_size_mb: Optional[int] = typer.Option(None, help="Part size (MB) for multipart transfers"),
+    part_workers: Optional[int] = typer.Option(None, help="Part-level threads shared by all large objects"),
+    backend: str = typer.Option(
+        "thread",
+        help="Transfer backend (asyncio needs aiobotocore)",
+        case_sensitive=False,
+        click_type=click.Choice(BACKENDS, case_sensitive=False),
+    ),
+    concurrency: int = typer.Option(DEFAULT_CONCURRENCY, help="In-flight requests for the asyncio backend"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    prefix_depth: int = typer.Option(0, help="Interleave copies across destination prefixes of this many segments (0 = listing order)"),
+    prefix_rate: Optional[float] = typer.Option(None, help="Max copies per second per destination prefix"),
+    state_path: Optional[str] = typer.Option(None, "--state", help="SQLite state file; later runs list only new source keys"),
+    full: bool = typer.Option(False, "--full", help="With --state: list both sides in full and rebuild the state"),
+    results_path: Optional[str] = typer.Option(None, "--results", help="Stream outcomes to this JSONL (or .csv) file instead of memory"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
     show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed keys"),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
 ):
     cfg = _load_cfg(config)
-    s3 = _client_from_cfg(cfg, ctx.obj)
     scfg = (cfg.get("sync") or {}) if cfg else {}
+    state_file = scfg.get("state", state_path)
+    results_file = scfg.get("results", results_path)
+    metrics_file = scfg.get("metrics", metrics_path)
+    workers = scfg.get("max_workers", max_workers)
+    shards = scfg.get("list_shards", list_shards)
+    backend_val = scfg.get("backend", backend).lower()
+    conc = scfg.get("concurrency", concurrency)
+    tc = _transfer_from_cfg(cfg, multipart_threshold_mb, part_size_mb, part_workers)
 
     src_uri = source or scfg.get("src")
     dst_uri = target or scfg.get("dst")
     if not src_uri or not dst_uri:
         raise typer.BadParameter("Provide --src and --dst or set sync.src and sync.dst in config.yaml")
 
+    cm = (compare_mode or scfg.get("compare_mode", "name")).lower()
+
+    if not (is_s3_uri(src_uri) and is_s3_uri(dst_uri)):
+        # local <-> S3
+        if not (is_s3_uri(src_uri) or is_s3_uri(dst_uri)):
+            raise typer.BadParameter("At least one of --src/--dst must be an s3:// URI")
+        if backend_val == "asyncio":
+            raise typer.BadParameter("--backend asyncio supports S3-to-S3 sync only")
+        if state_file:
+            raise typer.BadParameter("--state supports S3-to-S3 sync only")
+        s3 = _client_from_cfg(
+            cfg, ctx.obj, max_workers=workers, transfer_config=tc or make_transfer_config(), list_shards=shards
+        )
+        common = dict(
+            delete_extra=scfg.get("delete_extra", delete_extra),
+            compare_mode=cm,
+            dry_run=scfg.get("dry_run", dry_run),
+            max_workers=workers,
+            progress=scfg.get("progress", progress),
+            list_shards=shards,
+            transfer_config=tc,
+            adaptive=scfg.get("adaptive", adaptive),
+            metrics=Metrics() if metrics_file else None,
+        )
+        sink = sink_for_path(results_file) if results_file else None
+        try:
+            if is_s3_uri(dst_uri):
+                dst_bucket, dst_prefix = parse_s3_uri(dst_uri)
+                res = sync_local_to_s3(s3, src_uri, dst_bucket, dst_prefix, sink=sink, **common)
+            else:
+                src_bucket, src_prefix = parse_s3_uri(src_uri)
+                res = sync_s3_to_local(s3, src_bucket, src_prefix, dst_uri, sink=sink, **common)
+        finally:
+            if sink is not None:
+                sink.close()
+        _echo_sync(res, show_errors)
+        _echo_metrics(res["stats"], metrics_file, "sync")
+        return
+
     src_bucket, src_prefix = parse_s3_uri(src_uri)
     dst_bucket, dst_prefix = parse_s3_uri(dst_uri)
 
-    cm = (compare_mode or scfg.get("compare_mode", "name")).lower()
-
-    res = sync_prefix(
-        s3,
-        src_bucket,
-        dst_bucket,
+    common = dict(
         prefix_src=src_prefix,
         prefix_dst=dst_prefix,
         delete_extra=scfg.get("delete_extra", delete_extra),
         compare_mode=cm,
-        max_workers=scfg.get("max_workers", max_workers),
         dry_run=scfg.get("dry_run", dry_run),
         progress=scfg.get("progress", progress),
     )
-
-    typer.echo(
-        f"Synced. Copied: {len(res['copied'])}, Deleted: {len(res['deleted'])}, "
-        f"Errors(copy/delete): {len(res['errors_copy'])}/{len(res['errors_delete'])}, "
-        f"Mode: {res['stats']['compare_mode']}, Dry-run: {res['stats']['dry_run']}"
-    )
-
-    if show_errors:
-        for e in res.get("errors_copy", []):
-            typer.echo(f"[COPY ERROR] {e}")
-        for e in res.get("errors_delete", []):
-            typer.echo(f"[DELETE ERROR] {e}")
+    if backend_val == "asyncio":
+        if state_file or results_file or metrics_file:
+            raise typer.BadParameter("--state, --results and --metrics are not supported with --backend asyncio")
+        res = run_async(
+            sync_prefix_async, src_bucket, dst_bucket,
+            client_kwargs=_async_client_kwargs(cfg, ctx.obj, conc), concurrency=conc, **common,
+        )
+    else:
+        s3 = _client_from_cfg(cfg, ctx.obj, max_workers=workers, transfer_config=tc, list_shards=2 * shards)
+        state = SyncState(state_file) if state_file else None
+        sink = sink_for_path(results_file) if results_file else None
+        try:
+            res = sync_prefix(
+                s3, src_bucket, dst_bucket,
+                max_workers=workers, list_shards=shards, transfer_config=tc,
+                adaptive=scfg.get("adaptive", adaptive),
+                prefix_depth=scfg.get("prefix_depth", prefix_depth),
+                prefix_rate=scfg.get("prefix_rate", prefix_rate),
+                state=state, full=scfg.get("full", full), sink=sink,
+                metrics=Metrics() if metrics_file else None,
+                **common,
+            )
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        finally:
+            if state is not None:
+                state.close()
+            if sink is not None:
+                sink.close()
+    _echo_sync(res, show_errors)
+    _echo_metrics(res["stats"], metrics_file, "sync")
 
 # ---------------- DOWNLOAD ----------------
 @app.command("download")
@@ -166,6 +347,20 @@ def cmd_download(
     include: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to include"),
     exclude: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to exclude"),
     manifest: Optional[str] = typer.Option(None, "--manifest", help="Write CSV manifest of downloaded files"),
+    results_path: Optional[str] = typer.Option(None, "--results", help="Stream outcomes to this JSONL (or .csv) file instead of memory"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    multipart_threshold_mb: Optional[int] = typer.Option(None, help="Objects above this size (MB) are transferred in parts"),
+    part_size_mb: Optional[int] = typer.Option(None, help="Part size (MB) for multipart transfers"),
+    part_workers: Optional[int] = typer.Option(None, help="Part-level threads shared by all large objects"),
+    backend: str = typer.Option(
+        "thread",
+        help="Transfer backend (asyncio needs aiobotocore)",
+        case_sensitive=False,
+        click_type=click.Choice(BACKENDS, case_sensitive=False),
+    ),
+    concurrency: int = typer.Option(DEFAULT_CONCURRENCY, help="In-flight requests for the asyncio backend"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
     show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed keys"),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
 ):
@@ -191,18 +386,24 @@ def cmd_download(
     include_val = _parse_patterns(include if include is not None else dcfg.get("include", None))
     exclude_val = _parse_patterns(exclude if exclude is not None else dcfg.get("exclude", None))
     manifest_val = manifest or dcfg.get("manifest", None)
-
-    s3 = _client_from_cfg(cfg, ctx.obj)
-
-    res = download_by_mask(
-        s3,
+    results_file = dcfg.get("results", results_path)
+    metrics_file = dcfg.get("metrics", metrics_path)
+    if results_file and manifest_val:
+        raise typer.BadParameter("--results and --manifest cannot be combined")
+
+    workers = dcfg.get("max_workers", max_workers)
+    shards = dcfg.get("list_shards", list_shards)
+    backend_val = dcfg.get("backend", backend).lower()
+    conc = dcfg.get("concurrency", concurrency)
+    tc = _transfer_from_cfg(cfg, multipart_threshold_mb, part_size_mb, part_workers)
+
+    common = dict(
         bucket=bucket,
         prefix=prefix,
         suffix=suffix_val,
         dst_root=dst,
         keep_structure=keep_val,
         overwrite=overwrite_val,
-        max_workers=dcfg.get("max_workers", max_workers),
         progress=progress_val,
         dry_run=dry_run_val,
         skip_if=skip_val,                # "none" | "size"
@@ -211,6 +412,31 @@ def cmd_download(
         exclude=exclude_val,
         manifest_path=manifest_val,
     )
+    if backend_val == "asyncio":
+        if results_file or metrics_file:
+            raise typer.BadParameter("--results and --metrics are not supported with --backend asyncio")
+        res = run_async(
+            download_by_mask_async,
+            client_kwargs=_async_client_kwargs(cfg, ctx.obj, conc), concurrency=conc, **common,
+        )
+    else:
+        # range threads are one pool shared by all objects (boto3 defaults when unset)
+        s3 = _client_from_cfg(
+            cfg, ctx.obj,
+            max_workers=workers,
+            transfer_config=tc or make_transfer_config(),
+            list_shards=shards,
+        )
+        sink = sink_for_path(results_file) if results_file else None
+        try:
+            res = download_by_mask(
+                s3, max_workers=workers, list_shards=shards, transfer_config=tc,
+                adaptive=dcfg.get("adaptive", adaptive), sink=sink,
+                metrics=Metrics() if metrics_file else None, **common,
+            )
+        finally:
+            if sink is not None:
+                sink.close()
 
     if dry_run_val:
         log.info("Planned: %d items (dry-run), Dest=%s", res["stats"]["total"], res["stats"]["dst_root"])
@@ -221,8 +447,8 @@ def cmd_download(
 
     log.info(
         "Downloaded=%d Errors=%d Dest=%s Keep-structure=%s Overwrite=%s Skip-if=%s Preserve-mtime=%s",
-        len(res["downloaded"]),
-        len(res["errors"]),
+        _count(res, "downloaded"),
+        _count(res, "errors"),
         res["stats"]["dst_root"],
         res["stats"]["keep_structure"],
         res["stats"]["overwrite"],
@@ -230,6 +456,9 @@ def cmd_download(
         res["stats"]["preserve_mtime"],
     )
 
+    _echo_concurrency(res["stats"])
+    _echo_metrics(res["stats"], metrics_file, "download")
+
     if show_errors and res.get("errors"):
         for e in res["errors"]:
             typer.echo(f"[ERROR] {e}")
@@ -248,11 +477,31 @@ def cmd_move(
     max_workers: int = typer.Option(8, help="Parallel workers"),
     progress: bool = typer.Option(False, "--progress/--no-progress", help="Show progress bar"),
     delete_batch_size: int = typer.Option(1000, help="Batch size for delete (<=1000)"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    multipart_threshold_mb: Optional[int] = typer.Option(None, help="Objects above this size (MB) are transferred in parts"),
+    part_size_mb: Optional[int] = typer.Option(None, help="Part size (MB) for multipart transfers"),
+    part_workers: Optional[int] = typer.Option(None, help="Part-level threads shared by all large objects"),
+    backend: str = typer.Option(
+        "thread",
+        help="Transfer backend (asyncio needs aiobotocore)",
+        case_sensitive=False,
+        click_type=click.Choice(BACKENDS, case_sensitive=False),
+    ),
+    concurrency: int = typer.Option(DEFAULT_CONCURRENCY, help="In-flight requests for the asyncio backend"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    prefix_depth: int = typer.Option(0, help="Interleave copies across destination prefixes of this many segments (0 = listing order)"),
+    prefix_rate: Optional[float] = typer.Option(None, help="Max copies per second per destination prefix"),
+    journal_path: Optional[str] = typer.Option(None, "--journal", help="SQLite journal; rerun the same move to resume it"),
+    results_path: Optional[str] = typer.Option(None, "--results", help="Stream outcomes to this JSONL (or .csv) file instead of memory"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
     show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed keys"),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
 ):
     cfg = _load_cfg(config)
     mcfg = (cfg.get("move") or {}) if cfg else {}
+    journal_file = mcfg.get("journal", journal_path)
+    results_file = mcfg.get("results", results_path)
+    metrics_file = mcfg.get("metrics", metrics_path)
 
     src_uri = source or mcfg.get("src")
     dst_uri = target or mcfg.get("dst")
@@ -262,29 +511,395 @@ def cmd_move(
     sb, sp = parse_s3_uri(src_uri)
     tb, tp = parse_s3_uri(dst_uri)
 
-    s3 = _client_from_cfg(cfg, ctx.obj)
+    workers = mcfg.get("max_workers", max_workers)
+    shards = mcfg.get("list_shards", list_shards)
+    backend_val = mcfg.get("backend", backend).lower()
+    conc = mcfg.get("concurrency", concurrency)
+    tc = _transfer_from_cfg(cfg, multipart_threshold_mb, part_size_mb, part_workers)
 
-    res = move_by_mask(
-        s3,
+    common = dict(
         source_bucket=sb,
         target_bucket=tb,
         prefix=sp,
         suffix=(suffix if suffix is not None else mcfg.get("suffix", "")),
         prefix_dst=tp,
-        max_workers=mcfg.get("max_workers", max_workers),
         progress=mcfg.get("progress", progress),
         dry_run=mcfg.get("dry_run", dry_run),
         delete_batch_size=mcfg.get("delete_batch_size", delete_batch_size),
     )
+    if backend_val == "asyncio":
+        if journal_file or results_file or metrics_file:
+            raise typer.BadParameter("--journal, --results and --metrics are not supported with --backend asyncio")
+        res = run_async(
+            move_by_mask_async,
+            client_kwargs=_async_client_kwargs(cfg, ctx.obj, conc), concurrency=conc, **common,
+        )
+    else:
+        s3 = _client_from_cfg(cfg, ctx.obj, max_workers=workers, transfer_config=tc, list_shards=shards)
+        journal = MoveJournal(journal_file) if journal_file else None
+        sink = sink_for_path(results_file) if results_file else None
+        try:
+            res = move_by_mask(
+                s3, max_workers=workers, list_shards=shards, transfer_config=tc,
+                adaptive=mcfg.get("adaptive", adaptive),
+                prefix_depth=mcfg.get("prefix_depth", prefix_depth),
+                prefix_rate=mcfg.get("prefix_rate", prefix_rate),
+                journal=journal,
+                sink=sink,
+                metrics=Metrics() if metrics_file else None,
+                **common,
+            )
+        finally:
+            if journal is not None:
+                journal.close()
+            if sink is not None:
+                sink.close()
 
     typer.echo(
-        f"Moved: {len(res['moved'])}, Deleted source: {len(res['deleted_source'])}, "
-        f"Errors(copy/delete): {len(res['errors_copy'])}/{len(res['errors_delete'])}, "
+        f"Moved: {_count(res, 'moved')}, Deleted source: {_count(res, 'deleted_source')}, "
+        f"Errors(copy/delete): {_count(res, 'errors_copy')}/{_count(res, 'errors_delete')}, "
         f"Dry-run: {res['stats']['dry_run']}"
     )
+    _echo_concurrency(res["stats"])
+    if "resumed" in res["stats"]:
+        typer.echo(f"Resumed from journal: {res['stats']['resumed']}")
+    _echo_metrics(res["stats"], metrics_file, "move")
 
     if show_errors:
         for e in res.get("errors_copy", []):
             typer.echo(f"[COPY ERROR] {e}")
         for e in res.get("errors_delete", []):
             typer.echo(f"[DELETE ERROR] {e}")
+
+# ---------------- COPY ----------------
+@app.command("copy")
+def cmd_copy(
+    ctx: typer.Context,
+    source: Optional[str] = typer.Option(None, "--src", help="Source S3 URI (root of the folders with --common-addon)"),
+    target: Optional[str] = typer.Option(None, "--dst", help="Destination S3 URI (root for common folders with --common-addon)"),
+    common_addon: bool = typer.Option(
+        False, "--common-addon/--no-common-addon",
+        help="Split folders under --src into those also under --ref (to --dst) and the rest (to --addon-dst)",
+    ),
+    ref: Optional[str] = typer.Option(None, "--ref", help="Reference root S3 URI (--common-addon)"),
+    addon_dst: Optional[str] = typer.Option(None, "--addon-dst", help="Destination root for add-on folders (--common-addon)"),
+    suffix: Optional[str] = typer.Option(None, help="Suffix filter (optional)"),
+    include: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to include"),
+    exclude: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to exclude"),
+    dry_run: bool = typer.Option(False, "--dry-run/--no-dry-run", help="Plan only; do not copy anything"),
+    max_workers: int = typer.Option(8, help="Parallel workers"),
+    progress: bool = typer.Option(False, "--progress/--no-progress", help="Show progress bar"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    list_workers: int = typer.Option(8, help="Folders listed concurrently (--common-addon)"),
+    multipart_threshold_mb: Optional[int] = typer.Option(None, help="Objects above this size (MB) are transferred in parts"),
+    part_size_mb: Optional[int] = typer.Option(None, help="Part size (MB) for multipart transfers"),
+    part_workers: Optional[int] = typer.Option(None, help="Part-level threads shared by all large objects"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
+    show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed keys"),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
+):
+    cfg = _load_cfg(config)
+    ccfg = (cfg.get("copy") or {}) if cfg else {}
+
+    src_uri = source or ccfg.get("src")
+    dst_uri = target or ccfg.get("dst")
+    if not src_uri or not dst_uri:
+        raise typer.BadParameter("Provide --src and --dst or set copy.src and copy.dst in config.yaml")
+
+    sb, sp = parse_s3_uri(src_uri)
+    tb, tp = parse_s3_uri(dst_uri)
+
+    workers = ccfg.get("max_workers", max_workers)
+    shards = ccfg.get("list_shards", list_shards)
+    lworkers = ccfg.get("list_workers", list_workers)
+    mode_common_addon = ccfg.get("common_addon", common_addon)
+    include_val = _parse_patterns(include if include is not None else ccfg.get("include", None))
+    exclude_val = _parse_patterns(exclude if exclude is not None else ccfg.get("exclude", None))
+    dry_run_val = ccfg.get("dry_run", dry_run)
+    metrics_file = ccfg.get("metrics", metrics_path)
+    tc = _transfer_from_cfg(cfg, multipart_threshold_mb, part_size_mb, part_workers, None)
+    s3 = _client_from_cfg(
+        cfg, ctx.obj,
+        max_workers=workers,
+        transfer_config=tc,
+        list_shards=shards + (lworkers if mode_common_addon else 0),
+    )
+
+    common = dict(
+        max_workers=workers,
+        list_shards=shards,
+        transfer_config=tc,
+        adaptive=ccfg.get("adaptive", adaptive),
+        include=include_val,
+        exclude=exclude_val,
+        dry_run=dry_run_val,
+    )
+
+    if mode_common_addon:
+        ref_uri = ref or ccfg.get("ref")
+        addon_uri = addon_dst or ccfg.get("addon_dst")
+        if not ref_uri or not addon_uri:
+            raise typer.BadParameter("--common-addon needs --ref and --addon-dst (or copy.ref and copy.addon_dst)")
+        rb, rp = parse_s3_uri(ref_uri)
+        ab, ap = parse_s3_uri(addon_uri)
+        if len({sb, tb, rb, ab}) != 1:
+            raise typer.BadParameter("--common-addon works within one bucket: --src, --dst, --ref and --addon-dst must share it")
+        res = copy_common_and_addon_from_roots(
+            s3, sb, sp, rp, tp, ap,
+            list_workers=lworkers,
+            progress=ccfg.get("progress", progress),
+            metrics=Metrics() if metrics_file and not dry_run_val else None,
+            **common,
+        )
+        folders = list(res["common"].values()) + list(res["addon"].values())
+        typer.echo(
+            f"Common folders: {res['common_count']}, Add-on folders: {res['addon_count']}, "
+            f"Copied: {sum(f['copied'] for f in folders)}, Errors: {sum(f['errors'] for f in folders)}, "
+            f"Dry-run: {dry_run_val}"
+        )
+        if show_errors:
+            for group in ("common", "addon"):
+                for name, f in res[group].items():
+                    if f["errors"]:
+                        typer.echo(f"[COPY ERROR] {group}/{name}: {f['errors']} failed")
+        _echo_concurrency(res)
+        _echo_metrics(res, metrics_file, "copy")
+        if any(f["errors"] for f in folders):
+            raise typer.Exit(code=1)
+        return
+
+    res = copy_by_mask(
+        s3, sb, tb,
+        prefix=sp,
+        suffix=(suffix if suffix is not None else ccfg.get("suffix", "")),
+        prefix_dst=tp,
+        progress=ccfg.get("progress", progress),
+        metrics=Metrics() if metrics_file and not dry_run_val else None,
+        **common,
+    )
+    typer.echo(f"Copied: {len(res['copied'])}, Errors: {len(res['errors'])}, Dry-run: {dry_run_val}")
+    _echo_metrics(res.get("stats", {}), metrics_file, "copy")
+    if show_errors:
+        for e in res["errors"]:
+            typer.echo(f"[COPY ERROR] {e}")
+    if res["errors"]:
+        raise typer.Exit(code=1)
+
+# ---------------- UPLOAD ----------------
+@app.command("upload")
+def cmd_upload(
+    ctx: typer.Context,
+    source: Optional[str] = typer.Option(None, "--from", help="Local source directory"),
+    to: Optional[str] = typer.Option(None, "--to", help="Destination S3 URI (e.g. s3://bucket/prefix/)"),
+    suffix: Optional[str] = typer.Option(None, help="Suffix filter (e.g. .parquet)"),
+    include: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to include"),
+    exclude: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to exclude"),
+    skip_if: str = typer.Option(
+        "none",
+        help="Skip uploads if the object already has the same size (size) or same size and is newer (mtime)",
+        case_sensitive=False,
+        click_type=click.Choice(["none", "size", "mtime"], case_sensitive=False),
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run/--no-dry-run", help="Plan only; do not upload files"),
+    max_workers: int = typer.Option(8, help="Parallel workers"),
+    scan_workers: int = typer.Option(8, help="Directories scanned concurrently"),
+    progress: bool = typer.Option(False, "--progress/--no-progress", help="Show progress bar"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    multipart_threshold_mb: Optional[int] = typer.Option(None, help="Objects above this size (MB) are transferred in parts"),
+    part_size_mb: Optional[int] = typer.Option(None, help="Part size (MB) for multipart transfers"),
+    part_workers: Optional[int] = typer.Option(None, help="Part-level threads shared by all large objects"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
+    show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed files"),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
+):
+    log = logging.getLogger("s3_utils.cli.upload")
+    cfg = _load_cfg(config)
+    ucfg = (cfg.get("upload") or {}) if cfg else {}
+
+    src = source or ucfg.get("from")
+    to_uri = to or ucfg.get("to")
+    if not src or not to_uri:
+        raise typer.BadParameter("Provide --from and --to or set upload.from and upload.to in config.yaml")
+
+    bucket, prefix = parse_s3_uri(to_uri)
+    workers = ucfg.get("max_workers", max_workers)
+    shards = ucfg.get("list_shards", list_shards)
+    dry_run_val = ucfg.get("dry_run", dry_run)
+    metrics_file = ucfg.get("metrics", metrics_path)
+    tc = _transfer_from_cfg(cfg, multipart_threshold_mb, part_size_mb, part_workers, None)
+    s3 = _client_from_cfg(
+        cfg, ctx.obj,
+        max_workers=workers,
+        transfer_config=tc or make_transfer_config(),
+        list_shards=shards,
+    )
+
+    res = upload_by_mask(
+        s3,
+        src_root=src,
+        bucket=bucket,
+        prefix=prefix,
+        suffix=(suffix if suffix is not None else ucfg.get("suffix", "")),
+        include=_parse_patterns(include if include is not None else ucfg.get("include", None)),
+        exclude=_parse_patterns(exclude if exclude is not None else ucfg.get("exclude", None)),
+        skip_if=(skip_if or ucfg.get("skip_if", "none")).lower(),
+        max_workers=workers,
+        scan_workers=ucfg.get("scan_workers", scan_workers),
+        progress=ucfg.get("progress", progress),
+        dry_run=dry_run_val,
+        list_shards=shards,
+        transfer_config=tc,
+        adaptive=ucfg.get("adaptive", adaptive),
+        metrics=Metrics() if metrics_file else None,
+    )
+
+    st = res["stats"]
+    if dry_run_val:
+        log.info("Planned: %d of %d files (dry-run), Skipped=%d, Dest=s3://%s/%s",
+                 len(st["planned"]), st["total"], st["skipped"], bucket, prefix)
+        return
+
+    log.info(
+        "Uploaded=%d Skipped=%d Errors=%d Bytes=%s Dest=s3://%s/%s",
+        st["uploaded"], st["skipped"], st["errors_count"], human_bytes(st["total_bytes"]), bucket, prefix,
+    )
+    _echo_concurrency(st)
+    _echo_metrics(st, metrics_file, "upload")
+
+    if show_errors:
+        for e in res["errors"]:
+            typer.echo(f"[ERROR] {e}")
+
+    if res["errors"]:
+        raise typer.Exit(code=1)
+
+# ---------------- RM ----------------
+@app.command("rm")
+def cmd_rm(
+    ctx: typer.Context,
+    target: Optional[str] = typer.Option(None, "--src", help="S3 URI whose objects are deleted (e.g. s3://bucket/tmp/)"),
+    suffix: Optional[str] = typer.Option(None, help="Suffix filter (e.g. .tmp)"),
+    include: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to include"),
+    exclude: Optional[str] = typer.Option(None, help="Comma-separated glob patterns to exclude"),
+    dry_run: bool = typer.Option(False, "--dry-run/--no-dry-run", help="List matching keys; delete nothing"),
+    max_workers: int = typer.Option(8, help="Delete batches in flight"),
+    batch_size: int = typer.Option(1000, help="Keys per delete request (<=1000)"),
+    retries: int = typer.Option(3, help="Retries for keys that fail with a transient error"),
+    progress: bool = typer.Option(False, "--progress/--no-progress", help="Show progress bar"),
+    list_shards: int = typer.Option(1, help="Parallel listing paginators (1 = serial)"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow batches in flight up to --max-workers, back off on S3 throttling"),
+    metrics_path: Optional[str] = typer.Option(None, "--metrics", help="Write request metrics to this file (.prom = Prometheus textfile, else JSON)"),
+    show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print failed keys"),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
+):
+    cfg = _load_cfg(config)
+    rcfg = (cfg.get("rm") or {}) if cfg else {}
+
+    uri = target or rcfg.get("src")
+    if not uri:
+        raise typer.BadParameter("Provide --src or set rm.src in config.yaml")
+    bucket, prefix = parse_s3_uri(uri)
+    workers = rcfg.get("max_workers", max_workers)
+    shards = rcfg.get("list_shards", list_shards)
+    dry_run_val = rcfg.get("dry_run", dry_run)
+    metrics_file = rcfg.get("metrics", metrics_path)
+    s3 = _client_from_cfg(cfg, ctx.obj, max_workers=workers, list_shards=shards)
+
+    res = delete_by_mask(
+        s3,
+        bucket,
+        prefix=prefix,
+        suffix=(suffix if suffix is not None else rcfg.get("suffix", "")),
+        include=_parse_patterns(include if include is not None else rcfg.get("include", None)),
+        exclude=_parse_patterns(exclude if exclude is not None else rcfg.get("exclude", None)),
+        dry_run=dry_run_val,
+        max_workers=workers,
+        batch_size=rcfg.get("batch_size", batch_size),
+        list_shards=shards,
+        progress=rcfg.get("progress", progress),
+        adaptive=rcfg.get("adaptive", adaptive),
+        retries=rcfg.get("retries", retries),
+        metrics=Metrics() if metrics_file else None,
+    )
+
+    if dry_run_val:
+        for key in res["deleted"]:
+            typer.echo(f"[DRY-RUN] {key}")
+        typer.echo(f"Would delete: {len(res['deleted'])}")
+        return
+
+    typer.echo(f"Deleted: {len(res['deleted'])}, Errors: {len(res['errors'])}")
+    _echo_concurrency(res["stats"])
+    _echo_metrics(res["stats"], metrics_file, "rm")
+
+    if show_errors:
+        for e in res["errors"]:
+            typer.echo(f"[DELETE ERROR] {e}")
+
+    if res["errors"]:
+        raise typer.Exit(code=1)
+
+
+# ---------------- RETRY ----------------
+@app.command("retry")
+def cmd_retry(
+    ctx: typer.Context,
+    source: str = typer.Option(..., "--from", help="--results file (JSONL or .csv) of an earlier run"),
+    all_errors: bool = typer.Option(False, "--all/--retryable-only", help="Also retry failures that don't look transient"),
+    dry_run: bool = typer.Option(False, "--dry-run/--no-dry-run", help="List what would be retried; do nothing"),
+    max_workers: int = typer.Option(8, help="Parallel workers"),
+    progress: bool = typer.Option(False, "--progress/--no-progress", help="Show progress bar"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Grow workers up to --max-workers, back off on S3 throttling"),
+    results_path: Optional[str] = typer.Option(None, "--results", help="Stream outcomes to this JSONL (or .csv) file instead of memory"),
+    show_errors: bool = typer.Option(False, "--show-errors/--no-show-errors", help="Print items that failed again"),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to YAML config"),
+):
+    """
+    Re-run only the failed items of an earlier sync/move/download run, from
+    its --results file; nothing is listed again.
+    """
+    cfg = _load_cfg(config)
+    try:
+        failures = read_failures(source)
+    except (OSError, ValueError) as e:
+        raise typer.BadParameter(f"Cannot read {source}: {e}")
+    s3 = _client_from_cfg(cfg, ctx.obj, max_workers=max_workers)
+
+    sink = sink_for_path(results_path) if results_path else None
+    try:
+        res = retry_failures(
+            s3,
+            failures,
+            retryable_only=not all_errors,
+            max_workers=max_workers,
+            progress=progress,
+            dry_run=dry_run,
+            adaptive=adaptive,
+            sink=sink,
+        )
+    finally:
+        if sink is not None:
+            sink.close()
+
+    st = res["stats"]
+    if dry_run:
+        for item in res["retried"]:
+            typer.echo(f"[DRY-RUN] {item if isinstance(item, str) else ' -> '.join(item)}")
+        typer.echo(f"Would retry: {st['total']}, Skipped (not retryable): {st['skipped']}")
+        return
+
+    typer.echo(f"Retried: {st['retried']}, Errors: {st['errors_count']}, Skipped (not retryable): {st['skipped']}")
+    _echo_concurrency(st)
+
+    if show_errors:
+        for e in res["errors"]:
+            typer.echo(f"[RETRY ERROR] {e}")
+
+    if st["errors_count"]:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,338 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from .utils import prefix_group
+
+# Error codes S3 (and the AWS SDKs) use to ask clients to slow down.
+THROTTLE_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "503",
+}
+
+
+def is_throttle(exc: BaseException) -> bool:
+    """True for a ClientError that is S3 throttling (503 / SlowDown)."""
+    if not isinstance(exc, ClientError):
+        return False
+    err = exc.response.get("Error", {}) or {}
+    status = (exc.response.get("ResponseMetadata", {}) or {}).get("HTTPStatusCode")
+    return err.get("Code") in THROTTLE_CODES or status == 503
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight requests.
+
+    Every `limit` successful tasks with healthy latency add `increase` to the
+    limit; a throttling response (503 / SlowDown, seen on any attempt including
+    ones botocore retries) multiplies it by `decrease`, at most once per
+    `cooldown` seconds so one burst of throttles counts as one signal.
+    Latency is unhealthy when its moving average exceeds latency_factor times
+    the lowest average seen; the limit then holds instead of growing.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        latency_factor: float = 3.0,
+    ):
+        self.min_limit = max(int(min_limit), 1)
+        self.max_limit = max(int(max_limit), self.min_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.latency_factor = latency_factor
+        self._limit = float(min(max(int(initial), self.min_limit), self.max_limit))
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_decrease = float("-inf")
+        self._ewma: Optional[float] = None
+        self._floor: Optional[float] = None
+        self.throttles = 0
+        self.errors = 0
+        self.successes = 0
+        self._watching = 0
+        self.samples: List[Tuple[float, int]] = [(0.0, self.current)]
+
+    @property
+    def current(self) -> int:
+        return int(self._limit)
+
+    def _set(self, value: float) -> None:
+        before = self.current
+        self._limit = min(max(value, float(self.min_limit)), float(self.max_limit))
+        if self.current != before:
+            self.samples.append((round(time.monotonic() - self._start, 3), self.current))
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            self.successes += 1
+            self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+            if self._floor is None or self._ewma < self._floor:
+                self._floor = self._ewma
+            if self._ewma <= self.latency_factor * self._floor:
+                self._set(self._limit + self.increase / self._limit)
+
+    def on_error(self, exc: BaseException) -> None:
+        if is_throttle(exc):
+            # A watched client already reported this attempt via needs-retry.
+            if not self._watching:
+                self.on_throttle()
+            return
+        with self._lock:
+            self.errors += 1
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self._set(self._limit * self.decrease)
+
+    def _on_needs_retry(self, response=None, **kwargs) -> None:
+        # botocore emits needs-retry after every attempt; returning None
+        # leaves the retry decision to the client's retry handler.
+        if not response:
+            return None
+        http, parsed = response
+        code = ((parsed or {}).get("Error", {}) or {}).get("Code")
+        if getattr(http, "status_code", None) == 503 or code in THROTTLE_CODES:
+            self.on_throttle()
+        return None
+
+    @contextmanager
+    def watch(self, s3_client):
+        """Count throttled attempts seen by s3_client, including retried ones."""
+        events = s3_client.meta.events
+        events.register("needs-retry.s3", self._on_needs_retry)
+        self._watching += 1
+        try:
+            yield self
+        finally:
+            self._watching -= 1
+            events.unregister("needs-retry.s3", self._on_needs_retry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "final": self.current,
+                "min": min(v for _, v in self.samples),
+                "max": max(v for _, v in self.samples),
+                "throttles": self.throttles,
+                "errors": self.errors,
+                "samples": list(self.samples),
+            }
+
+
+# S3's documented request rates per partitioned prefix.
+WRITE_RATE_PER_PREFIX = 3500
+READ_RATE_PER_PREFIX = 5500
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, holding at most `burst` (default: one second's
+    worth, and never less than one token, so rates below 1/s still get one
+    dispatch every 1/rate seconds). Not thread-safe; PrefixScheduler uses it from the dispatching thread.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.capacity = max(float(burst or rate), 1.0)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def try_take(self, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until one token is available."""
+        self._refill(time.monotonic() if now is None else now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+class PrefixScheduler:
+    """
+    Reorders work so no single key prefix takes all the requests.
+
+    schedule() buffers up to `window` pending items, groups them by the first
+    `depth` segments of key(item) (utils.prefix_group, as group_keys_by_prefix)
+    and yields them round-robin across groups. With `rate`, each group is
+    also held to that many dispatches per second: groups out of tokens are
+    skipped, and the scheduler only sleeps when every buffered group is.
+    Dispatch is throttled, not workers, so hot prefixes never tie up threads.
+    Rates count tasks (one per object); a multipart copy issues more requests.
+    """
+
+    def __init__(self, depth: int = 1, rate: Optional[float] = None, window: int = 5000, burst: Optional[float] = None):
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.depth = max(int(depth), 1)
+        self.rate = rate
+        self.burst = burst
+        self.window = max(int(window), 1)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.groups_seen = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _bucket(self, group: str) -> TokenBucket:
+        b = self._buckets.get(group)
+        if b is None:
+            b = self._buckets[group] = TokenBucket(self.rate, self.burst)
+        return b
+
+    def schedule(self, items: Iterable[Any], key: Callable[[Any], str]) -> Iterator[Any]:
+        groups: Dict[str, deque] = {}  # insertion order is the round-robin order
+        seen = set()
+        buffered = 0
+        it = iter(items)
+        exhausted = False
+        while True:
+            while not exhausted and buffered < self.window:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    exhausted = True
+                    break
+                g = prefix_group(key(item), self.depth)
+                if g not in seen:
+                    seen.add(g)
+                    self.groups_seen += 1
+                groups.setdefault(g, deque()).append(item)
+                buffered += 1
+            if not groups:
+                return
+
+            dispatched = False
+            for g in list(groups):
+                if self.rate and not self._bucket(g).try_take():
+                    continue
+                q = groups[g]
+                yield q.popleft()
+                buffered -= 1
+                dispatched = True
+                if not q:
+                    del groups[g]
+            if not dispatched:
+                delay = min(self._bucket(g).wait_time() for g in groups)
+                self.waits += 1
+                self.wait_seconds += delay
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "rate": self.rate,
+            "groups": self.groups_seen,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+def prefix_scheduler_for(depth: int = 0, rate: Optional[float] = None) -> Optional[PrefixScheduler]:
+    """PrefixScheduler for depth/rate job options, or None (listing order) when neither is set."""
+    if not depth and not rate:
+        return None
+    return PrefixScheduler(depth=depth or 1, rate=rate)
+
+
+@contextmanager
+def limiter_scope(s3_client, adaptive: bool = False, max_workers: int = 8, limiter: Optional[AdaptiveLimiter] = None):
+    """
+    Yield the limiter for one job: the given one, a new AdaptiveLimiter that
+    starts at min(8, max_workers) and may grow to max_workers when adaptive
+    is set, or None (static max_workers). The limiter watches s3_client for
+    throttling while the scope is open.
+    """
+    if limiter is None and adaptive:
+        workers = max(int(max_workers), 1)
+        limiter = AdaptiveLimiter(initial=min(8, workers), max_limit=workers)
+    if limiter is None:
+        yield None
+        return
+    with limiter.watch(s3_client):
+        yield limiter
+
+
+def bounded_imap(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 8,
+    max_in_flight: Optional[int] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run fn over items on a thread pool, pulling items lazily and keeping at
+    most max_in_flight (default 2 * max_workers) tasks submitted at once.
+    Yields (item, result, error) as tasks complete; a failing task does not
+    stop the others.
+    With a limiter, in-flight tasks follow limiter.current instead (threads are
+    sized for limiter.max_limit) and every task reports its latency or error.
+    """
+    workers = max(int(max_workers), 1)
+    limit = max(int(max_in_flight or workers * 2), 1)
+    def _timed(item):
+        t0 = time.monotonic()
+        try:
+            result = fn(item)
+        except BaseException as e:
+            limiter.on_error(e)
+            raise
+        limiter.on_success(time.monotonic() - t0)
+        return result
+
+    if limiter is not None:
+        workers = max(workers, limiter.max_limit)
+        call = _timed
+    else:
+        call = fn
+
+    it = iter(items)
+    pending = {}
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        while True:
+            cap = limiter.current if limiter is not None else limit
+            while not exhausted and len(pending) < cap:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[ex.submit(call, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                item = pending.pop(f)
+                err = f.exception()
+                yield item, (None if err is not None else f.result()), err
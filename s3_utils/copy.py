@@ -1,32 +1,91 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from .core import list_objects, list_prefix_names
-
-def copy_object(s3_client, source_bucket, source_key, target_bucket, target_key):
-    s3_client.copy({'Bucket': source_bucket, 'Key': source_key}, target_bucket, target_key)
-
-def _copy_prefix(s3_client, source_bucket, target_bucket, src_prefix, dst_prefix, max_workers=8):
-    if source_bucket == target_bucket and src_prefix.rstrip("/") == dst_prefix.rstrip("/"):
-        raise ValueError("src_prefix and dst_prefix must differ")
-
-    def dst_key_for(key: str) -> str:
-        suffix = key[len(src_prefix):].lstrip("/")
-        return f"{dst_prefix}{suffix}"
-
-    oks = 0
-    errs = 0
-    futures = []
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        for key in list_objects(s3_client, source_bucket, prefix=src_prefix):
-            futures.append(ex.submit(
-                copy_object, s3_client, source_bucket, key, target_bucket, dst_key_for(key)
-            ))
-        for f in as_completed(futures):
-            try:
-                f.result()
-                oks += 1
-            except Exception:
-                errs += 1
-    return {"copied": oks, "errors": errs}
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+from .concurrency import bounded_imap, limiter_scope
+from .core import ObjectRecord, list_object_records, list_prefix_names
+from .errors import ErrorRecord
+from .metrics import metrics_scope
+from .sinks import ListSink
+from .transfer import COPY_OBJECT_MAX_SIZE, copier_scope
+from .utils import compile_patterns, prefetch_many, prefixes_overlap
+
+def copy_object(
+    s3_client, source_bucket, source_key, target_bucket, target_key, extra_args=None, size=None, copier=None,
+    transfer_config=None
+):
+    """
+    Server-side copy of one object. With a MultipartCopier, large objects are copied as
+    parallel UploadPartCopy parts on its shared pool. Without one, a known size (e.g. from
+    list_object_records) up to 5 GiB is a single CopyObject; otherwise boto3's managed
+    copy is used (with transfer_config), which HEADs the source to size it first.
+    """
+    if copier is not None:
+        copier.copy(source_bucket, source_key, target_bucket, target_key, size=size, extra_args=extra_args)
+        return
+    source = {'Bucket': source_bucket, 'Key': source_key}
+    if size is not None and size <= COPY_OBJECT_MAX_SIZE:
+        s3_client.copy_object(CopySource=source, Bucket=target_bucket, Key=target_key, **(extra_args or {}))
+    else:
+        s3_client.copy(source, target_bucket, target_key, ExtraArgs=extra_args, Config=transfer_config)
+
+def _copy_prefixes(
+    s3_client, jobs, max_workers=8, list_shards=1, list_workers=8, copier=None, transfer_config=None, limiter=None,
+    matcher=None, dry_run=False, progress=False, metrics=None
+):
+    """
+    Copy many prefixes as one job. jobs are (label, source_bucket, src_prefix, target_bucket, dst_prefix);
+    up to list_workers source prefixes are listed concurrently and every object feeds a single copy pool,
+    so small folders don't pay their listing latency one after another. Returns {label: {"copied", "errors"}}.
+    matcher(key) filters source keys; with dry_run, "copied" counts what would be copied.
+    Copied objects (and sizes) are counted into metrics; progress shows one bar for the whole job.
+    """
+    summary = {}
+    for label, source_bucket, src_prefix, target_bucket, dst_prefix in jobs:
+        if source_bucket == target_bucket and src_prefix.rstrip("/") == dst_prefix.rstrip("/"):
+            raise ValueError("src_prefix and dst_prefix must differ")
+        summary[label] = {"copied": 0, "errors": 0}
+
+    def _tasks(label, source_bucket, src_prefix, target_bucket, dst_prefix):
+        records = list_object_records(s3_client, source_bucket, prefix=src_prefix, shards=list_shards)
+        if prefixes_overlap(source_bucket, src_prefix, target_bucket, dst_prefix):
+            records = list(records)  # copies would land inside the listing in progress
+        for rec in records:
+            if matcher and not matcher(rec.key):
+                continue
+            yield label, source_bucket, rec, target_bucket, f"{dst_prefix}{rec.key[len(src_prefix):].lstrip('/')}"
+
+    with copier_scope(s3_client, copier, transfer_config) as job_copier:
+        def _do(task):
+            _, source_bucket, rec, target_bucket, dst_key = task
+            if dry_run:
+                return
+            copy_object(
+                s3_client, source_bucket, rec.key, target_bucket, dst_key,
+                size=rec.size, copier=job_copier
+            )
+
+        bar = tqdm(desc="Copy", unit="obj") if progress else None
+        tasks = prefetch_many((_tasks(*job) for job in jobs), workers=list_workers)
+        for task, _, err in bounded_imap(_do, tasks, max_workers=max_workers, limiter=limiter):
+            summary[task[0]]["copied" if err is None else "errors"] += 1
+            if err is None and metrics is not None and not dry_run:
+                metrics.count(1, task[2].size)
+            if bar is not None:
+                bar.update(1)
+        if bar is not None:
+            bar.close()
+    return summary
+
+def _copy_prefix(
+    s3_client, source_bucket, target_bucket, src_prefix, dst_prefix, max_workers=8, list_shards=1, copier=None,
+    transfer_config=None, limiter=None
+):
+    jobs = [(src_prefix, source_bucket, src_prefix, target_bucket, dst_prefix)]
+    return _copy_prefixes(
+        s3_client, jobs, max_workers=max_workers, list_shards=list_shards, copier=copier,
+        transfer_config=transfer_config, limiter=limiter
+    )[src_prefix]
 
 def copy_common_and_addon_from_roots(
     s3_client,
@@ -35,48 +94,162 @@ def copy_common_and_addon_from_roots(
     ref_root_prefix,
     common_dst_root_prefix,
     addon_dst_root_prefix,
-    max_workers=8
+    max_workers=8,
+    list_shards=1,
+    copier=None,
+    transfer_config=None,
+    adaptive=False,
+    limiter=None,
+    list_workers=8,
+    include=None,
+    exclude=None,
+    dry_run=False,
+    progress=False,
+    metrics=None
 ):
-    src_names = list_prefix_names(s3_client, bucket, src_root_prefix)
-    ref_names = list_prefix_names(s3_client, bucket, ref_root_prefix)
+    """
+    Copy every folder directly under src_root_prefix: those also present under ref_root_prefix go to
+    common_dst_root_prefix, the rest to addon_dst_root_prefix, all as one _copy_prefixes job.
+    With a metrics.Metrics, summary["metrics"] has its report for the job.
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        src_names, ref_names = ex.map(lambda p: list_prefix_names(s3_client, bucket, p), [src_root_prefix, ref_root_prefix])
 
     common = sorted(src_names & ref_names)
     addon  = sorted(src_names - ref_names)
 
-    summary = {"common": {}, "addon": {}, "common_count": len(common), "addon_count": len(addon)}
+    jobs = [
+        (("common", name), bucket, f"{src_root_prefix}{name}/", bucket, f"{common_dst_root_prefix}{name}/")
+        for name in common
+    ] + [
+        (("addon", name), bucket, f"{src_root_prefix}{name}/", bucket, f"{addon_dst_root_prefix}{name}/")
+        for name in addon
+    ]
 
-    for name in common:
-        res = _copy_prefix(
-            s3_client,
-            bucket, bucket,
-            f"{src_root_prefix}{name}/",
-            f"{common_dst_root_prefix}{name}/",
-            max_workers=max_workers
+    with limiter_scope(s3_client, adaptive, max_workers, limiter) as job_limiter, metrics_scope(s3_client, metrics):
+        results = _copy_prefixes(
+            s3_client, jobs, max_workers=max_workers, list_shards=list_shards, list_workers=list_workers,
+            copier=copier, transfer_config=transfer_config, limiter=job_limiter,
+            matcher=compile_patterns(includes=include, excludes=exclude) if (include or exclude) else None,
+            dry_run=dry_run, progress=progress, metrics=metrics
         )
-        summary["common"][name] = res
-
-    for name in addon:
-        res = _copy_prefix(
-            s3_client,
-            bucket, bucket,
-            f"{src_root_prefix}{name}/",
-            f"{addon_dst_root_prefix}{name}/",
-            max_workers=max_workers
-        )
-        summary["addon"][name] = res
 
+    summary = {"common": {}, "addon": {}, "common_count": len(common), "addon_count": len(addon)}
+    for (group, name), res in results.items():
+        summary[group][name] = res
+    if job_limiter:
+        summary["concurrency"] = job_limiter.stats()
+    if metrics is not None:
+        summary["metrics"] = metrics.report()
     return summary
 
-def copy_files_by_keys(s3_client, source_bucket, target_bucket, keys, prefix_src='', prefix_dst=''):
-    for key in keys:
-        src_key = key[len(prefix_src):] if prefix_src and key.startswith(prefix_src) else key
-        dst_key = f"{prefix_dst}{src_key}" if prefix_dst else src_key
-        copy_object(s3_client, source_bucket, key, target_bucket, dst_key)
+def _parallel_copy(
+    s3_client, source_bucket, target_bucket, pairs, max_workers=8, progress=False, extra_args=None, copier=None,
+    transfer_config=None, limiter=None, on_copied=None, sink=None, kinds=("copied", "errors"), op="copy",
+    metrics=None
+):
+    """
+    Copy (source, dst_key) pairs concurrently. The source may be a key or an
+    ObjectRecord; records carry the size, so the copy needs no HEAD request.
+    Pairs are consumed lazily with at most 2 * max_workers copies in flight;
+    large objects are split into parts on the copier's shared part pool.
+    With a limiter, copies in flight follow its adaptive limit instead.
+    A failed copy is reported as an ErrorRecord (op: copy, or move for moves) and doesn't stop the rest.
+    on_copied(src, dst_key) is called (on the calling thread) as each copy succeeds.
+    Outcomes go to sink under kinds (copied, errors); returns what it kept as
+    (sorted copied pairs, errors), i.e. everything without a sink.
+    Copied objects (and sizes, for records) are counted into metrics.
+    """
+    out = sink if sink is not None else ListSink()
+    copied_kind, errors_kind = kinds
+
+    bar = tqdm(desc="Copy", unit="obj") if progress else None
+
+    def _do(pair):
+        src, dk = pair
+        rec = src if isinstance(src, ObjectRecord) else None
+        copy_object(
+            s3_client, source_bucket, rec.key if rec else src, target_bucket, dk,
+            extra_args=extra_args, size=rec.size if rec else None, copier=job_copier,
+        )
 
-def copy_by_mask(s3_client, source_bucket, target_bucket, prefix='', suffix='', prefix_dst=''):
-    keys = list(list_objects(s3_client, source_bucket, prefix=prefix, suffix=suffix))
-    copy_files_by_keys(s3_client, source_bucket, target_bucket, keys, prefix_src=prefix, prefix_dst=prefix_dst)
-    return keys
+    with copier_scope(s3_client, copier, transfer_config) as job_copier:
+        for (src, dk), _, err in bounded_imap(_do, pairs, max_workers=max_workers, limiter=limiter):
+            sk = src.key if isinstance(src, ObjectRecord) else src
+            if err is None:
+                out.add(copied_kind, (sk, dk))
+                if metrics is not None:
+                    metrics.count(1, src.size if isinstance(src, ObjectRecord) else None)
+                if on_copied:
+                    on_copied(src, dk)
+            else:
+                out.add(errors_kind, ErrorRecord.from_exception(
+                    op, sk, err, bucket=source_bucket, target=dk, target_bucket=target_bucket
+                ))
+            if bar is not None:
+                bar.update(1)
+
+    if bar is not None:
+        bar.close()
+
+    return sorted(out.get(copied_kind)), out.get(errors_kind)
+
+def copy_files_by_keys(
+    s3_client, source_bucket, target_bucket, keys, prefix_src='', prefix_dst='', max_workers=8, progress=False,
+    extra_args=None, copier=None, transfer_config=None, adaptive=False, metrics=None
+):
+    """
+    Copy the given keys (or ObjectRecords) to target_bucket, replacing prefix_src with prefix_dst.
+    Copies run on max_workers threads; returns {"copied": [(src, dst)], "errors": [ErrorRecord]}.
+    With a metrics.Metrics, the result also has {"stats": {"metrics": report}}.
+    Changed return value: this used to return None and raise on the first failed copy; failed copies
+    are now collected in "errors" and the rest still run, so check res["errors"].
+    """
+    def _pairs():
+        for src in keys:
+            key = src.key if isinstance(src, ObjectRecord) else src
+            rel = key[len(prefix_src):] if prefix_src and key.startswith(prefix_src) else key
+            yield src, f"{prefix_dst}{rel}" if prefix_dst else rel
+
+    with limiter_scope(s3_client, adaptive, max_workers) as limiter, metrics_scope(s3_client, metrics):
+        copied, errors = _parallel_copy(
+            s3_client, source_bucket, target_bucket, _pairs(), max_workers=max_workers, progress=progress,
+            extra_args=extra_args, copier=copier, transfer_config=transfer_config, limiter=limiter,
+            metrics=metrics
+        )
+    if metrics is not None:
+        return {"copied": copied, "errors": errors, "stats": {"metrics": metrics.report()}}
+    return {"copied": copied, "errors": errors}
+
+def copy_by_mask(
+    s3_client, source_bucket, target_bucket, prefix='', suffix='', prefix_dst='', max_workers=8, progress=False,
+    list_shards=1, copier=None, transfer_config=None, adaptive=False, include=None, exclude=None, dry_run=False,
+    metrics=None
+):
+    """
+    Copy objects matching (prefix, suffix) and include/exclude globs to target_bucket/prefix_dst. The listing
+    streams into the copy pool (sizes from the listing, no HEADs); returns the same shape as copy_files_by_keys.
+    With dry_run, "copied" lists the planned (src, dst) pairs and nothing is copied.
+    Changed return value: this used to return the list of matched source keys and raise on the first failed
+    copy; the source keys are now [src for src, _ in res["copied"]] and failures are in res["errors"].
+    """
+    records = list_object_records(s3_client, source_bucket, prefix=prefix, suffix=suffix, shards=list_shards)
+    if include or exclude:
+        matcher = compile_patterns(includes=include, excludes=exclude)
+        records = (rec for rec in records if matcher(rec.key))
+    if dry_run:
+        planned = []
+        for rec in records:
+            rel = rec.key[len(prefix):] if prefix else rec.key
+            planned.append((rec.key, f"{prefix_dst}{rel}"))
+        return {"copied": planned, "errors": []}
+    if prefixes_overlap(source_bucket, prefix, target_bucket, prefix_dst):
+        records = list(records)  # copies would land inside the listing in progress
+    return copy_files_by_keys(
+        s3_client, source_bucket, target_bucket, records, prefix_src=prefix, prefix_dst=prefix_dst,
+        max_workers=max_workers, progress=progress, copier=copier, transfer_config=transfer_config,
+        adaptive=adaptive, metrics=metrics
+    )
 
 def copy_multiple_prefixes(
     s3_client,
@@ -85,12 +258,21 @@ def copy_multiple_prefixes(
     src_prefixes,
     src_root_prefix,
     dst_root_prefix,
-    max_workers=8
+    max_workers=8,
+    list_shards=1,
+    copier=None,
+    transfer_config=None,
+    adaptive=False,
+    limiter=None,
+    list_workers=8
 ):
-    summary = {}
-    for folder in src_prefixes:
-        src_pref = f"{src_root_prefix}{folder}/"
-        dst_pref = f"{dst_root_prefix}{folder}/"
-        res = _copy_prefix(s3_client, source_bucket, target_bucket, src_pref, dst_pref, max_workers=max_workers)
-        summary[folder] = res
-    return summary
+    jobs = [
+        (folder, source_bucket, f"{src_root_prefix}{folder}/", target_bucket, f"{dst_root_prefix}{folder}/")
+        for folder in src_prefixes
+    ]
+    # summary is keyed by folder; pass a limiter to inspect its stats() afterwards
+    with limiter_scope(s3_client, adaptive, max_workers, limiter) as job_limiter:
+        return _copy_prefixes(
+            s3_client, jobs, max_workers=max_workers, list_shards=list_shards, list_workers=list_workers,
+            copier=copier, transfer_config=transfer_config, limiter=job_limiter
+        )
@@ -1,10 +1,29 @@
 from __future__ import annotations
-from typing import Iterator, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import heapq
+import queue
+import threading
 import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
 
+# botocore's own default for max_pool_connections.
+DEFAULT_POOL_CONNECTIONS = 10
+
+
+def pool_size_for(max_workers: int = 0, transfer_config=None, extra: int = 0) -> int:
+    """
+    Connections needed so that object workers, the part/range threads of a
+    boto3 TransferConfig (max_concurrency) and `extra` threads (e.g. listing
+    shards) never wait on the HTTP connection pool.
+    """
+    parts = getattr(transfer_config, "max_concurrency", 0) or 0
+    return max(DEFAULT_POOL_CONNECTIONS, int(max_workers or 0) + int(parts) + int(extra or 0))
+
+
 def get_s3_client(
     aws_profile: Optional[str] = None,
     aws_access_key_id: Optional[str] = None,
@@ -14,14 +33,22 @@ def get_s3_client(
     retries_mode: str = "standard",
     connect_timeout: int = 10,
     read_timeout: int = 60,
+    max_pool_connections: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    transfer_config=None,
 ):
     """
     Create a boto3 S3 client with retries and timeouts applied.
+    The connection pool is max_pool_connections if given, otherwise sized by
+    pool_size_for(max_workers, transfer_config) so threads don't contend for it.
     """
+    if max_pool_connections is None:
+        max_pool_connections = pool_size_for(max_workers or 0, transfer_config)
     cfg = Config(
         retries={"max_attempts": retries_max_attempts, "mode": retries_mode},
         connect_timeout=connect_timeout,
         read_timeout=read_timeout,
+        max_pool_connections=max_pool_connections,
     )
     if aws_profile:
         session = boto3.Session(profile_name=aws_profile, region_name=region_name)
@@ -34,10 +61,21 @@ def get_s3_client(
     return session.client("s3", config=cfg)
 
 
-def list_objects(s3_client, bucket: str, prefix: str = "", suffix: str = "") -> Iterator[str]:
+def list_objects(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    shards: int = 1,
+) -> Iterator[str]:
     """
     Yield object keys in a bucket filtered by prefix/suffix.
+    With shards > 1 the listing is fanned out over parallel paginators
+    (see list_objects_parallel) and keys arrive in no particular order.
     """
+    if shards > 1:
+        yield from list_objects_parallel(s3_client, bucket, prefix=prefix, suffix=suffix, shards=shards)
+        return
     paginator = s3_client.get_paginator("list_objects_v2")
     for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
         for obj in page.get("Contents", []) or []:
@@ -48,6 +86,241 @@ def list_objects(s3_client, bucket: str, prefix: str = "", suffix: str = "") ->
                 yield key
 
 
+# ---------------- Parallel (sharded) listing ----------------
+# A shard is (prefix, start_after, last_key): list Prefix=prefix, optionally
+# resuming after start_after and stopping once a key sorts past last_key.
+Shard = Tuple[str, Optional[str], Optional[str]]
+
+_SHARD_SPLIT_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_MAX_PROBE_DEPTH = 4
+_SHARD_BUFFER_PAGES = 8
+_DONE = object()
+
+
+def _probe(s3_client, bucket: str, prefix: str) -> Tuple[List[Dict[str, Any]], List[str], bool]:
+    """
+    One delimiter request: (direct objects, common prefixes, truncated).
+    """
+    resp = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter="/")
+    contents = resp.get("Contents", []) or []
+    cps = [cp["Prefix"] for cp in resp.get("CommonPrefixes", []) or [] if cp.get("Prefix")]
+    return contents, cps, bool(resp.get("IsTruncated"))
+
+
+def _range_shards(prefix: str) -> List[Shard]:
+    """
+    Split a flat prefix into StartAfter windows on the first character after it.
+    """
+    bounds = [f"{prefix}{c}" for c in _SHARD_SPLIT_CHARS]
+    shards: List[Shard] = [(prefix, None, bounds[0])]
+    for lo, hi in zip(bounds, bounds[1:]):
+        shards.append((prefix, lo, hi))
+    shards.append((prefix, bounds[-1], None))
+    return shards
+
+
+def plan_shards(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    shards: int = 8,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Tuple[List[Shard], List[Dict[str, Any]]]:
+    """
+    Discover the key space under prefix and split it into independent shards.
+
+    Delimiter probes descend the folder tree breadth-first until there are at
+    least `shards` work units; a level too large for one probe page is split
+    into StartAfter windows instead. Returns (shards sorted by key range,
+    objects already seen by the probes that no shard will list again).
+    """
+    plan: List[Shard] = [(prefix, None, None)]
+    seen: List[Dict[str, Any]] = []
+    for _ in range(_MAX_PROBE_DEPTH):
+        expandable = [s for s in plan if s[1] is None and s[2] is None]
+        if len(plan) >= shards or not expandable:
+            break
+        probe = lambda p: _probe(s3_client, bucket, p)
+        prefixes = [s[0] for s in expandable]
+        results = list(executor.map(probe, prefixes)) if executor else [probe(p) for p in prefixes]
+        plan = [s for s in plan if s[1] is not None or s[2] is not None]
+        for p, (contents, cps, truncated) in zip(prefixes, results):
+            if truncated:
+                plan.extend(_range_shards(p))
+                continue
+            seen.extend(contents)
+            plan.extend((cp, None, None) for cp in cps)
+    plan.sort(key=lambda s: (s[0], s[1] or ""))
+    seen.sort(key=lambda o: o.get("Key") or "")
+    return plan, seen
+
+
+def _iter_shard_pages(s3_client, bucket: str, shard: Shard) -> Iterator[List[Dict[str, Any]]]:
+    prefix, start_after, last_key = shard
+    kwargs: Dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+    if start_after:
+        kwargs["StartAfter"] = start_after
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(**kwargs):
+        contents = page.get("Contents", []) or []
+        if last_key is not None and contents and contents[-1].get("Key", "") > last_key:
+            yield [o for o in contents if o.get("Key", "") <= last_key]
+            return
+        yield contents
+
+
+def _put(q: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def iter_objects_parallel(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    shards: int = 8,
+    ordered: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield raw list_objects_v2 entries under prefix using `shards` concurrent
+    paginators. With ordered=True entries come back in key order (shards are
+    drained one after another while the rest prefetch); otherwise pages are
+    yielded as soon as any paginator produces them.
+    """
+    workers = max(int(shards), 1)
+    stop = threading.Event()
+    ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3list")
+    try:
+        plan, seen = plan_shards(s3_client, bucket, prefix, shards=workers, executor=ex)
+        queues = [queue.Queue(maxsize=_SHARD_BUFFER_PAGES) for _ in plan] if ordered else []
+        shared: "queue.Queue" = queue.Queue(maxsize=_SHARD_BUFFER_PAGES * workers)
+
+        def _run(i: int, shard: Shard) -> None:
+            q = queues[i] if ordered else shared
+            try:
+                for page in _iter_shard_pages(s3_client, bucket, shard):
+                    if page and not _put(q, page, stop):
+                        return
+                _put(q, _DONE, stop)
+            except Exception as e:  # surfaced to the consumer
+                _put(q, e, stop)
+
+        for i, shard in enumerate(plan):
+            ex.submit(_run, i, shard)
+
+        def _drain(q: "queue.Queue", expected: int) -> Iterator[Dict[str, Any]]:
+            done = 0
+            while done < expected:
+                item = q.get()
+                if item is _DONE:
+                    done += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+
+        if ordered:
+            stream = (obj for q in queues for obj in _drain(q, 1))
+            yield from heapq.merge(seen, stream, key=lambda o: o.get("Key") or "")
+        else:
+            yield from seen
+            yield from _drain(shared, len(plan))
+    finally:
+        stop.set()
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def list_objects_parallel(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    shards: int = 8,
+    ordered: bool = False,
+) -> Iterator[str]:
+    """
+    Parallel counterpart of list_objects: same filtering, keys from
+    `shards` concurrent paginators merged into one stream.
+    """
+    for obj in iter_objects_parallel(s3_client, bucket, prefix=prefix, shards=shards, ordered=ordered):
+        key = obj.get("Key")
+        if key and key.startswith(prefix) and key.endswith(suffix):
+            yield key
+
+
+# ---------------- Object records ----------------
+class ObjectRecord:
+    """
+    Listing entry with the metadata list_objects_v2 already returns,
+    so callers can skip/compare/set mtime without a HEAD per key.
+    """
+    __slots__ = ("key", "size", "etag", "last_modified", "storage_class")
+
+    def __init__(
+        self,
+        key: str,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        storage_class: Optional[str] = None,
+    ):
+        self.key = key
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.storage_class = storage_class
+
+    @classmethod
+    def from_listing(cls, obj: Dict[str, Any]) -> "ObjectRecord":
+        return cls(
+            key=obj["Key"],
+            size=obj.get("Size"),
+            etag=(obj.get("ETag") or "").strip('"') or None,
+            last_modified=obj.get("LastModified"),
+            storage_class=obj.get("StorageClass"),
+        )
+
+    def __repr__(self) -> str:
+        return f"ObjectRecord(key={self.key!r}, size={self.size!r}, etag={self.etag!r})"
+
+
+def list_object_records(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    shards: int = 1,
+    ordered: bool = False,
+    start_after: str = "",
+) -> Iterator[ObjectRecord]:
+    """
+    Like list_objects, but yield ObjectRecord (key, size, etag, last_modified,
+    storage_class) instead of bare keys. Serial listing is always in key
+    order; with shards > 1 pass ordered=True to keep that guarantee.
+    start_after lists only keys sorting after it (S3 StartAfter); such
+    listings are serial.
+    """
+    if shards > 1 and not start_after:
+        objs = iter_objects_parallel(s3_client, bucket, prefix=prefix, shards=shards, ordered=ordered)
+    else:
+        paginator = s3_client.get_paginator("list_objects_v2")
+        kwargs = {"StartAfter": start_after} if start_after else {}
+        objs = (
+            obj
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix, **kwargs)
+            for obj in page.get("Contents", []) or []
+        )
+    for obj in objs:
+        key = obj.get("Key")
+        if key and key.startswith(prefix) and key.endswith(suffix):
+            yield ObjectRecord.from_listing(obj)
+
+
 def list_prefixes(s3_client, bucket: str, root_prefix: str = "", depth: int = 1) -> Set[str]:
     """
     Return unique logical prefixes (first `depth` path components) under root_prefix.
@@ -0,0 +1,270 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import queue
+import threading
+import time
+
+from tqdm import tqdm
+
+from .concurrency import THROTTLE_CODES, AdaptiveLimiter, bounded_imap, limiter_scope
+from .core import list_objects
+from .errors import RETRYABLE_CODES, ErrorRecord
+from .metrics import Metrics, metrics_scope
+from .utils import chunked, compile_patterns
+
+DELETE_BATCH_MAX = 1000
+# Batches in flight for deletes issued alongside another job (move, sync).
+DEFAULT_DELETE_WORKERS = 4
+# Per-key delete_objects error codes worth sending again.
+RETRYABLE_DELETE_CODES = RETRYABLE_CODES
+
+DeleteFn = Callable[[List[str]], Tuple[List[str], List[ErrorRecord]]]
+OnBatch = Callable[[List[str], List[str], List[ErrorRecord]], None]
+
+
+def delete_batch(
+    s3_client,
+    bucket: str,
+    keys: List[str],
+    retries: int = 3,
+    backoff: float = 0.2,
+    limiter: Optional[AdaptiveLimiter] = None,
+) -> Tuple[List[str], List[ErrorRecord]]:
+    """
+    Delete up to 1000 keys with quiet delete_objects calls; returns (deleted,
+    errors). Quiet responses list only failures, so
+    every other key was deleted. Keys failing with a transient code
+    (RETRYABLE_DELETE_CODES) are sent again on their own, up to `retries`
+    times with exponential backoff; per-key throttling is reported to limiter.
+    A failed call (already retried by botocore) fails every key in it.
+    """
+    deleted: List[str] = []
+    errors: List[ErrorRecord] = []
+    todo = list(keys)
+    attempt = 0
+    while todo:
+        try:
+            resp = s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": k} for k in todo], "Quiet": True},
+            )
+        except Exception as e:
+            errors.extend(ErrorRecord.from_exception("delete", k, e, bucket=bucket) for k in todo)
+            break
+        failed = resp.get("Errors", []) or []
+        failed_keys = {err.get("Key") for err in failed}
+        deleted.extend(k for k in todo if k not in failed_keys)
+        retry: List[str] = []
+        throttled = False
+        for err in failed:
+            if attempt < retries and err.get("Code") in RETRYABLE_DELETE_CODES:
+                retry.append(err.get("Key"))
+                throttled = throttled or err.get("Code") in THROTTLE_CODES
+            else:
+                errors.append(ErrorRecord.from_delete_error(err, bucket=bucket, attempts=attempt + 1))
+        if not retry:
+            break
+        if limiter is not None and throttled:
+            limiter.on_throttle()
+        time.sleep(backoff * (2 ** attempt))
+        attempt += 1
+        todo = retry
+    return deleted, errors
+
+
+def _run_batches(
+    delete_fn: DeleteFn,
+    keys: Iterable[str],
+    batch_size: int = DELETE_BATCH_MAX,
+    max_workers: int = 8,
+    limiter: Optional[AdaptiveLimiter] = None,
+    on_batch: Optional[OnBatch] = None,
+    collect: bool = True,
+    bucket: Optional[str] = None,
+) -> Tuple[List[str], List[ErrorRecord]]:
+    size = min(max(int(batch_size), 1), DELETE_BATCH_MAX)
+    deleted: List[str] = []
+    errors: List[ErrorRecord] = []
+    for chunk, res, err in bounded_imap(delete_fn, chunked(keys, size), max_workers=max_workers, limiter=limiter):
+        ok, errs = res if err is None else ([], [ErrorRecord.from_exception("delete", k, err, bucket=bucket) for k in chunk])
+        if collect:
+            deleted.extend(ok)
+            errors.extend(errs)
+        if on_batch:
+            on_batch(chunk, ok, errs)
+    return deleted, errors
+
+
+def delete_keys(
+    s3_client,
+    bucket: str,
+    keys: Iterable[str],
+    batch_size: int = DELETE_BATCH_MAX,
+    max_workers: int = 8,
+    limiter: Optional[AdaptiveLimiter] = None,
+    retries: int = 3,
+    on_batch: Optional[OnBatch] = None,
+    collect: bool = True,
+) -> Tuple[List[str], List[ErrorRecord]]:
+    """
+    Delete keys of one bucket in batch_size (<= 1000) batches, with up to
+    max_workers batches in flight (limiter.current with a limiter). keys are
+    consumed lazily, so a listing can stream straight into deletes.
+    on_batch(chunk, deleted, errors) runs on the calling thread per batch.
+    Returns (deleted, errors); both empty with collect=False, for callers
+    that take the outcomes from on_batch.
+    """
+    return _run_batches(
+        lambda chunk: delete_batch(s3_client, bucket, chunk, retries=retries, limiter=limiter),
+        keys, batch_size=batch_size, max_workers=max_workers, limiter=limiter, on_batch=on_batch,
+        collect=collect, bucket=bucket,
+    )
+
+
+class DeleteQueue:
+    """
+    Push-style front end to the batch engine for jobs that find keys to
+    delete while doing something else (move, sync): put() keys from one
+    thread and a background thread deletes them in concurrent batches of
+    batch_size with delete_fn(keys) -> (deleted, errors). put() blocks once
+    `backlog` keys are waiting, so slow deletes hold back the producer rather
+    than buffering without bound. close() (or leaving the with block) waits
+    for the remaining batches and returns (deleted, errors) (empty with
+    collect=False). bucket is recorded in the errors of batches whose
+    delete_fn raised.
+    """
+
+    _END = object()
+
+    def __init__(
+        self,
+        delete_fn: DeleteFn,
+        batch_size: int = DELETE_BATCH_MAX,
+        max_workers: int = DEFAULT_DELETE_WORKERS,
+        limiter: Optional[AdaptiveLimiter] = None,
+        on_batch: Optional[OnBatch] = None,
+        backlog: int = 10 * DELETE_BATCH_MAX,
+        collect: bool = True,
+        bucket: Optional[str] = None,
+    ):
+        self._q: queue.Queue = queue.Queue(maxsize=max(int(backlog), 1))
+        self._result: Tuple[List[str], List[ErrorRecord]] = ([], [])
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._ended = False
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(delete_fn, batch_size, max_workers, limiter, on_batch, collect, bucket),
+            name="s3delete",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "DeleteQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _keys(self):
+        while True:
+            key = self._q.get()
+            if key is self._END:
+                self._ended = True
+                return
+            yield key
+
+    def _run(self, delete_fn, batch_size, max_workers, limiter, on_batch, collect, bucket) -> None:
+        try:
+            self._result = _run_batches(
+                delete_fn, self._keys(), batch_size=batch_size, max_workers=max_workers,
+                limiter=limiter, on_batch=on_batch, collect=collect, bucket=bucket,
+            )
+        except BaseException as e:
+            self._error = e
+            # keep draining so a blocked put() can finish
+            while not self._ended and self._q.get() is not self._END:
+                pass
+
+    def put(self, key: str) -> None:
+        self._q.put(key)
+
+    def close(self) -> Tuple[List[str], List[ErrorRecord]]:
+        if not self._closed:
+            self._closed = True
+            self._q.put(self._END)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def delete_by_mask(
+    s3_client,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    dry_run: bool = False,
+    max_workers: int = 8,
+    batch_size: int = DELETE_BATCH_MAX,
+    list_shards: int = 1,
+    progress: bool = False,
+    adaptive: bool = False,
+    retries: int = 3,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, List]:
+    """
+    Delete objects under bucket/prefix matching suffix and include/exclude
+    globs. The listing streams straight into 1000-key delete_objects batches,
+    max_workers of them in flight (adaptive=True grows up to that and backs
+    off on SlowDown, stats["concurrency"]); per-key transient failures are
+    retried (see delete_batch). With dry_run, "deleted" lists the matching
+    keys and nothing is deleted. With a metrics.Metrics, its report for the
+    run is in stats["metrics"].
+    """
+    keys: Iterable[str] = list_objects(s3_client, bucket, prefix=prefix, suffix=suffix, shards=list_shards)
+    if include or exclude:
+        matcher = compile_patterns(includes=include, excludes=exclude)
+        keys = (k for k in keys if matcher(k))
+
+    stats = {
+        "bucket": bucket,
+        "prefix": prefix,
+        "suffix": suffix,
+        "dry_run": dry_run,
+    }
+    if dry_run:
+        planned = sorted(keys)
+        return {"deleted": planned, "errors": [], "stats": {**stats, "total": len(planned)}}
+
+    bar = tqdm(desc="Delete", unit="obj") if progress else None
+
+    def _progress(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        if metrics is not None:
+            metrics.count(len(ok))
+        if bar is not None:
+            bar.update(len(chunk))
+
+    with limiter_scope(s3_client, adaptive, max_workers) as limiter, metrics_scope(s3_client, metrics):
+        deleted, errors = delete_keys(
+            s3_client, bucket, keys, batch_size=batch_size, max_workers=max_workers,
+            limiter=limiter, retries=retries, on_batch=_progress,
+        )
+    if bar is not None:
+        bar.close()
+
+    deleted.sort()
+    return {
+        "deleted": deleted,
+        "errors": errors,
+        "stats": {
+            **stats,
+            "total": len(deleted) + len(errors),
+            "deleted": len(deleted),
+            "errors_count": len(errors),
+            **({"concurrency": limiter.stats()} if limiter else {}),
+            **({"metrics": metrics.report()} if metrics is not None else {}),
+        },
+    }
@@ -1,14 +1,18 @@
 from __future__ import annotations
-from typing import Iterable, List, Tuple, Optional, Dict, Literal
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict, Literal, Union
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from csv import DictWriter
 
 from tqdm import tqdm
 
-from .core import list_objects
+from .concurrency import AdaptiveLimiter, bounded_imap, limiter_scope
+from .core import ObjectRecord, list_object_records
+from .errors import ErrorRecord
+from .metrics import Metrics, metrics_scope
+from .sinks import ListSink, ResultSink
+from .transfer import RangedDownloader, TransferConfig, downloader_scope
 from .utils import (
-    relativize_keys,
     ensure_dir,
     get_s3_head,
     set_mtime,
@@ -25,69 +29,117 @@ def download_file(
     dst_path: str | Path,
     overwrite: bool = False,
     preserve_mtime: bool = False,
+    last_modified: Optional[datetime] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    downloader: Optional[RangedDownloader] = None,
+    size: Optional[int] = None,
+    etag: Optional[str] = None,
 ) -> Path:
+    """
+    Download one object to dst_path. With preserve_mtime, the local mtime is set
+    from last_modified when the caller already has it (e.g. from a listing
+    record), otherwise from a HEAD request.
+    With a RangedDownloader the object is fetched by its engine (size/etag from
+    a listing record save the HEAD); otherwise boto3's managed download is used,
+    tuned by transfer_config.
+    """
     dst = Path(dst_path)
     if dst.exists() and not overwrite:
         return dst
     ensure_dir(dst.parent)
-    s3_client.download_file(bucket, key, str(dst))
+    if downloader is not None:
+        downloader.download(bucket, key, dst, size=size, etag=etag)
+    else:
+        s3_client.download_file(bucket, key, str(dst), Config=transfer_config)
     if preserve_mtime:
-        meta = get_s3_head(s3_client, bucket, key)
-        lm = meta.get("LastModified")
+        lm = last_modified or get_s3_head(s3_client, bucket, key).get("LastModified")
         if lm:
             set_mtime(dst, lm)
     return dst
 
 
+def write_manifest(manifest_path: str | Path, downloaded: Iterable[Tuple[str, Path | str]]) -> None:
+    ensure_dir(Path(manifest_path).parent)
+    with open(manifest_path, "w", newline="", encoding="utf-8") as f:
+        w = DictWriter(f, fieldnames=["key", "local_path"])
+        w.writeheader()
+        for k, p in downloaded:
+            w.writerow({"key": k, "local_path": str(p)})
+
+
 def _parallel_download(
     s3_client,
     bucket: str,
-    pairs: Iterable[Tuple[str, Path]],
+    pairs: Iterable[Tuple[Union[str, ObjectRecord], Path]],
     max_workers: int = 8,
     progress: bool = False,
     overwrite: bool = False,
     preserve_mtime: bool = False,
     skip_if: SkipMode = "none",
-) -> Tuple[List[Tuple[str, Path]], List[str]]:
-    downloaded: List[Tuple[str, Path]] = []
-    errors: List[str] = []
+    transfer_config: Optional[TransferConfig] = None,
+    downloader: Optional[RangedDownloader] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
+) -> Tuple[List[Tuple[str, Path]], List[ErrorRecord]]:
+    """
+    Download (source, local_path) pairs concurrently. The source may be a key
+    or an ObjectRecord; records make skip_if="size" and preserve_mtime free
+    of HEAD requests. Pairs are consumed lazily with at most 2 * max_workers
+    downloads in flight; objects above the threshold are split into Range GETs
+    on the downloader's range pool, shared by all objects of the job.
+    With a limiter, downloads in flight follow its adaptive limit instead.
+    Outcomes ("downloaded" (key, path) / "errors") go to sink; returns what
+    it kept as (downloaded sorted by key, errors), i.e. everything without one.
+    Downloaded objects are counted into metrics.
+    """
+    out = sink if sink is not None else ListSink()
 
-    pairs_list = list(pairs)
-    bar = tqdm(total=len(pairs_list), desc="Download", unit="obj") if progress and pairs_list else None
+    bar = tqdm(desc="Download", unit="obj") if progress else None
 
-    def _do(pair: Tuple[str, Path]) -> Tuple[str, Path] | None:
-        key, dst = pair
+    def _do(pair: Tuple[Union[str, ObjectRecord], Path]) -> Tuple[str, Path] | None:
+        src, dst = pair
+        rec = src if isinstance(src, ObjectRecord) else None
+        key = rec.key if rec else src
         if skip_if != "none" and dst.exists():
             if skip_if == "size":
-                meta = get_s3_head(s3_client, bucket, key)
-                size = meta.get("ContentLength")
+                if rec is not None:
+                    size = rec.size
+                else:
+                    size = get_s3_head(s3_client, bucket, key).get("ContentLength")
                 try:
                     local_size = dst.stat().st_size
                 except Exception:
                     local_size = None
                 if size is not None and local_size == size:
                     return None
-        p = download_file(s3_client, bucket, key, dst, overwrite=overwrite, preserve_mtime=preserve_mtime)
+        p = download_file(
+            s3_client, bucket, key, dst,
+            overwrite=overwrite,
+            preserve_mtime=preserve_mtime,
+            last_modified=rec.last_modified if rec else None,
+            downloader=job_downloader,
+            size=rec.size if rec else None,
+            etag=rec.etag if rec else None,
+        )
         return (key, p)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = [ex.submit(_do, p) for p in pairs_list]
-        for f in as_completed(futs):
-            try:
-                item = f.result()
-                if item is not None:
-                    downloaded.append(item)
-            except Exception as e:
-                errors.append(str(e))
-            finally:
-                if bar:
-                    bar.update(1)
-
-    if bar:
+    with downloader_scope(s3_client, downloader, transfer_config) as job_downloader:
+        for (src, dst), item, err in bounded_imap(_do, pairs, max_workers=max_workers, limiter=limiter):
+            if err is not None:
+                key = src.key if isinstance(src, ObjectRecord) else src
+                out.add("errors", ErrorRecord.from_exception("download", key, err, bucket=bucket, target=str(dst)))
+            elif item is not None:
+                out.add("downloaded", item)
+                if metrics is not None:
+                    metrics.count(1, src.size if isinstance(src, ObjectRecord) else item[1].stat().st_size)
+            if bar is not None:
+                bar.update(1)
+
+    if bar is not None:
         bar.close()
 
-    downloaded.sort(key=lambda x: x[0])
-    return downloaded, errors
+    return sorted(out.get("downloaded"), key=lambda x: x[0]), out.get("errors")
 
 
 def download_by_mask(
@@ -106,25 +158,45 @@ def download_by_mask(
     include: Optional[List[str]] = None,
     exclude: Optional[List[str]] = None,
     manifest_path: Optional[str | Path] = None,
+    list_shards: int = 1,
+    transfer_config: Optional[TransferConfig] = None,
+    downloader: Optional[RangedDownloader] = None,
+    adaptive: bool = False,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
 ) -> Dict[str, List]:
-    keys = [k for k in list_objects(s3_client, bucket, prefix=prefix, suffix=suffix)]
+    """
+    Download objects matching (prefix, suffix) and include/exclude globs under
+    dst_root. adaptive=True treats max_workers as a ceiling: downloads in
+    flight grow while S3 is healthy and back off on 503 SlowDown; the limit
+    over time is reported in stats["concurrency"].
+    With a sink (see sinks.py), downloaded pairs and errors (and with dry_run
+    the "planned" pairs) stream to it instead of the result lists, which stay
+    empty; stats["results"] has the per-kind counts. The manifest needs the
+    in-memory list, so manifest_path cannot be combined with a sink.
+    With a metrics.Metrics, its report for the download is in stats["metrics"].
+    """
+    if sink is not None and manifest_path:
+        raise ValueError("manifest_path needs the in-memory result; write outcomes with the sink instead")
+    records = list_object_records(s3_client, bucket, prefix=prefix, suffix=suffix, shards=list_shards)
     matcher = compile_patterns(includes=include, excludes=exclude) if (include or exclude) else (lambda _: True)
-    keys = [k for k in keys if matcher(k)]
-
-    rel = relativize_keys(keys, prefix)
     dst_root = Path(dst_root)
 
-    pairs: List[Tuple[str, Path]] = []
-    if keep_structure:
-        for r in rel:
-            src_key = f"{prefix}{r}" if prefix else r
-            pairs.append((src_key, dst_root / r))
-    else:
-        for r in rel:
-            src_key = f"{prefix}{r}" if prefix else r
-            pairs.append((src_key, dst_root / Path(r).name))
+    total = 0
+
+    def _pairs() -> Iterator[Tuple[ObjectRecord, Path]]:
+        nonlocal total
+        for rec in records:
+            if not matcher(rec.key):
+                continue
+            r = rec.key[len(prefix):] if prefix else rec.key
+            total += 1
+            yield (rec, dst_root / r if keep_structure else dst_root / Path(r).name)
 
+    out = sink if sink is not None else ListSink()
     if dry_run:
+        for rec, p in _pairs():
+            out.add("planned", (rec.key, str(p)))
         return {
             "downloaded": [],
             "errors": [],
@@ -136,29 +208,31 @@ def download_by_mask(
                 "keep_structure": keep_structure,
                 "overwrite": overwrite,
                 "dry_run": True,
-                "total": len(pairs),
-                "planned": [(k, str(p)) for (k, p) in pairs],
+                "total": total,
+                "planned": out.get("planned"),
+                **({"results": dict(out.counts)} if sink is not None else {}),
             },
         }
 
-    downloaded, errors = _parallel_download(
-        s3_client,
-        bucket,
-        pairs=pairs,
-        max_workers=max_workers,
-        progress=progress,
-        overwrite=overwrite,
-        preserve_mtime=preserve_mtime,
-        skip_if=skip_if,
-    )
+    with limiter_scope(s3_client, adaptive, max_workers) as limiter, metrics_scope(s3_client, metrics):
+        downloaded, errors = _parallel_download(
+            s3_client,
+            bucket,
+            pairs=_pairs(),
+            max_workers=max_workers,
+            progress=progress,
+            overwrite=overwrite,
+            preserve_mtime=preserve_mtime,
+            skip_if=skip_if,
+            transfer_config=transfer_config,
+            downloader=downloader,
+            limiter=limiter,
+            sink=out,
+            metrics=metrics,
+        )
 
     if manifest_path:
-        ensure_dir(Path(manifest_path).parent)
-        with open(manifest_path, "w", newline="", encoding="utf-8") as f:
-            w = DictWriter(f, fieldnames=["key", "local_path"])
-            w.writeheader()
-            for k, p in downloaded:
-                w.writerow({"key": k, "local_path": str(p)})
+        write_manifest(manifest_path, downloaded)
 
     return {
         "downloaded": [(k, str(p)) for (k, p) in downloaded],
@@ -173,8 +247,11 @@ def download_by_mask(
             "dry_run": False,
             "skip_if": skip_if,
             "preserve_mtime": preserve_mtime,
-            "total": len(pairs),
-            "downloaded": len(downloaded),
-            "errors_count": len(errors),
+            "total": total,
+            "downloaded": out.counts.get("downloaded", 0),
+            "errors_count": out.counts.get("errors", 0),
+            **({"concurrency": limiter.stats()} if limiter else {}),
+            **({"results": dict(out.counts)} if sink is not None else {}),
+            **({"metrics": metrics.report()} if metrics is not None else {}),
         },
     }
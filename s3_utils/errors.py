@@ -1,13 +1,119 @@
 from __future__ import annotations
 import logging
 import functools
-from typing import Type, Callable, Any
+from typing import Type, Callable, Any, Dict, Optional
+
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError
+
+from .concurrency import THROTTLE_CODES
 
 class S3UtilsError(Exception): pass
 class S3CopyError(S3UtilsError): pass
 class S3DeleteError(S3UtilsError): pass
 class S3DownloadError(S3UtilsError): pass
 
+# Error codes that usually succeed when the request is simply sent again.
+RETRYABLE_CODES = THROTTLE_CODES | {"InternalError", "RequestTimeout", "OperationAborted"}
+
+def is_retryable(code: Optional[str] = None, status: Optional[int] = None) -> bool:
+    """Transient S3 failure: a RETRYABLE_CODES code, 5xx or 429."""
+    return code in RETRYABLE_CODES or (status is not None and (status >= 500 or status == 429))
+
+class ErrorRecord:
+    """
+    One failed item of a job: what was being done (op: copy, move, delete,
+    download, upload, or delete_local for a local file sync removes), to
+    which key (bucket/key, and target_bucket/target for transfers; local
+    paths have no bucket), the S3 error code and HTTP status
+    when there was a response, how many attempts botocore made and whether
+    the failure looks transient. str() gives the classic one-line message
+    ("src -> dst: error" or "key: error"), so records print like the plain
+    strings jobs used to return.
+    """
+    __slots__ = ("op", "key", "bucket", "target", "target_bucket", "code", "status", "attempts", "retryable", "message")
+
+    def __init__(
+        self,
+        op: str,
+        key: str,
+        message: str,
+        bucket: Optional[str] = None,
+        target: Optional[str] = None,
+        target_bucket: Optional[str] = None,
+        code: Optional[str] = None,
+        status: Optional[int] = None,
+        attempts: int = 1,
+        retryable: bool = False,
+    ):
+        self.op = op
+        self.key = key
+        self.message = message
+        self.bucket = bucket
+        self.target = target
+        self.target_bucket = target_bucket
+        self.code = code
+        self.status = status
+        self.attempts = attempts
+        self.retryable = retryable
+
+    @classmethod
+    def from_exception(
+        cls,
+        op: str,
+        key: str,
+        exc: BaseException,
+        bucket: Optional[str] = None,
+        target: Optional[str] = None,
+        target_bucket: Optional[str] = None,
+    ) -> "ErrorRecord":
+        code = status = None
+        attempts = 1
+        retryable = isinstance(exc, (BotoConnectionError, ConnectionError, TimeoutError))
+        if isinstance(exc, ClientError):
+            meta = exc.response.get("ResponseMetadata", {}) or {}
+            code = (exc.response.get("Error", {}) or {}).get("Code")
+            status = meta.get("HTTPStatusCode")
+            attempts = int(meta.get("RetryAttempts") or 0) + 1
+            retryable = is_retryable(code, status)
+        return cls(
+            op, key, str(exc), bucket=bucket, target=target, target_bucket=target_bucket,
+            code=code, status=status, attempts=attempts, retryable=retryable,
+        )
+
+    @classmethod
+    def from_delete_error(cls, err: Dict[str, Any], bucket: Optional[str] = None, attempts: int = 1) -> "ErrorRecord":
+        """Record for one entry of a delete_objects response's Errors list."""
+        code = err.get("Code")
+        return cls(
+            "delete", err.get("Key"), f"{code} {err.get('Message')}", bucket=bucket,
+            code=code, attempts=attempts, retryable=is_retryable(code),
+        )
+
+    def __str__(self) -> str:
+        if self.target is not None:
+            return f"{self.key} -> {self.target}: {self.message}"
+        return f"{self.key}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"ErrorRecord(op={self.op!r}, key={self.key!r}, code={self.code!r}, retryable={self.retryable!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ErrorRecord":
+        status = d.get("status")
+        return cls(
+            d["op"], d["key"], d.get("message") or "",
+            bucket=d.get("bucket") or None,
+            target=d.get("target") or None,
+            target_bucket=d.get("target_bucket") or None,
+            code=d.get("code") or None,
+            status=int(status) if status not in (None, "") else None,
+            attempts=int(d.get("attempts") or 1),
+            retryable=d.get("retryable") in (True, "True", "true", "1", 1),
+        )
+
 def setup_logging(level: int = logging.INFO, logfile: str | None = None) -> None:
     root = logging.getLogger()
     root.setLevel(level)
@@ -0,0 +1,281 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import threading
+import time
+
+from .concurrency import THROTTLE_CODES
+from .utils import ensure_dir
+
+# Latency histogram bucket bounds in seconds (Prometheus client defaults).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Operations whose request body is object data (bytes sent).
+_UPLOAD_OPS = {"PutObject", "UploadPart"}
+
+_T0 = "s3flow_metrics_t0"
+
+
+def _op(event_name: str) -> str:
+    # "after-call.s3.GetObject" -> "GetObject"
+    return event_name.rsplit(".", 1)[-1]
+
+
+def _body_size(body: Any) -> Optional[int]:
+    # bytes and boto3's ReadFileChunk have len(); for a file object, what is
+    # left to read (the request has not read it yet)
+    try:
+        return len(body)
+    except TypeError:
+        pass
+    try:
+        pos = body.tell()
+        end = body.seek(0, os.SEEK_END)
+        body.seek(pos)
+        return end - pos
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class _ApiStats:
+    __slots__ = ("calls", "errors", "retries", "throttles", "buckets", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def report(self) -> Dict[str, Any]:
+        cumulative: Dict[str, int] = {}
+        n = 0
+        for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], self.buckets):
+            n += count
+            cumulative[str(bound)] = n
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "latency": {
+                "count": n,
+                "sum": round(self.total, 6),
+                "mean": round(self.total / n, 6) if n else None,
+                "max": round(self.max, 6),
+                "buckets": cumulative,
+            },
+        }
+
+
+class Metrics:
+    """
+    Request-level metrics for one or more jobs, collected from botocore's
+    event hooks on the clients being watched (watch()): per-API call counts,
+    latency histograms (wall time of each call, including botocore's
+    retries), errors, retries and throttled attempts, plus bytes received by
+    GetObject and sent by PutObject/UploadPart. Jobs add the objects (and
+    object bytes) they finished with count(), so report() can give
+    objects/s and bytes/s over the watched time. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._apis: Dict[str, _ApiStats] = defaultdict(_ApiStats)
+        self.objects = 0
+        self.object_bytes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._start: Optional[float] = None
+        self._end: Optional[float] = None
+
+    # ---- events ----
+    def _before_call(self, params=None, context=None, event_name: str = "", **kwargs) -> None:
+        if context is not None:
+            context[_T0] = time.monotonic()
+            if _op(event_name) in _UPLOAD_OPS:
+                context[_T0 + "_body"] = _body_size((params or {}).get("body"))
+        return None
+
+    def _after_call(self, http_response=None, parsed=None, context=None, event_name: str = "", **kwargs) -> None:
+        t0 = (context or {}).get(_T0)
+        op = _op(event_name)
+        meta = (parsed or {}).get("ResponseMetadata", {}) or {}
+        ok = getattr(http_response, "status_code", 500) < 300
+        with self._lock:
+            api = self._apis[op]
+            api.calls += 1
+            api.retries += int(meta.get("RetryAttempts") or 0)
+            if t0 is not None:
+                api.observe(time.monotonic() - t0)
+            if not ok:
+                api.errors += 1
+            elif op == "GetObject":
+                self.bytes_in += int((parsed or {}).get("ContentLength") or 0)
+            elif op in _UPLOAD_OPS:
+                self.bytes_out += (context or {}).get(_T0 + "_body") or 0
+        return None
+
+    def _after_call_error(self, context=None, event_name: str = "", **kwargs) -> None:
+        # The request never got a response (connection error after retries).
+        t0 = (context or {}).get(_T0)
+        with self._lock:
+            api = self._apis[_op(event_name)]
+            api.calls += 1
+            api.errors += 1
+            if t0 is not None:
+                api.observe(time.monotonic() - t0)
+        return None
+
+    def _on_needs_retry(self, response=None, event_name: str = "", **kwargs) -> None:
+        # Every attempt, retried or not; only throttles are counted here.
+        if not response:
+            return None
+        http, parsed = response
+        code = ((parsed or {}).get("Error", {}) or {}).get("Code")
+        if getattr(http, "status_code", None) == 503 or code in THROTTLE_CODES:
+            with self._lock:
+                self._apis[_op(event_name)].throttles += 1
+        return None
+
+    @contextmanager
+    def watch(self, s3_client):
+        """Record every S3 call s3_client makes while the block runs."""
+        events = s3_client.meta.events
+        handlers = (
+            ("before-call.s3", self._before_call),
+            ("after-call.s3", self._after_call),
+            ("after-call-error.s3", self._after_call_error),
+            ("needs-retry.s3", self._on_needs_retry),
+        )
+        for name, fn in handlers:
+            events.register(name, fn)
+        if self._start is None:
+            self._start = time.monotonic()
+        self._end = None
+        try:
+            yield self
+        finally:
+            self._end = time.monotonic()
+            for name, fn in handlers:
+                events.unregister(name, fn)
+
+    # ---- job counters ----
+    def count(self, objects: int = 1, nbytes: Optional[int] = None) -> None:
+        """Add finished objects (and their size, when known)."""
+        with self._lock:
+            self.objects += objects
+            self.object_bytes += nbytes or 0
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Snapshot: elapsed seconds, objects and bytes (object bytes counted by
+        the job, or wire bytes when it counted none) with per-second rates,
+        request/retry/throttle totals and per-API stats with latency buckets
+        (cumulative, keyed by upper bound in seconds).
+        """
+        with self._lock:
+            start = self._start if self._start is not None else time.monotonic()
+            elapsed = max((self._end if self._end is not None else time.monotonic()) - start, 0.0)
+            apis = {op: s.report() for op, s in sorted(self._apis.items())}
+            nbytes = self.object_bytes or (self.bytes_in + self.bytes_out)
+            objects = self.objects
+            bytes_in, bytes_out = self.bytes_in, self.bytes_out
+        return {
+            "elapsed": round(elapsed, 3),
+            "objects": objects,
+            "bytes": nbytes,
+            "objects_per_sec": round(objects / elapsed, 2) if elapsed else None,
+            "bytes_per_sec": round(nbytes / elapsed, 2) if elapsed else None,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "requests": sum(a["calls"] for a in apis.values()),
+            "retries": sum(a["retries"] for a in apis.values()),
+            "throttles": sum(a["throttles"] for a in apis.values()),
+            "apis": apis,
+        }
+
+
+@contextmanager
+def metrics_scope(s3_client, metrics: Optional[Metrics] = None):
+    """Yield metrics watching s3_client for the block, or None without one."""
+    if metrics is None:
+        yield None
+        return
+    with metrics.watch(s3_client):
+        yield metrics
+
+
+# ---------------- Export ----------------
+def _labels(**labels: Optional[str]) -> str:
+    items = [f'{k}="{v}"' for k, v in labels.items() if v is not None]
+    return "{" + ",".join(items) + "}" if items else ""
+
+
+def to_prometheus(report: Dict[str, Any], job: Optional[str] = None) -> str:
+    """Prometheus text exposition of a Metrics.report(), metric names prefixed s3flow_."""
+    lines: List[str] = []
+
+    def _metric(name: str, kind: str, help_: str, samples: List[tuple]) -> None:
+        lines.append(f"# HELP s3flow_{name} {help_}")
+        lines.append(f"# TYPE s3flow_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"s3flow_{name}{suffix}{labels} {value}")
+
+    _metric("elapsed_seconds", "gauge", "Wall time the job was watched.", [("", _labels(job=job), report["elapsed"])])
+    _metric("objects_total", "counter", "Objects the job finished.", [("", _labels(job=job), report["objects"])])
+    _metric("bytes_total", "counter", "Object bytes the job moved.", [("", _labels(job=job), report["bytes"])])
+    for name, field, help_ in (
+        ("objects_per_second", "objects_per_sec", "Objects finished per second."),
+        ("bytes_per_second", "bytes_per_sec", "Object bytes moved per second."),
+    ):
+        if report[field] is not None:
+            _metric(name, "gauge", help_, [("", _labels(job=job), report[field])])
+
+    apis = report["apis"]
+    for name, field, help_ in (
+        ("requests_total", "calls", "S3 API calls by operation."),
+        ("request_errors_total", "errors", "S3 API calls that failed, by operation."),
+        ("request_retries_total", "retries", "Attempts botocore retried, by operation."),
+        ("throttles_total", "throttles", "Throttled (503 / SlowDown) attempts, by operation."),
+    ):
+        _metric(name, "counter", help_, [("", _labels(job=job, op=op), a[field]) for op, a in apis.items()])
+
+    samples: List[tuple] = []
+    for op, a in apis.items():
+        lat = a["latency"]
+        for bound, n in lat["buckets"].items():
+            samples.append(("_bucket", _labels(job=job, op=op, le=bound), n))
+        samples.append(("_sum", _labels(job=job, op=op), lat["sum"]))
+        samples.append(("_count", _labels(job=job, op=op), lat["count"]))
+    _metric("request_duration_seconds", "histogram", "S3 API call latency by operation.", samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str | Path, report: Dict[str, Any], job: Optional[str] = None) -> None:
+    """
+    Write a report as a Prometheus textfile (*.prom) or JSON (anything else).
+    Written to a temporary file and renamed, so a textfile collector never
+    reads half a file.
+    """
+    path = Path(path)
+    ensure_dir(path.parent)
+    if path.suffix.lower() == ".prom":
+        text = to_prometheus(report, job=job)
+    else:
+        text = json.dumps({"job": job, **report} if job else report, indent=2) + "\n"
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
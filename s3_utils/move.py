@@ -1,54 +1,17 @@
 from __future__ import annotations
-from typing import Iterable, List, Tuple, Optional, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict
 from tqdm import tqdm
 
-from .core import list_objects
-from .copy import copy_object
-from .utils import relativize_keys
-
-
-def _chunked(items: List[str], size: int):
-    for i in range(0, len(items), size):
-        yield items[i : i + size]
-
-
-def _parallel_copy(
-    s3_client,
-    source_bucket: str,
-    target_bucket: str,
-    pairs: Iterable[Tuple[str, str]],
-    max_workers: int = 8,
-    progress: bool = False,
-    extra_args: Optional[Dict] = None,
-) -> Tuple[List[Tuple[str, str]], List[str]]:
-    copied: List[Tuple[str, str]] = []
-    errors: List[str] = []
-    pairs_list = list(pairs)
-
-    bar = tqdm(total=len(pairs_list), desc="Copy", unit="obj") if progress and pairs_list else None
-
-    def _do(pair: Tuple[str, str]) -> Tuple[str, str]:
-        sk, dk = pair
-        copy_object(s3_client, source_bucket, sk, target_bucket, dk, extra_args=extra_args)
-        return pair
-
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = [ex.submit(_do, p) for p in pairs_list]
-        for f in as_completed(futs):
-            try:
-                copied.append(f.result())
-            except Exception as e:
-                errors.append(str(e))
-            finally:
-                if bar:
-                    bar.update(1)
-
-    if bar:
-        bar.close()
-
-    copied.sort()
-    return copied, errors
+from .concurrency import limiter_scope, prefix_scheduler_for
+from .core import ObjectRecord, list_object_records
+from .copy import _parallel_copy
+from .delete import DeleteQueue, delete_batch
+from .errors import ErrorRecord
+from .metrics import Metrics, metrics_scope
+from .sinks import ListSink, ResultSink
+from .state import MoveJournal, move_job_id
+from .transfer import MultipartCopier, TransferConfig
+from .utils import prefixes_overlap
 
 
 def move_by_mask(
@@ -63,99 +26,151 @@ def move_by_mask(
     extra_args: Optional[Dict] = None,
     dry_run: bool = False,
     delete_batch_size: int = 1000,
+    list_shards: int = 1,
+    copier: Optional[MultipartCopier] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    adaptive: bool = False,
+    prefix_depth: int = 0,
+    prefix_rate: Optional[float] = None,
+    journal: Optional[MoveJournal] = None,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
 ) -> Dict[str, List]:
     """
     Move objects matching (prefix, suffix) from source_bucket to target_bucket/prefix_dst.
-    Steps: copy all → delete successfully copied sources in batches.
+    Sources are deleted as their copies succeed: copied keys collect into
+    delete_batch_size batches that are deleted concurrently while copying
+    goes on (delete.DeleteQueue), so a failed copy never loses its source.
+    With a MoveJournal, each successful copy is recorded before its source can
+    be deleted. A move that died part-way is resumed by running it again: keys
+    the journal shows as copied (and unchanged since, by ETag) are only
+    deleted, the rest are copied (stats["resumed"] counts the former).
+    list_shards > 1 lists the source with that many parallel paginators.
+    Pass a MultipartCopier or a TransferConfig to tune part size/concurrency
+    for large objects.
+    adaptive=True treats max_workers as a ceiling: copies in flight grow while
+    S3 is healthy and back off on 503 SlowDown (see concurrency.AdaptiveLimiter);
+    the limit over time is reported in stats["concurrency"].
+    prefix_depth > 0 interleaves copies round-robin across destination prefixes
+    of that many segments below prefix_dst instead of listing order, and
+    prefix_rate caps copies per second per such prefix (S3 allows ~3,500
+    writes/s per partitioned prefix); see concurrency.PrefixScheduler.
+    With a sink (see sinks.py), moved pairs, deleted keys and errors stream
+    to it as they happen and the result lists stay empty; stats["results"]
+    has the per-kind counts.
+    With a metrics.Metrics, its report for the move is in stats["metrics"].
     """
-    # Collect source keys and form (src_key, dst_key) pairs
-    src_keys = [k for k in list_objects(s3_client, source_bucket, prefix=prefix, suffix=suffix)]
-    rel = relativize_keys(src_keys, prefix)
+    # Stream source records (key + size) as (record, dst_key) pairs so copying
+    # starts while the listing is still running
+    totals = {"total": 0, "total_bytes": 0}
 
-    pairs: List[Tuple[str, str]] = []
-    for r in rel:
-        sk = f"{prefix}{r}" if prefix else r
-        dk = f"{prefix_dst}{r}" if prefix_dst else r
-        pairs.append((sk, dk))
+    records: Iterable[ObjectRecord] = list_object_records(
+        s3_client, source_bucket, prefix=prefix, suffix=suffix, shards=list_shards
+    )
+    if prefixes_overlap(source_bucket, prefix, target_bucket, prefix_dst):
+        # Copies would land inside the listing still in progress; snapshot it first.
+        records = list(records)
 
-    copied_pairs: List[Tuple[str, str]] = []
-    copy_errors: List[str] = []
-    deleted: List[str] = []
-    delete_errors: List[str] = []
+    def _pairs() -> Iterator[Tuple[ObjectRecord, str]]:
+        for rec in records:
+            r = rec.key[len(prefix):] if prefix else rec.key
+            totals["total"] += 1
+            totals["total_bytes"] += rec.size or 0
+            yield (rec, f"{prefix_dst}{r}" if prefix_dst else r)
 
-    if dry_run:
-        # In dry-run, report what would be copied and deleted
-        copied_pairs = pairs.copy()
-        deleted = [sk for (sk, _) in pairs]
+    out = sink if sink is not None else ListSink()
+
+    def _result(stats: Dict) -> Dict[str, List]:
         return {
-            "moved": copied_pairs,
-            "errors_copy": copy_errors,
-            "deleted_source": deleted,
-            "errors_delete": delete_errors,
+            "moved": sorted(out.get("moved")),
+            "errors_copy": out.get("errors_copy"),
+            "deleted_source": sorted(out.get("deleted_source")),
+            "errors_delete": out.get("errors_delete"),
             "stats": {
                 "source_bucket": source_bucket,
                 "target_bucket": target_bucket,
                 "prefix": prefix,
                 "prefix_dst": prefix_dst,
                 "suffix": suffix,
-                "total": len(pairs),
-                "dry_run": True,
+                **totals,
+                **stats,
+                **({"results": dict(out.counts)} if sink is not None else {}),
             },
         }
 
-    # Copy phase
-    copied_pairs, copy_errors = _parallel_copy(
-        s3_client,
-        source_bucket,
-        target_bucket,
-        pairs=pairs,
-        max_workers=max_workers,
-        progress=progress,
-        extra_args=extra_args,
+    if dry_run:
+        # In dry-run, report what would be copied and deleted
+        for rec, dk in _pairs():
+            out.add("moved", (rec.key, dk))
+            out.add("deleted_source", rec.key)
+        return _result({"dry_run": True})
+
+    job = move_job_id(source_bucket, prefix, suffix, target_bucket, prefix_dst)
+    copied_before = journal.pending(job) if journal else {}
+    resumed = 0
+    bar = tqdm(desc="Delete", unit="obj") if progress else None
+
+    def _on_deleted(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        if journal and ok:
+            journal.deleted(job, ok)
+        for k in ok:
+            out.add("deleted_source", k)
+        for e in errs:
+            out.add("errors_delete", e)
+        if bar is not None:
+            bar.update(len(chunk))
+
+    deletes = DeleteQueue(
+        lambda keys: delete_batch(s3_client, source_bucket, keys),
+        batch_size=delete_batch_size, on_batch=_on_deleted, collect=False, bucket=source_bucket,
     )
 
-    # Delete only sources that were successfully copied
-    to_delete = [sk for (sk, dk) in copied_pairs]
-
-    bar = tqdm(total=len(to_delete), desc="Delete", unit="obj") if progress and to_delete else None
-    for chunk in _chunked(to_delete, min(max(int(delete_batch_size), 1), 1000)):
-        try:
-            resp = s3_client.delete_objects(
-                Bucket=source_bucket,
-                Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True},
-            )
-            for d in resp.get("Deleted", []) or []:
-                if (k := d.get("Key")):
-                    deleted.append(k)
-                    if bar:
-                        bar.update(1)
-            for err in resp.get("Errors", []) or []:
-                k = err.get("Key")
-                code = err.get("Code")
-                msg = err.get("Message")
-                delete_errors.append(f"{k}: {code} {msg}")
-                if bar:
-                    bar.update(1)
-        except Exception as e:
-            for k in chunk:
-                delete_errors.append(f"{k}: {e}")
-                if bar:
-                    bar.update(1)
-    if bar:
+    def _to_copy(items: Iterable[Tuple[ObjectRecord, str]]) -> Iterator[Tuple[ObjectRecord, str]]:
+        nonlocal resumed
+        for rec, dk in items:
+            before = copied_before.get(rec.key)
+            if before is not None and before[1] == rec.etag:
+                resumed += 1
+                out.add("moved", (rec.key, before[0]))
+                deletes.put(rec.key)
+                continue
+            yield rec, dk
+
+    def _on_copied(rec: ObjectRecord, dk: str) -> None:
+        if journal:
+            journal.copied(job, rec.key, dk, rec.etag)
+        deletes.put(rec.key)
+
+    scheduler = prefix_scheduler_for(prefix_depth, prefix_rate)
+    pairs: Iterable[Tuple[ObjectRecord, str]] = _to_copy(_pairs())
+    if scheduler:
+        pairs = scheduler.schedule(pairs, key=lambda p: p[1][len(prefix_dst):])
+
+    with metrics_scope(s3_client, metrics), deletes, limiter_scope(s3_client, adaptive, max_workers) as limiter:
+        _parallel_copy(
+            s3_client,
+            source_bucket,
+            target_bucket,
+            pairs=pairs,
+            max_workers=max_workers,
+            progress=progress,
+            extra_args=extra_args,
+            copier=copier,
+            transfer_config=transfer_config,
+            limiter=limiter,
+            on_copied=_on_copied,
+            sink=out,
+            kinds=("moved", "errors_copy"),
+            op="move",
+            metrics=metrics,
+        )
+    if bar is not None:
         bar.close()
 
-    return {
-        "moved": copied_pairs,
-        "errors_copy": copy_errors,
-        "deleted_source": deleted,
-        "errors_delete": delete_errors,
-        "stats": {
-            "source_bucket": source_bucket,
-            "target_bucket": target_bucket,
-            "prefix": prefix,
-            "prefix_dst": prefix_dst,
-            "suffix": suffix,
-            "total": len(pairs),
-            "dry_run": False,
-        },
-    }
+    return _result({
+        "dry_run": False,
+        **({"resumed": resumed} if journal else {}),
+        **({"concurrency": limiter.stats()} if limiter else {}),
+        **({"prefixes": scheduler.stats()} if scheduler else {}),
+        **({"metrics": metrics.report()} if metrics is not None else {}),
+    })
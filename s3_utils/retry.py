@@ -0,0 +1,168 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
+from pathlib import Path
+import csv
+import json
+import os
+
+from tqdm import tqdm
+
+from .concurrency import bounded_imap, limiter_scope
+from .copy import copy_object
+from .delete import delete_keys
+from .download import download_file
+from .errors import ErrorRecord
+from .sinks import ListSink, ResultSink
+from .upload import upload_file
+
+RETRY_OPS = ("copy", "move", "delete", "delete_local", "download", "upload")
+
+
+def read_failures(path: str | Path) -> List[ErrorRecord]:
+    """
+    Failed items of a --results file (JSONL or CSV, see sinks.py) as
+    ErrorRecords. Successful outcomes, and lines without error details, are
+    skipped.
+    """
+    failures: List[ErrorRecord] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if str(path).lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                if row.get("op"):
+                    failures.append(ErrorRecord.from_dict({**row, "key": row["item"]}))
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    err = json.loads(line).get("error")
+                    if err:
+                        failures.append(ErrorRecord.from_dict(err))
+    return failures
+
+
+def _outcome(rec: ErrorRecord):
+    return rec.key if rec.target is None else (rec.key, rec.target)
+
+
+def _retry_one(s3_client, rec: ErrorRecord) -> None:
+    if rec.op in ("copy", "move"):
+        copy_object(s3_client, rec.bucket, rec.key, rec.target_bucket, rec.target)
+        if rec.op == "move":
+            s3_client.delete_object(Bucket=rec.bucket, Key=rec.key)
+    elif rec.op == "download":
+        download_file(s3_client, rec.bucket, rec.key, rec.target, overwrite=True)
+    elif rec.op == "upload":
+        upload_file(s3_client, rec.key, rec.target_bucket, rec.target)
+    else:
+        raise ValueError(f"Cannot retry op {rec.op!r}")
+
+
+def _remove_local(paths: Iterable[str]) -> Tuple[List[str], List[ErrorRecord]]:
+    removed: List[str] = []
+    errors: List[ErrorRecord] = []
+    for p in paths:
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            errors.append(ErrorRecord.from_exception("delete_local", p, e))
+            continue
+        removed.append(p)
+    return removed, errors
+
+
+def retry_failures(
+    s3_client,
+    failures: Iterable[ErrorRecord],
+    retryable_only: bool = True,
+    max_workers: int = 8,
+    progress: bool = False,
+    dry_run: bool = False,
+    adaptive: bool = False,
+    sink: Optional[ResultSink] = None,
+) -> Dict[str, List]:
+    """
+    Run the failed items of an earlier job again, straight from their
+    ErrorRecords (read_failures), so nothing is listed again. Each record is
+    redone by its op: copy (and for move, then delete the source), download,
+    upload, delete (S3 keys in 1000-key batches per bucket) or delete_local
+    (local files removed); delete records without a bucket are skipped.
+    With retryable_only (the default), failures that don't look
+    transient (ErrorRecord.retryable) are left out and counted in
+    stats["skipped"]. Items that fail again come back as new ErrorRecords in
+    "errors", so the output of one retry can feed the next.
+    """
+    out = sink if sink is not None else ListSink()
+    todo: List[ErrorRecord] = []
+    skipped = 0
+    for rec in failures:
+        if rec.op not in RETRY_OPS or (retryable_only and not rec.retryable) or (rec.op == "delete" and not rec.bucket):
+            skipped += 1
+        else:
+            todo.append(rec)
+
+    deletes: Dict[str, List[str]] = defaultdict(list)
+    local_deletes: List[str] = []
+    transfers: List[ErrorRecord] = []
+    for rec in todo:
+        if rec.op == "delete":
+            deletes[rec.bucket].append(rec.key)
+        elif rec.op == "delete_local":
+            local_deletes.append(rec.key)
+        else:
+            transfers.append(rec)
+
+    stats = {"total": len(todo), "skipped": skipped, "dry_run": dry_run}
+    if dry_run:
+        for rec in todo:
+            out.add("retried", _outcome(rec))
+        return _result(out, stats, sink)
+
+    bar = tqdm(total=len(todo), desc="Retry", unit="obj") if progress and todo else None
+
+    def _on_deleted(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        for k in ok:
+            out.add("retried", k)
+        for e in errs:
+            out.add("errors", e)
+        if bar is not None:
+            bar.update(len(chunk))
+
+    with limiter_scope(s3_client, adaptive, max_workers) as limiter:
+        if local_deletes:
+            _on_deleted(local_deletes, *_remove_local(local_deletes))
+        for bucket, keys in deletes.items():
+            delete_keys(
+                s3_client, bucket, keys, max_workers=max_workers, limiter=limiter,
+                on_batch=_on_deleted, collect=False,
+            )
+        for rec, _, err in bounded_imap(
+            lambda r: _retry_one(s3_client, r), transfers, max_workers=max_workers, limiter=limiter
+        ):
+            if err is None:
+                out.add("retried", _outcome(rec))
+            else:
+                out.add("errors", ErrorRecord.from_exception(
+                    rec.op, rec.key, err, bucket=rec.bucket, target=rec.target, target_bucket=rec.target_bucket
+                ))
+            if bar is not None:
+                bar.update(1)
+    if bar is not None:
+        bar.close()
+
+    return _result(out, {**stats, **({"concurrency": limiter.stats()} if limiter else {})}, sink)
+
+
+def _result(out: ResultSink, stats: Dict, sink: Optional[ResultSink]) -> Dict[str, List]:
+    return {
+        "retried": out.get("retried"),
+        "errors": out.get("errors"),
+        "stats": {
+            **stats,
+            "retried": out.counts.get("retried", 0),
+            "errors_count": out.counts.get("errors", 0),
+            **({"results": dict(out.counts)} if sink is not None else {}),
+        },
+    }
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, TextIO
+from collections import defaultdict
+from pathlib import Path
+import csv
+import json
+import threading
+
+from .errors import ErrorRecord
+from .utils import ensure_dir
+
+# ErrorRecord fields written next to result/item/target.
+_ERROR_FIELDS = ("op", "bucket", "target_bucket", "code", "status", "attempts", "retryable", "message")
+
+
+def _columns(item: Any) -> List[str]:
+    """(src, dst) pairs and errors with a target become two columns; keys one."""
+    if isinstance(item, ErrorRecord):
+        return [item.key] if item.target is None else [item.key, item.target]
+    if isinstance(item, (tuple, list)):
+        return [str(v) for v in item]
+    return [str(item)]
+
+
+class ResultSink:
+    """
+    Receives a job's outcomes one at a time as (kind, item), where kind is the
+    result-dict field it belongs to ("copied", "errors_copy", "deleted",
+    "downloaded", ...) and item a (src, dst) pair, a key or an ErrorRecord.
+    add() may be called from several threads. Every sink counts items per
+    kind (self.counts); this base class keeps nothing else, so it is the
+    counters-only sink.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, kind: str, item: Any) -> None:
+        with self._lock:
+            self.counts[kind] += 1
+            self._write(kind, item)
+
+    def _write(self, kind: str, item: Any) -> None:
+        pass
+
+    def get(self, kind: str) -> List[Any]:
+        """Items kept for kind; empty for sinks that stream them elsewhere."""
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+CountingSink = ResultSink
+
+
+class ListSink(ResultSink):
+    """Keeps every item in memory: the classic result-dict lists, for small jobs."""
+
+    def __init__(self):
+        super().__init__()
+        self.items: Dict[str, List[Any]] = defaultdict(list)
+
+    def _write(self, kind: str, item: Any) -> None:
+        self.items[kind].append(item)
+
+    def get(self, kind: str) -> List[Any]:
+        return self.items.get(kind, [])
+
+
+class CallbackSink(ResultSink):
+    """Calls fn(kind, item) for each outcome (serialized by the sink's lock)."""
+
+    def __init__(self, fn: Callable[[str, Any], None]):
+        super().__init__()
+        self.fn = fn
+
+    def _write(self, kind: str, item: Any) -> None:
+        self.fn(kind, item)
+
+
+class _FileSink(ResultSink):
+    def __init__(self, path: str | Path):
+        super().__init__()
+        self.path = Path(path)
+        ensure_dir(self.path.parent)
+        self._f: Optional[TextIO] = open(self.path, "w", newline="", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+class JsonlSink(_FileSink):
+    """
+    One JSON object per outcome: {"result": kind, "item": ..., "target": ...},
+    plus "error": ErrorRecord.to_dict() for failures.
+    """
+
+    def _write(self, kind: str, item: Any) -> None:
+        cols = _columns(item)
+        row: Dict[str, Any] = {"result": kind, "item": cols[0]}
+        if len(cols) > 1:
+            row["target"] = cols[1]
+        if isinstance(item, ErrorRecord):
+            row["error"] = item.to_dict()
+        self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class CsvSink(_FileSink):
+    """
+    CSV with columns result, item, target (empty for single-value items)
+    followed by the ErrorRecord fields, filled for failures only.
+    """
+
+    def __init__(self, path: str | Path):
+        super().__init__(path)
+        self._w = csv.writer(self._f)
+        self._w.writerow(["result", "item", "target", *_ERROR_FIELDS])
+
+    def _write(self, kind: str, item: Any) -> None:
+        cols = _columns(item)
+        if isinstance(item, ErrorRecord):
+            extra = ["" if getattr(item, f) is None else getattr(item, f) for f in _ERROR_FIELDS]
+        else:
+            extra = [""] * len(_ERROR_FIELDS)
+        self._w.writerow([kind, cols[0], cols[1] if len(cols) > 1 else "", *extra])
+
+
+class TeeSink(ResultSink):
+    """Forwards every outcome to several sinks; get() reads from the first."""
+
+    def __init__(self, *sinks: ResultSink):
+        super().__init__()
+        self.sinks = sinks
+
+    def _write(self, kind: str, item: Any) -> None:
+        for s in self.sinks:
+            s.add(kind, item)
+
+    def get(self, kind: str) -> List[Any]:
+        return self.sinks[0].get(kind) if self.sinks else []
+
+
+def sink_for_path(path: str | Path) -> ResultSink:
+    """CsvSink for *.csv, JsonlSink otherwise."""
+    return CsvSink(path) if str(path).lower().endswith(".csv") else JsonlSink(path)
+
@@ -0,0 +1,223 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from pathlib import Path
+import sqlite3
+import threading
+
+from .core import ObjectRecord
+from .utils import ensure_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    side TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    PRIMARY KEY (side, key)
+);
+CREATE TABLE IF NOT EXISTS sync_runs (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    high_water TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (src, dst)
+);
+"""
+
+_MOVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS move_copied (
+    job TEXT NOT NULL,
+    src_key TEXT NOT NULL,
+    dst_key TEXT NOT NULL,
+    etag TEXT,
+    PRIMARY KEY (job, src_key)
+);
+"""
+
+_BATCH = 1000
+
+
+def _connect(path: str, schema: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        ensure_dir(Path(path).parent)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level="DEFERRED")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+    conn.commit()
+    return conn
+
+
+def side_id(bucket: str, prefix: str = "") -> str:
+    """State key for one side of a sync: s3://bucket/prefix."""
+    return f"s3://{bucket}/{prefix}"
+
+
+def _row(side: str, rec: ObjectRecord) -> Tuple:
+    lm = rec.last_modified.isoformat() if rec.last_modified else None
+    return (side, rec.key, rec.size, rec.etag, lm)
+
+
+def _record(key: str, size, etag, lm) -> ObjectRecord:
+    return ObjectRecord(key, size, etag, datetime.fromisoformat(lm) if lm else None)
+
+
+class SyncState:
+    """
+    On-disk (SQLite) record of the last known listing of each sync side and,
+    per (source, target) pair, the highest source key the last run reached.
+
+    Writes made during a run stay in one transaction until commit(), so a run
+    that dies leaves the previous state intact. The connection is shared by
+    the listing threads under a lock.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._conn = _connect(self.path, _SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SyncState":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def high_water(self, src: str, dst: str) -> Optional[str]:
+        """Highest source key the last finished run of src -> dst listed, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water FROM sync_runs WHERE src = ? AND dst = ?", (src, dst)
+            ).fetchone()
+        return row[0] if row else None
+
+    def records(self, side: str, after: str = "") -> Iterator[ObjectRecord]:
+        """
+        Cached records of a side in key order (SQLite's binary collation is
+        the byte order S3 lists in), optionally only keys after `after`.
+        Read in batches so large sides are not loaded at once.
+        """
+        last = after
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, size, etag, last_modified FROM objects WHERE side = ? AND key > ? ORDER BY key LIMIT ?",
+                    (side, last, _BATCH),
+                ).fetchall()
+            for row in rows:
+                yield _record(*row)
+            if len(rows) < _BATCH:
+                return
+            last = rows[-1][0]
+
+    def reset(self, side: str) -> None:
+        """Forget a side before a full listing repopulates it."""
+        with self._lock:
+            self._conn.execute("DELETE FROM objects WHERE side = ?", (side,))
+
+    def tap(self, side: str, records: Iterable[ObjectRecord]) -> Iterator[ObjectRecord]:
+        """Yield records unchanged while saving them for `side` in batches."""
+        batch: List[Tuple] = []
+        for rec in records:
+            batch.append(_row(side, rec))
+            if len(batch) >= _BATCH:
+                self._save(batch)
+                batch = []
+            yield rec
+        self._save(batch)
+
+    def _save(self, rows: List[Tuple]) -> None:
+        if rows:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO objects (side, key, size, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def record_copies(self, dst: str, copies: Iterable[Tuple[ObjectRecord, str]]) -> None:
+        """
+        Cache copied (source record, dst_key) pairs on the dst side with the
+        source's size and ETag and the current time as LastModified. Values
+        come from the records themselves: the source rows may still be in
+        tap()'s unsaved batch when a copy finishes.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [(dst, dk, rec.size, rec.etag, now) for rec, dk in copies]
+        self._save(rows)
+
+    def forget(self, side: str, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM objects WHERE side = ? AND key = ?", [(side, k) for k in keys])
+
+    def commit(self, src: str, dst: str, high_water: Optional[str]) -> None:
+        """Finish a run: store the source high-water key and commit its writes."""
+        with self._lock:
+            if high_water is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_runs (src, dst, high_water, finished_at) VALUES (?, ?, ?, ?)",
+                    (src, dst, high_water, datetime.now(timezone.utc).isoformat()),
+                )
+            self._conn.commit()
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._conn.rollback()
+
+
+def move_job_id(source_bucket: str, prefix: str, suffix: str, target_bucket: str, prefix_dst: str) -> str:
+    """Journal key for one move: s3://src/prefix*suffix -> s3://dst/prefix_dst."""
+    return f"{side_id(source_bucket, prefix)}*{suffix} -> {side_id(target_bucket, prefix_dst)}"
+
+
+class MoveJournal:
+    """
+    Write-ahead journal for move_by_mask: a source key is recorded (with its
+    ETag) once its copy succeeded and dropped once its delete did, each
+    committed immediately. After a crash the journal holds exactly the keys
+    that were copied but may still exist at the source, so a rerun deletes
+    them without copying again.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._conn = _connect(self.path, _MOVE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "MoveJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def pending(self, job: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Copied but not yet deleted source keys of a job: {src_key: (dst_key, etag)}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT src_key, dst_key, etag FROM move_copied WHERE job = ?", (job,)
+            ).fetchall()
+        return {sk: (dk, etag) for sk, dk, etag in rows}
+
+    def copied(self, job: str, src_key: str, dst_key: str, etag: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO move_copied (job, src_key, dst_key, etag) VALUES (?, ?, ?, ?)",
+                (job, src_key, dst_key, etag),
+            )
+            self._conn.commit()
+
+    def deleted(self, job: str, src_keys: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM move_copied WHERE job = ? AND src_key = ?", [(job, k) for k in src_keys]
+            )
+            self._conn.commit()
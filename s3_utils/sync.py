@@ -1,17 +1,290 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple, Dict
-from botocore.exceptions import ClientError
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Dict
+from datetime import datetime, timezone
+from pathlib import Path
+import os
+
 from tqdm import tqdm
 
-from .core import list_objects
+from .concurrency import AdaptiveLimiter, PrefixScheduler, bounded_imap, limiter_scope, prefix_scheduler_for
+from .core import ObjectRecord, list_object_records
 from .copy import copy_object
-from .utils import relativize_keys
+from .delete import DeleteQueue, delete_batch
+from .download import download_file
+from .errors import ErrorRecord
+from .metrics import Metrics, metrics_scope
+from .sinks import CallbackSink, ListSink, ResultSink, TeeSink
+from .state import SyncState, side_id
+from .transfer import (
+    MultipartCopier,
+    MultipartUploader,
+    RangedDownloader,
+    TransferConfig,
+    copier_scope,
+    downloader_scope,
+    is_partial_path,
+    uploader_scope,
+)
+from .upload import upload_file, walk_sorted
+from .utils import ensure_dir, prefetch, prefixes_overlap
+
+# (action, relative key, source record, target record); action is
+# "copy" (source only), "delete" (target only) or "match" (both sides).
+Decision = Tuple[str, str, Optional[ObjectRecord], Optional[ObjectRecord]]
+
+# "name" is the CLI spelling of "key": presence only.
+COMPARE_MODES = ("key", "name", "size", "etag", "mtime")
+
+
+def is_multipart_etag(etag: Optional[str]) -> bool:
+    """
+    Multipart ETags ("<md5-of-part-md5s>-<parts>") depend on the part size
+    used by the writer, so they are not content hashes.
+    """
+    return bool(etag) and "-" in etag
+
+
+def is_changed(src: ObjectRecord, dst: ObjectRecord, compare_mode: str) -> bool:
+    """
+    Decide from listing metadata alone whether dst is stale relative to src.
+
+    key/name: never (presence only). size: sizes differ. mtime: sizes differ
+    or src is newer. etag: equal ETags mean unchanged; differing single-part
+    ETags mean changed; when either side is multipart the ETags are not
+    comparable and the mtime rule is used instead.
+    """
+    if compare_mode in ("key", "name"):
+        return False
+    if src.size != dst.size:
+        return True
+    if compare_mode == "size":
+        return False
+    if compare_mode == "etag":
+        if src.etag and dst.etag:
+            if src.etag == dst.etag:
+                return False
+            if not (is_multipart_etag(src.etag) or is_multipart_etag(dst.etag)):
+                return True
+    if src.last_modified and dst.last_modified:
+        return src.last_modified > dst.last_modified
+    return False
+
+
+def join_step(
+    s: Optional[ObjectRecord], d: Optional[ObjectRecord], prefix_src: str = "", prefix_dst: str = ""
+) -> Decision:
+    """
+    One merge_join step over the current source/target records (at most one
+    of them None): "copy" consumes s, "delete" consumes d, "match" both.
+    """
+    s_rel = s.key[len(prefix_src):] if s is not None else None
+    d_rel = d.key[len(prefix_dst):] if d is not None else None
+    if d_rel is None or (s_rel is not None and s_rel < d_rel):
+        return ("copy", s_rel, s, None)
+    if s_rel is None or d_rel < s_rel:
+        return ("delete", d_rel, None, d)
+    return ("match", s_rel, s, d)
+
+
+def merge_join(
+    src: Iterable[ObjectRecord],
+    dst: Iterable[ObjectRecord],
+    prefix_src: str = "",
+    prefix_dst: str = "",
+) -> Iterator[Decision]:
+    """
+    Sorted merge-join of two key-ordered listings on their keys relative to
+    prefix_src/prefix_dst. Holds one record per side, so memory is O(1)
+    regardless of listing size.
+    """
+    src_it, dst_it = iter(src), iter(dst)
+    s = next(src_it, None)
+    d = next(dst_it, None)
+    while s is not None or d is not None:
+        decision = join_step(s, d, prefix_src, prefix_dst)
+        yield decision
+        if decision[0] != "delete":
+            s = next(src_it, None)
+        if decision[0] != "copy":
+            d = next(dst_it, None)
+
+
+def plan_decision(
+    decision: Decision, compare_mode: str, delete_extra: bool, counts: Dict[str, int], decisions: Dict[str, int]
+) -> Optional[str]:
+    """
+    Count one merge_join decision into the sync stats (counts: total_src,
+    total_dst, to_copy, to_delete; decisions: missing, changed, unchanged,
+    extra) and return what to do about it: "copy", "delete" or None.
+    """
+    action, _, s, d = decision
+    if s is not None:
+        counts["total_src"] += 1
+    if d is not None:
+        counts["total_dst"] += 1
+    if action == "match":
+        if not is_changed(s, d, compare_mode):
+            decisions["unchanged"] += 1
+            return None
+        decisions["changed"] += 1
+    elif action == "copy":
+        decisions["missing"] += 1
+    else:
+        decisions["extra"] += 1
+        if not delete_extra:
+            return None
+        counts["to_delete"] += 1
+        return "delete"
+    counts["to_copy"] += 1
+    return "copy"
+
+
+def _run_sync(
+    src_records: Iterator[ObjectRecord],
+    dst_records: Iterator[ObjectRecord],
+    prefix_src: str,
+    prefix_dst: str,
+    compare_mode: str,
+    delete_extra: bool,
+    dry_run: bool,
+    transfer: Callable[[Tuple[ObjectRecord, str]], None],
+    delete_fn: Callable[[List[str]], Tuple[List[str], List[ErrorRecord]]],
+    error_for: Callable[[ObjectRecord, str, BaseException], ErrorRecord],
+    delete_bucket: Optional[str] = None,
+    max_workers: int = 8,
+    progress: bool = False,
+    limiter: Optional[AdaptiveLimiter] = None,
+    scheduler: Optional[PrefixScheduler] = None,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, Any]:
+    """
+    Shared engine of the sync functions: merge-join two key-ordered record
+    streams, run transfer((src_record, dst_key)) for missing/changed keys on
+    a bounded pool and, with delete_extra, pass target-only keys to
+    delete_fn in batches of 1000 as they stream out, several batches at once
+    alongside the transfers (delete.DeleteQueue). Closes both streams.
+    A failed transfer is reported as error_for(src_record, dst_key, exc);
+    delete_bucket is the target bucket of delete_fn (None for a local target).
+    Outcomes go to sink (a ListSink by default) as they happen; transferred
+    objects are counted into metrics.
+    """
+    out = sink if sink is not None else ListSink()
+    counts = {"total_src": 0, "total_dst": 0, "to_copy": 0, "to_delete": 0}
+    decisions = {"missing": 0, "changed": 0, "unchanged": 0, "extra": 0}
+
+    copy_bar = tqdm(desc="Copy", unit="obj") if progress else None
+    delete_bar = tqdm(desc="Delete", unit="obj") if progress and delete_extra else None
 
+    def _on_deleted(chunk: List[str], ok: List[str], errs: List[ErrorRecord]) -> None:
+        for k in ok:
+            out.add("deleted", k)
+        for e in errs:
+            out.add("errors_delete", e)
+        if delete_bar is not None:
+            delete_bar.update(len(chunk))
 
-def _chunked(iterable, size: int):
-    """Yield successive chunks from iterable of given size."""
-    for i in range(0, len(iterable), size):
-        yield iterable[i : i + size]
+    deletes = (
+        DeleteQueue(delete_fn, on_batch=_on_deleted, collect=False, bucket=delete_bucket) if delete_extra and not dry_run else None
+    )
+
+    def _plan() -> Iterator[Tuple[ObjectRecord, str]]:
+        """Walk the merge-join, queueing deletes and yielding copy tasks."""
+        for decision in merge_join(src_records, dst_records, prefix_src, prefix_dst):
+            todo = plan_decision(decision, compare_mode, delete_extra, counts, decisions)
+            _, rel, s, d = decision
+            if todo == "copy":
+                yield (s, f"{prefix_dst}{rel}" if prefix_dst else rel)
+            elif todo == "delete":
+                if deletes is None:
+                    out.add("deleted", d.key)
+                else:
+                    deletes.put(d.key)
+
+    tasks: Iterable[Tuple[ObjectRecord, str]] = _plan()
+    if scheduler:
+        tasks = scheduler.schedule(tasks, key=lambda t: t[1][len(prefix_dst):])
+
+    failed = False
+    try:
+        if dry_run:
+            for rec, dst_key in tasks:
+                out.add("copied", (rec.key, dst_key))
+                if copy_bar is not None:
+                    copy_bar.update(1)
+        else:
+            for (rec, dst_key), _, err in bounded_imap(transfer, tasks, max_workers=max_workers, limiter=limiter):
+                if err is None:
+                    out.add("copied", (rec.key, dst_key))
+                    if metrics is not None:
+                        metrics.count(1, rec.size)
+                else:
+                    out.add("errors_copy", error_for(rec, dst_key, err))
+                if copy_bar is not None:
+                    copy_bar.update(1)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        src_records.close()
+        dst_records.close()
+        if copy_bar is not None:
+            copy_bar.close()
+        try:
+            if deletes is not None:
+                try:
+                    deletes.close()
+                except Exception:
+                    # don't mask the error that stopped the run
+                    if not failed:
+                        raise
+        finally:
+            if delete_bar is not None:
+                delete_bar.close()
+
+    return {
+        "copied": sorted(out.get("copied")),
+        "errors_copy": out.get("errors_copy"),
+        "deleted": sorted(out.get("deleted")),
+        "errors_delete": out.get("errors_delete"),
+        "counts": counts,
+        "decisions": decisions,
+        "results": dict(out.counts),
+    }
+
+
+def _track_last(records: Iterable[ObjectRecord], last: List[Optional[str]]) -> Iterator[ObjectRecord]:
+    """Pass records through, keeping the key of the latest one in last[0]."""
+    for rec in records:
+        last[0] = rec.key
+        yield rec
+
+
+def _sync_result(
+    run: Dict[str, Any], stats: Dict[str, Any], limiter=None, scheduler=None, sink=None, metrics=None
+) -> Dict[str, List]:
+    return {
+        "copied": run["copied"],
+        "errors_copy": run["errors_copy"],
+        "deleted": run["deleted"],
+        "errors_delete": run["errors_delete"],
+        "stats": {
+            **stats,
+            **run["counts"],
+            "decisions": run["decisions"],
+            **({"concurrency": limiter.stats()} if limiter else {}),
+            **({"prefixes": scheduler.stats()} if scheduler else {}),
+            **({"results": run["results"]} if sink is not None else {}),
+            **({"metrics": metrics.report()} if metrics is not None else {}),
+        },
+    }
+
+
+def _check_compare_mode(compare_mode: Optional[str]) -> str:
+    compare_mode = (compare_mode or "key").lower()
+    if compare_mode not in COMPARE_MODES:
+        raise ValueError(f"compare_mode must be one of {', '.join(COMPARE_MODES)}")
+    return compare_mode
 
 
 def sync_prefix(
@@ -21,89 +294,288 @@ def sync_prefix(
     prefix_src: str = "",
     prefix_dst: str = "",
     delete_extra: bool = False,
-    compare_mode: str = "key",  # future: etag/size
+    compare_mode: str = "key",  # key|name|size|etag|mtime
     dry_run: bool = False,
-    max_workers: int = 8,       # reserved for parallel copy
+    max_workers: int = 8,
     progress: bool = False,
+    list_shards: int = 1,
+    copier: Optional[MultipartCopier] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    adaptive: bool = False,
+    prefix_depth: int = 0,
+    prefix_rate: Optional[float] = None,
+    state: Optional[SyncState] = None,
+    full: bool = False,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
 ) -> Dict[str, List]:
     """
     Sync all objects from source_bucket/prefix_src to target_bucket/prefix_dst.
     Optionally delete extra objects in target that are not in source.
-    """
-    src_keys = list(list_objects(s3_client, source_bucket, prefix=prefix_src))
-    dst_keys = list(list_objects(s3_client, target_bucket, prefix=prefix_dst))
+    Keys present on both sides are re-copied when compare_mode says the
+    target is stale (see is_changed); no HEAD requests are made.
 
-    src_rel = relativize_keys(src_keys, prefix_src)
-    dst_rel = relativize_keys(dst_keys, prefix_dst)
+    Both listings are walked concurrently and merge-joined in key order;
+    copies run on max_workers threads (at most 2 * max_workers in flight)
+    and delete batches are issued as decisions stream out, so memory does not
+    grow with the number of keys under the prefixes.
+    list_shards > 1 lists both sides with that many parallel paginators.
+    Pass a MultipartCopier or a TransferConfig to tune part size/concurrency
+    for large objects.
+    adaptive=True treats max_workers as a ceiling for copies in flight, grown
+    while S3 is healthy and cut on 503 SlowDown (stats["concurrency"]).
+    prefix_depth/prefix_rate spread copies across destination prefixes and
+    cap copies per second per prefix (see move_by_mask).
 
-    to_copy_rel = sorted(src_rel - dst_rel)
-    to_delete_rel = sorted(dst_rel - src_rel) if delete_extra else []
+    With a SyncState, both listings are saved to it and the next run of the
+    same pair is incremental: the source is listed only after the last key
+    seen (StartAfter) and compared against the cached target instead of a
+    listing, so append-mostly prefixes finish in a few requests. Keys added
+    below that mark, changes to already-synced keys and deletions are only
+    picked up by a full run (full=True), which delete_extra also requires.
+    State is committed only when the run finishes; the mark does not advance
+    past a run with copy errors.
 
-    copied: List[Tuple[str, str]] = []
-    errors_copy: List[str] = []
-    deleted: List[str] = []
-    errors_delete: List[str] = []
+    With a sink (see sinks.py), copied/deleted keys and errors stream to it
+    as they happen and the result lists stay empty; stats["results"] has the
+    per-kind counts. The local sync functions take a sink the same way.
+    With a metrics.Metrics (all sync functions), stats["metrics"] has its
+    report for the run.
+    """
+    compare_mode = _check_compare_mode(compare_mode)
 
-    # Copy phase
-    copy_bar = tqdm(total=len(to_copy_rel), desc="Copy", unit="obj") if progress and to_copy_rel else None
+    src_side, dst_side = side_id(source_bucket, prefix_src), side_id(target_bucket, prefix_dst)
+    start_after = state.high_water(src_side, dst_side) if state is not None and not full else None
+    if start_after and delete_extra:
+        raise ValueError("delete_extra needs a full listing of the target; pass full=True")
 
-    for rel in to_copy_rel:
-        src_key = f"{prefix_src}{rel}" if prefix_src else rel
-        dst_key = f"{prefix_dst}{rel}" if prefix_dst else rel
-        if dry_run:
-            copied.append((src_key, dst_key))
-        else:
-            try:
-                copy_object(s3_client, source_bucket, src_key, target_bucket, dst_key)
-                copied.append((src_key, dst_key))
-            except Exception as e:
-                errors_copy.append(f"{src_key} -> {dst_key}: {e}")
-        if copy_bar:
-            copy_bar.update(1)
+    src_records: Iterable[ObjectRecord] = list_object_records(
+        s3_client, source_bucket, prefix=prefix_src, shards=list_shards, ordered=True,
+        start_after=start_after or "",
+    )
+    if start_after:
+        dst_records: Iterable[ObjectRecord] = state.records(
+            dst_side, after=f"{prefix_dst}{start_after[len(prefix_src):]}"
+        )
+    else:
+        dst_records = list_object_records(
+            s3_client, target_bucket, prefix=prefix_dst, shards=list_shards, ordered=True
+        )
+    last_src = [start_after]
+    if state is not None and not dry_run:
+        if not start_after:
+            state.reset(src_side)
+            state.reset(dst_side)
+            dst_records = state.tap(dst_side, dst_records)
+        src_records = _track_last(state.tap(src_side, src_records), last_src)
+    if prefixes_overlap(source_bucket, prefix_src, target_bucket, prefix_dst):
+        # Nested prefixes: new copies would show up in a listing still in
+        # progress, so snapshot both sides before acting.
+        src_records, dst_records = list(src_records), list(dst_records)
 
-    if copy_bar:
-        copy_bar.close()
+    def _copy(task: Tuple[ObjectRecord, str]) -> None:
+        rec, dst_key = task
+        copy_object(s3_client, source_bucket, rec.key, target_bucket, dst_key, size=rec.size, copier=job_copier)
+        if state is not None:
+            state.record_copies(dst_side, [(rec, dst_key)])
 
-    # Delete phase
-    delete_bar = tqdm(total=len(to_delete_rel), desc="Delete", unit="obj") if progress and to_delete_rel else None
+    out = sink
+    if state is not None and not dry_run:
+        def _to_state(kind: str, item: Any) -> None:
+            if kind == "deleted":
+                state.forget(dst_side, [item])
 
-    if to_delete_rel:
-        if dry_run:
-            deleted.extend(to_delete_rel)
-            if delete_bar:
-                delete_bar.update(len(to_delete_rel))
-        else:
-            for chunk in _chunked(to_delete_rel, 1000):
-                objects = [{"Key": f"{prefix_dst}{rel}" if prefix_dst else rel} for rel in chunk]
-                try:
-                    resp = s3_client.delete_objects(Bucket=target_bucket, Delete={"Objects": objects})
-                    deleted.extend([obj["Key"] for obj in resp.get("Deleted", [])])
-                    for err in resp.get("Errors", []):
-                        errors_delete.append(f"{err['Key']}: {err['Code']} {err['Message']}")
-                except ClientError as e:
-                    for obj in objects:
-                        errors_delete.append(f"{obj['Key']}: {e}")
-                if delete_bar:
-                    delete_bar.update(len(chunk))
-
-    if delete_bar:
-        delete_bar.close()
+        out = TeeSink(sink if sink is not None else ListSink(), CallbackSink(_to_state))
 
-    return {
-        "copied": copied,
-        "errors_copy": errors_copy,
-        "deleted": deleted,
-        "errors_delete": errors_delete,
-        "stats": {
-            "source_bucket": source_bucket,
-            "target_bucket": target_bucket,
-            "prefix_src": prefix_src,
-            "prefix_dst": prefix_dst,
-            "delete_extra": delete_extra,
-            "dry_run": dry_run,
-            "total_src": len(src_keys),
-            "total_dst": len(dst_keys),
-            "to_copy": len(to_copy_rel),
-            "to_delete": len(to_delete_rel),
-        },
+    scheduler = prefix_scheduler_for(prefix_depth, prefix_rate)
+    try:
+        with copier_scope(s3_client, copier, transfer_config) as job_copier, \
+                limiter_scope(s3_client, adaptive and not dry_run, max_workers) as limiter, \
+                metrics_scope(s3_client, metrics):
+            run = _run_sync(
+                prefetch(src_records), prefetch(dst_records), prefix_src, prefix_dst,
+                compare_mode, delete_extra, dry_run,
+                transfer=_copy,
+                delete_fn=lambda keys: delete_batch(s3_client, target_bucket, keys),
+                error_for=lambda rec, dk, e: ErrorRecord.from_exception(
+                    "copy", rec.key, e, bucket=source_bucket, target=dk, target_bucket=target_bucket
+                ),
+                delete_bucket=target_bucket,
+                max_workers=max_workers, progress=progress, limiter=limiter, scheduler=scheduler,
+                sink=out, metrics=metrics,
+            )
+        if state is not None and not dry_run:
+            state.commit(src_side, dst_side, None if run["results"].get("errors_copy") else last_src[0])
+    except BaseException:
+        if state is not None:
+            state.rollback()
+        raise
+
+    stats = {
+        "source_bucket": source_bucket,
+        "target_bucket": target_bucket,
+        "prefix_src": prefix_src,
+        "prefix_dst": prefix_dst,
+        "delete_extra": delete_extra,
+        "compare_mode": compare_mode,
+        "dry_run": dry_run,
     }
+    if state is not None:
+        stats["state"] = {"mode": "incremental" if start_after else "full", "start_after": start_after}
+    return _sync_result(run, stats, limiter, scheduler, sink, metrics)
+
+
+# ---------------- Local <-> S3 ----------------
+def _local_records(root: str | Path, skip_partial: bool = False) -> Iterator[ObjectRecord]:
+    """
+    Files under root as key-ordered records (key = "/"-separated relative
+    path). mtime is truncated to whole seconds, the precision of LastModified.
+    skip_partial hides our own in-progress download files (transfer.partial_path
+    names and their sidecars); other *.part files are synced as usual.
+    """
+    if not os.path.isdir(root):
+        return
+    for f in walk_sorted(root):
+        if skip_partial and is_partial_path(f.rel):
+            continue
+        yield ObjectRecord(f.rel, f.size, None, datetime.fromtimestamp(int(f.mtime), tz=timezone.utc))
+
+
+def sync_local_to_s3(
+    s3_client,
+    src_root: str | Path,
+    target_bucket: str,
+    prefix_dst: str = "",
+    delete_extra: bool = False,
+    compare_mode: str = "mtime",  # key|name|size|mtime (etag behaves as mtime)
+    dry_run: bool = False,
+    max_workers: int = 8,
+    progress: bool = False,
+    list_shards: int = 1,
+    uploader: Optional[MultipartUploader] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    adaptive: bool = False,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, List]:
+    """
+    Sync the local tree under src_root to target_bucket/prefix_dst, same result
+    shape as sync_prefix. The tree is walked in S3 key order (walk_sorted) and
+    merge-joined with the listing as both stream, so neither side is held in
+    memory. Changes are detected from size + mtime (from os.scandir) against
+    listing metadata: a file is re-uploaded when its size differs or it was
+    modified after the object was written. With delete_extra, objects with no
+    local file are deleted in 1000-key batches.
+    """
+    compare_mode = _check_compare_mode(compare_mode)
+    if not os.path.isdir(src_root):
+        raise NotADirectoryError(f"Not a directory: {src_root}")
+
+    dst_records = list_object_records(s3_client, target_bucket, prefix=prefix_dst, shards=list_shards, ordered=True)
+
+    def _upload(task: Tuple[ObjectRecord, str]) -> None:
+        rec, key = task
+        upload_file(s3_client, Path(src_root, rec.key), target_bucket, key, size=rec.size, uploader=job_uploader)
+
+    with uploader_scope(s3_client, uploader, transfer_config) as job_uploader, \
+            limiter_scope(s3_client, adaptive and not dry_run, max_workers) as limiter, \
+            metrics_scope(s3_client, metrics):
+        run = _run_sync(
+            prefetch(_local_records(src_root)), prefetch(dst_records), "", prefix_dst,
+            compare_mode, delete_extra, dry_run,
+            transfer=_upload,
+            delete_fn=lambda keys: delete_batch(s3_client, target_bucket, keys),
+            error_for=lambda rec, key, e: ErrorRecord.from_exception(
+                "upload", str(Path(src_root, rec.key)), e, target=key, target_bucket=target_bucket
+            ),
+            delete_bucket=target_bucket,
+            max_workers=max_workers, progress=progress, limiter=limiter, sink=sink, metrics=metrics,
+        )
+
+    return _sync_result(run, {
+        "src_root": str(src_root),
+        "target_bucket": target_bucket,
+        "prefix_dst": prefix_dst,
+        "delete_extra": delete_extra,
+        "compare_mode": compare_mode,
+        "dry_run": dry_run,
+    }, limiter, sink=sink, metrics=metrics)
+
+
+def sync_s3_to_local(
+    s3_client,
+    source_bucket: str,
+    prefix_src: str,
+    dst_root: str | Path,
+    delete_extra: bool = False,
+    compare_mode: str = "mtime",  # key|name|size|mtime (etag behaves as mtime)
+    dry_run: bool = False,
+    max_workers: int = 8,
+    progress: bool = False,
+    list_shards: int = 1,
+    downloader: Optional[RangedDownloader] = None,
+    transfer_config: Optional[TransferConfig] = None,
+    adaptive: bool = False,
+    sink: Optional[ResultSink] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, List]:
+    """
+    Sync source_bucket/prefix_src into the local directory dst_root, same
+    result shape as sync_prefix (keys on the local side are relative paths).
+    Streams like sync_local_to_s3. Downloaded files get the object's
+    LastModified as mtime, so the next run sees them as unchanged; an object
+    is fetched again when its size differs or it is newer than the file.
+    With delete_extra, local files with no object are removed.
+    Folder placeholder keys (ending in "/") are ignored.
+    """
+    compare_mode = _check_compare_mode(compare_mode)
+    dst_root = Path(dst_root)
+
+    src_records = (
+        rec for rec in list_object_records(s3_client, source_bucket, prefix=prefix_src, shards=list_shards, ordered=True)
+        if not rec.key.endswith("/")
+    )
+
+    def _download(task: Tuple[ObjectRecord, str]) -> None:
+        rec, rel = task
+        download_file(
+            s3_client, source_bucket, rec.key, dst_root / rel,
+            overwrite=True, preserve_mtime=True, last_modified=rec.last_modified,
+            downloader=job_downloader, size=rec.size, etag=rec.etag,
+        )
+
+    def _remove(rels: List[str]) -> Tuple[List[str], List[ErrorRecord]]:
+        removed: List[str] = []
+        errors: List[ErrorRecord] = []
+        for rel in rels:
+            try:
+                os.remove(dst_root / rel)
+                removed.append(rel)
+            except OSError as e:
+                errors.append(ErrorRecord.from_exception("delete_local", str(dst_root / rel), e))
+        return removed, errors
+
+    if not dry_run:
+        ensure_dir(dst_root)
+    with downloader_scope(s3_client, downloader, transfer_config) as job_downloader, \
+            limiter_scope(s3_client, adaptive and not dry_run, max_workers) as limiter, \
+            metrics_scope(s3_client, metrics):
+        run = _run_sync(
+            prefetch(src_records), prefetch(_local_records(dst_root, skip_partial=True)), prefix_src, "",
+            compare_mode, delete_extra, dry_run,
+            transfer=_download,
+            delete_fn=_remove,
+            error_for=lambda rec, rel, e: ErrorRecord.from_exception(
+                "download", rec.key, e, bucket=source_bucket, target=str(dst_root / rel)
+            ),
+            max_workers=max_workers, progress=progress, limiter=limiter, sink=sink, metrics=metrics,
+        )
+
+    return _sync_result(run, {
+        "source_bucket": source_bucket,
+        "prefix_src": prefix_src,
+        "dst_root": str(dst_root),
+        "delete_extra": delete_extra,
+        "compare_mode": compare_mode,
+        "dry_run": dry_run,
+    }, limiter, sink=sink, metrics=metrics)
@@ -0,0 +1,637 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+
+from boto3.s3.transfer import TransferConfig
+from s3transfer.utils import S3_RETRYABLE_DOWNLOAD_ERRORS
+
+MB = 1024 ** 2
+GB = 1024 ** 3
+
+# Largest source a single CopyObject request accepts.
+COPY_OBJECT_MAX_SIZE = 5 * GB
+MIN_PART_SIZE = 5 * MB
+MAX_PART_SIZE = 5 * GB
+MAX_PARTS = 10_000
+DEFAULT_COPY_PART_SIZE = 256 * MB
+
+# Source headers a multipart copy has to carry over itself (CopyObject
+# copies them implicitly, CreateMultipartUpload does not).
+_CARRIED_HEADERS = (
+    "ContentType",
+    "ContentEncoding",
+    "ContentDisposition",
+    "ContentLanguage",
+    "CacheControl",
+    "Metadata",
+)
+
+
+def multipart_copy_args(head: Dict[str, Any], extra_args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    CreateMultipartUpload arguments for a copy of the object `head` describes:
+    its content headers and metadata (CopyObject carries those over itself)
+    plus extra_args, less the CopySource*/*Directive ones only CopyObject takes.
+    """
+    args = {k: head[k] for k in _CARRIED_HEADERS if head.get(k) is not None}
+    args.update({
+        k: v for k, v in (extra_args or {}).items()
+        if not (k.startswith("CopySource") or k.endswith("Directive"))
+    })
+    return args
+
+
+def make_transfer_config(
+    multipart_threshold: int = 8 * MB,
+    multipart_chunksize: int = 8 * MB,
+    max_concurrency: int = 10,
+) -> TransferConfig:
+    """
+    One boto3 TransferConfig for a job: managed downloads use it as-is,
+    MultipartCopier.from_transfer_config takes only its part threads.
+    Sizes are in bytes; defaults match boto3's.
+    """
+    return TransferConfig(
+        multipart_threshold=int(multipart_threshold),
+        multipart_chunksize=int(multipart_chunksize),
+        max_concurrency=int(max_concurrency),
+    )
+
+
+def part_size_for(size: int, part_size: int) -> int:
+    """
+    Clamp part_size to S3 limits and grow it so size fits in MAX_PARTS parts.
+    """
+    ps = max(int(part_size), MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+    return min(ps, MAX_PART_SIZE)
+
+
+class MultipartCopier:
+    """
+    Server-side copy engine for one job.
+
+    Objects up to `threshold` bytes are copied with a single CopyObject;
+    larger ones are split into UploadPartCopy requests of `part_size` that run
+    on one part pool of `part_workers` threads shared by every object the job
+    copies. The pool is created on first use; close() (or `with`) shuts it down.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        part_size: int = DEFAULT_COPY_PART_SIZE,
+        part_workers: int = 16,
+        threshold: int = COPY_OBJECT_MAX_SIZE,
+    ):
+        self.s3_client = s3_client
+        self.part_size = int(part_size)
+        self.part_workers = max(int(part_workers), 1)
+        self.threshold = min(int(threshold), COPY_OBJECT_MAX_SIZE)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_transfer_config(
+        cls,
+        s3_client,
+        config: TransferConfig,
+        part_size: int = DEFAULT_COPY_PART_SIZE,
+        threshold: int = COPY_OBJECT_MAX_SIZE,
+    ) -> "MultipartCopier":
+        """
+        Part threads from a TransferConfig. Its multipart threshold and chunk
+        size are meant for transfers through the client and are not used:
+        a server-side copy stays one CopyObject up to 5 GB unless a
+        copy-specific part_size/threshold is passed.
+        """
+        return cls(s3_client, part_size=part_size, part_workers=config.max_concurrency, threshold=threshold)
+
+    def __enter__(self) -> "MultipartCopier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _part_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.part_workers, thread_name_prefix="s3part")
+            return self._pool
+
+    def copy(
+        self,
+        source_bucket: str,
+        source_key: str,
+        target_bucket: str,
+        target_key: str,
+        size: Optional[int] = None,
+        extra_args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        extra = dict(extra_args or {})
+        source = {"Bucket": source_bucket, "Key": source_key}
+        if size is not None and size <= self.threshold:
+            self.s3_client.copy_object(CopySource=source, Bucket=target_bucket, Key=target_key, **extra)
+            return
+
+        head = self.s3_client.head_object(Bucket=source_bucket, Key=source_key)
+        size = head["ContentLength"]
+        if size <= self.threshold:
+            self.s3_client.copy_object(CopySource=source, Bucket=target_bucket, Key=target_key, **extra)
+            return
+        self._copy_multipart(source, target_bucket, target_key, size, head, extra)
+
+    def _copy_multipart(
+        self,
+        source: Dict[str, str],
+        target_bucket: str,
+        target_key: str,
+        size: int,
+        head: Dict[str, Any],
+        extra: Dict[str, Any],
+    ) -> None:
+        create_args = multipart_copy_args(head, extra)
+        # Pin every part to the ETag we sized, so a concurrent overwrite of
+        # the source fails the copy instead of producing a mixed object.
+        etag = head.get("ETag")
+
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=target_bucket, Key=target_key, **create_args
+        )["UploadId"]
+        ps = part_size_for(size, self.part_size)
+
+        def _part(number: int, start: int, end: int) -> Dict[str, Any]:
+            kwargs: Dict[str, Any] = {
+                "Bucket": target_bucket,
+                "Key": target_key,
+                "UploadId": upload_id,
+                "PartNumber": number,
+                "CopySource": source,
+                "CopySourceRange": f"bytes={start}-{end}",
+            }
+            if etag:
+                kwargs["CopySourceIfMatch"] = etag
+            resp = self.s3_client.upload_part_copy(**kwargs)
+            return {"PartNumber": number, "ETag": resp["CopyPartResult"]["ETag"]}
+
+        futures = []
+        try:
+            pool = self._part_pool()
+            futures = [
+                pool.submit(_part, i + 1, start, min(start + ps, size) - 1)
+                for i, start in enumerate(range(0, size, ps))
+            ]
+            parts: List[Dict[str, Any]] = [f.result() for f in futures]
+            self.s3_client.complete_multipart_upload(
+                Bucket=target_bucket,
+                Key=target_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            wait(futures)
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=target_bucket, Key=target_key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+
+
+@contextmanager
+def copier_scope(
+    s3_client,
+    copier: Optional[MultipartCopier] = None,
+    transfer_config: Optional[TransferConfig] = None,
+) -> Iterator[MultipartCopier]:
+    """
+    Yield the caller's copier, or a job-local MultipartCopier (built from
+    transfer_config when given) that is closed on exit.
+    """
+    if copier is not None:
+        yield copier
+        return
+    own = MultipartCopier.from_transfer_config(s3_client, transfer_config) if transfer_config else MultipartCopier(s3_client)
+    with own:
+        yield own
+
+
+DEFAULT_DOWNLOAD_PART_SIZE = 8 * MB
+_READ_CHUNK = 1 * MB
+# GETs per range when its body read keeps failing mid-stream (boto3's managed download also makes 5).
+_READ_ATTEMPTS = 5
+
+
+def partial_path(dst: Path, key: str) -> Path:
+    """
+    In-progress file of key's download to dst: `<dst>.<key hash>.part`.
+    Distinct per key, so keys that land on the same dst (downloads without
+    the folder structure) never share one, and stable, so a rerun resumes it.
+    """
+    return dst.with_name(f"{dst.name}.{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.part")
+
+
+# partial_path() names and their PartialDownload sidecars (+ its temp file).
+_PARTIAL_NAME = re.compile(r"\.[0-9a-f]{8}\.part(\.json(\.tmp)?)?$")
+
+
+def is_partial_path(name: str) -> bool:
+    """True for a file name (or path) partial_path() or its resume sidecar generates."""
+    return _PARTIAL_NAME.search(name) is not None
+
+
+def _pwrite(fd: int, data: bytes, offset: int, lock: threading.Lock) -> None:
+    if hasattr(os, "pwrite"):
+        while data:
+            n = os.pwrite(fd, data, offset)
+            data, offset = data[n:], offset + n
+        return
+    with lock:  # no positional writes (Windows): serialize seek + write
+        os.lseek(fd, offset, os.SEEK_SET)
+        while data:
+            n = os.write(fd, data)
+            data = data[n:]
+
+
+class PartialDownload:
+    """
+    Resume state of a ranged download: the partial_path() file holds the
+    data and the same name + `.json` the source size/ETag, part size and finished parts
+    (as [first, last] index runs, so the sidecar stays small). State for a
+    different ETag, size or part size is discarded and the download restarts.
+    """
+
+    def __init__(self, tmp: Path, size: int, etag: Optional[str], part_size: int, done: Optional[set] = None):
+        self.tmp = tmp
+        self.path = tmp.with_name(tmp.name + ".json")
+        self.size = size
+        self.etag = etag
+        self.part_size = part_size
+        self.done: set = done or set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, tmp: Path, size: int, etag: Optional[str], part_size: int) -> "PartialDownload":
+        state = cls(tmp, size, etag, part_size)
+        if not etag:
+            return state  # nothing to prove the partial data is the same object
+        try:
+            with open(state.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            same = (
+                saved.get("etag") == etag
+                and saved.get("size") == size
+                and saved.get("part_size") == part_size
+                and tmp.stat().st_size == size
+            )
+        except (OSError, ValueError):
+            same = False
+        if same:
+            state.done = {i for a, b in saved.get("done", []) for i in range(a, b + 1)}
+        else:
+            tmp.unlink(missing_ok=True)
+            state.save()
+        return state
+
+    def parts(self) -> List[tuple]:
+        return [
+            (start, min(start + self.part_size, self.size) - 1)
+            for start in range(0, self.size, self.part_size)
+        ]
+
+    def mark_done(self, index: int) -> None:
+        with self._lock:
+            self.done.add(index)
+            self.save()
+
+    def save(self) -> None:
+        if not self.etag:
+            return
+        runs: List[List[int]] = []
+        for i in sorted(self.done):
+            if runs and runs[-1][1] == i - 1:
+                runs[-1][1] = i
+            else:
+                runs.append([i, i])
+        tmp_state = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_state, "w", encoding="utf-8") as f:
+            json.dump({"etag": self.etag, "size": self.size, "part_size": self.part_size, "done": runs}, f)
+        os.replace(tmp_state, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class RangedDownloader:
+    """
+    Download engine for one job.
+
+    Objects above `threshold` bytes are fetched as concurrent Range GETs of
+    `part_size` on one range pool of `part_workers` threads shared by every
+    object in the job, and written with positional writes into a file
+    preallocated to the object size. Smaller objects are one streamed GET.
+    Data lands in a `.part` file next to dst (partial_path) and is renamed
+    over dst only when complete; ranged downloads keep a sidecar of finished
+    parts, so a rerun after an interruption fetches only the missing ranges.
+    A body read that fails mid-stream is resumed with a new GET (_fetch).
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        part_size: int = DEFAULT_DOWNLOAD_PART_SIZE,
+        part_workers: int = 10,
+        threshold: int = DEFAULT_DOWNLOAD_PART_SIZE,
+    ):
+        self.s3_client = s3_client
+        self.part_size = max(int(part_size), MIN_PART_SIZE)
+        self.part_workers = max(int(part_workers), 1)
+        self.threshold = int(threshold)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_transfer_config(cls, s3_client, config: TransferConfig) -> "RangedDownloader":
+        return cls(
+            s3_client,
+            part_size=config.multipart_chunksize,
+            part_workers=config.max_concurrency,
+            threshold=config.multipart_threshold,
+        )
+
+    def __enter__(self) -> "RangedDownloader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _range_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.part_workers, thread_name_prefix="s3range")
+            return self._pool
+
+    def download(
+        self,
+        bucket: str,
+        key: str,
+        dst: Path,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+    ) -> Path:
+        if size is None:
+            head = self.s3_client.head_object(Bucket=bucket, Key=key)
+            size = head["ContentLength"]
+            etag = (head.get("ETag") or "").strip('"') or None
+        tmp = partial_path(dst, key)
+        if size <= self.threshold:
+            self._download_single(bucket, key, tmp, size, etag)
+        else:
+            self._download_ranges(bucket, key, tmp, size, etag)
+        os.replace(tmp, dst)
+        return dst
+
+    def _download_single(self, bucket: str, key: str, tmp: Path, size: int, etag: Optional[str]) -> None:
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._fetch(bucket, key, fd, 0, None, etag, threading.Lock())
+        except BaseException:
+            os.close(fd)
+            tmp.unlink(missing_ok=True)
+            raise
+        os.close(fd)
+
+    def _download_ranges(self, bucket: str, key: str, tmp: Path, size: int, etag: Optional[str]) -> None:
+        """
+        Fetch missing parts into tmp, recording finished parts in a sidecar
+        (see PartialDownload) so an interrupted download resumes where it left off.
+        """
+        state = PartialDownload.load(tmp, size, etag, self.part_size)
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.ftruncate(fd, size)
+            write_lock = threading.Lock()
+            pool = self._range_pool()
+            futures = {
+                pool.submit(self._fetch, bucket, key, fd, start, end, etag, write_lock): i
+                for i, (start, end) in enumerate(state.parts())
+                if i not in state.done
+            }
+            try:
+                for f in as_completed(futures):
+                    f.result()
+                    state.mark_done(futures[f])
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                wait(futures)
+                for f, i in futures.items():
+                    if f.done() and not f.cancelled() and f.exception() is None:
+                        state.mark_done(i)
+                raise
+        finally:
+            os.close(fd)
+        state.clear()
+
+    def _fetch(
+        self,
+        bucket: str,
+        key: str,
+        fd: int,
+        start: int,
+        end: Optional[int],
+        etag: Optional[str],
+        write_lock: threading.Lock,
+    ) -> None:
+        """
+        Write bytes start..end (to the end of the object with end=None) into
+        fd at their offsets. When the body read fails mid-stream (botocore
+        only retries until the response headers arrive), the rest is fetched
+        with a new ranged GET, up to _READ_ATTEMPTS GETs in all; without an
+        ETag to pin the version it starts again from `start`.
+        """
+        offset = start
+        for attempt in range(_READ_ATTEMPTS):
+            kwargs: Dict[str, Any] = {"Bucket": bucket, "Key": key}
+            if end is not None or offset:
+                kwargs["Range"] = f"bytes={offset}-{'' if end is None else end}"
+            if etag:
+                kwargs["IfMatch"] = f'"{etag}"'  # fail rather than mix two versions
+            body = self.s3_client.get_object(**kwargs)["Body"]
+            try:
+                for chunk in iter(lambda: body.read(_READ_CHUNK), b""):
+                    _pwrite(fd, chunk, offset, write_lock)
+                    offset += len(chunk)
+                return
+            except S3_RETRYABLE_DOWNLOAD_ERRORS:
+                if attempt == _READ_ATTEMPTS - 1:
+                    raise
+                if not etag:
+                    offset = start
+            finally:
+                body.close()
+
+
+@contextmanager
+def downloader_scope(
+    s3_client,
+    downloader: Optional[RangedDownloader] = None,
+    transfer_config: Optional[TransferConfig] = None,
+) -> Iterator[RangedDownloader]:
+    """
+    Yield the caller's downloader, or a job-local RangedDownloader (built from
+    transfer_config when given) that is closed on exit.
+    """
+    if downloader is not None:
+        yield downloader
+        return
+    own = RangedDownloader.from_transfer_config(s3_client, transfer_config) if transfer_config else RangedDownloader(s3_client)
+    with own:
+        yield own
+
+
+DEFAULT_UPLOAD_PART_SIZE = 8 * MB
+
+
+class MultipartUploader:
+    """
+    Upload engine with one part pool shared by all large files of a job.
+
+    Files up to `threshold` are a single PutObject on the caller's thread;
+    larger ones become UploadPart requests on a pool of `part_workers`
+    threads, each reading only its own byte range, so memory stays at about
+    part_workers * part_size however many files are in flight.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        part_size: int = DEFAULT_UPLOAD_PART_SIZE,
+        part_workers: int = 10,
+        threshold: int = DEFAULT_UPLOAD_PART_SIZE,
+    ):
+        self.s3_client = s3_client
+        self.part_size = max(int(part_size), MIN_PART_SIZE)
+        self.part_workers = max(int(part_workers), 1)
+        self.threshold = int(threshold)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_transfer_config(cls, s3_client, config: TransferConfig) -> "MultipartUploader":
+        return cls(
+            s3_client,
+            part_size=config.multipart_chunksize,
+            part_workers=config.max_concurrency,
+            threshold=config.multipart_threshold,
+        )
+
+    def __enter__(self) -> "MultipartUploader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _part_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.part_workers, thread_name_prefix="s3upload")
+            return self._pool
+
+    def upload(
+        self,
+        path: str | Path,
+        bucket: str,
+        key: str,
+        size: Optional[int] = None,
+        extra_args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if size is None:
+            size = os.path.getsize(path)
+        if size <= self.threshold:
+            with open(path, "rb") as f:
+                self.s3_client.put_object(Bucket=bucket, Key=key, Body=f, **(extra_args or {}))
+            return
+        self._upload_multipart(path, bucket, key, size, extra_args)
+
+    def _upload_multipart(
+        self,
+        path: str | Path,
+        bucket: str,
+        key: str,
+        size: int,
+        extra_args: Optional[Dict[str, Any]],
+    ) -> None:
+        ps = part_size_for(size, self.part_size)
+        upload_id = self.s3_client.create_multipart_upload(Bucket=bucket, Key=key, **(extra_args or {}))["UploadId"]
+
+        def _part(number: int, start: int) -> Dict[str, Any]:
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(min(ps, size - start))
+            resp = self.s3_client.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data
+            )
+            return {"PartNumber": number, "ETag": resp["ETag"]}
+
+        pool = self._part_pool()
+        futures = [pool.submit(_part, i + 1, start) for i, start in enumerate(range(0, size, ps))]
+        try:
+            parts = [f.result() for f in futures]
+            self.s3_client.complete_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            wait(futures)
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+
+
+@contextmanager
+def uploader_scope(
+    s3_client,
+    uploader: Optional[MultipartUploader] = None,
+    transfer_config: Optional[TransferConfig] = None,
+) -> Iterator[MultipartUploader]:
+    """
+    Yield the caller's uploader, or a job-local MultipartUploader (built from
+    transfer_config when given) that is closed on exit.
+    """
+    if uploader is not None:
+        yield uploader
+        return
+    own = MultipartUploader.from_transfer_config(s3_client, transfer_config) if transfer_config else MultipartUploader(s3_client)
+    with own:
+        yield own
@@ -0,0 +1,268 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+import mimetypes
+import os
+
+from tqdm import tqdm
+
+from .concurrency import bounded_imap, limiter_scope
+from .core import ObjectRecord, list_object_records
+from .errors import ErrorRecord
+from .metrics import Metrics, metrics_scope
+from .transfer import MultipartUploader, TransferConfig, uploader_scope
+from .utils import compile_patterns, prefetch
+
+UploadSkipMode = Literal["none", "size", "mtime"]
+
+
+class LocalFile:
+    """
+    One file found under a local root: absolute path, "/"-separated path
+    relative to the root, size and mtime (epoch seconds) from the scan.
+    """
+
+    __slots__ = ("path", "rel", "size", "mtime")
+
+    def __init__(self, path: str, rel: str, size: int, mtime: float):
+        self.path = path
+        self.rel = rel
+        self.size = size
+        self.mtime = mtime
+
+    def __repr__(self) -> str:
+        return f"LocalFile({self.rel!r}, size={self.size})"
+
+
+def scan_files(
+    root: str | Path,
+    workers: int = 8,
+    matcher: Optional[Callable[[str], bool]] = None,
+) -> Iterator[LocalFile]:
+    """
+    Walk a local tree with os.scandir, scanning up to `workers` directories
+    at once, and yield files (filtered by matcher(rel)) as directories finish,
+    in no particular order. Symlinked directories are not followed.
+    """
+    root = str(root)
+
+    def _scan(d: str) -> Tuple[List[LocalFile], List[str]]:
+        files: List[LocalFile] = []
+        dirs: List[str] = []
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.is_file():
+                    rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    if matcher is not None and not matcher(rel):
+                        continue
+                    st = entry.stat()
+                    files.append(LocalFile(entry.path, rel, st.st_size, st.st_mtime))
+        return files, dirs
+
+    with ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix="s3scan") as ex:
+        pending = {ex.submit(_scan, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                files, dirs = f.result()
+                for d in dirs:
+                    pending.add(ex.submit(_scan, d))
+                yield from files
+
+
+def walk_sorted(root: str | Path, matcher: Optional[Callable[[str], bool]] = None) -> Iterator[LocalFile]:
+    """
+    Depth-first walk yielding files in the order S3 lists their relative keys,
+    so a local tree can be merge-joined with a listing: each directory's
+    entries are sorted by name with subdirectories sorted as "name/".
+    Holds one directory listing per level, not the whole tree.
+    """
+    def _walk(d: str, rel_dir: str) -> Iterator[LocalFile]:
+        entries = []
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    entries.append((entry.name + "/", entry))
+                elif entry.is_file():
+                    entries.append((entry.name, entry))
+        entries.sort(key=lambda x: x[0])
+        for name, entry in entries:
+            rel = rel_dir + name
+            if name.endswith("/"):
+                yield from _walk(entry.path, rel)
+            elif matcher is None or matcher(rel):
+                st = entry.stat()
+                yield LocalFile(entry.path, rel, st.st_size, st.st_mtime)
+
+    yield from _walk(str(root), "")
+
+
+def upload_file(
+    s3_client,
+    path: str | Path,
+    bucket: str,
+    key: str,
+    size: Optional[int] = None,
+    extra_args: Optional[Dict] = None,
+    uploader: Optional[MultipartUploader] = None,
+) -> None:
+    """
+    Upload one file, guessing Content-Type from its name unless extra_args
+    sets it. Large files use the uploader's shared part pool (a job-local
+    MultipartUploader when none is given).
+    """
+    args = dict(extra_args or {})
+    if "ContentType" not in args:
+        ctype = mimetypes.guess_type(str(path))[0]
+        if ctype:
+            args["ContentType"] = ctype
+    with uploader_scope(s3_client, uploader) as job_uploader:
+        job_uploader.upload(path, bucket, key, size=size, extra_args=args)
+
+
+def _unchanged(f: LocalFile, remote: Optional[ObjectRecord], skip_if: UploadSkipMode) -> bool:
+    """size: same size. mtime: same size and the object was written after the file was last modified."""
+    if skip_if == "none" or remote is None:
+        return False
+    if remote.size != f.size:
+        return False
+    if skip_if == "size":
+        return True
+    # LastModified has whole-second precision
+    return remote.last_modified is not None and remote.last_modified.timestamp() >= int(f.mtime)
+
+
+def _with_remote(
+    files: Iterable[LocalFile], records: Iterable[ObjectRecord], prefix: str
+) -> Iterator[Tuple[LocalFile, Optional[ObjectRecord]]]:
+    """
+    Pair key-ordered files (walk_sorted) with the record of their key
+    (prefix + rel) from a key-ordered listing, or None; both stream.
+    """
+    it = iter(records)
+    rec = next(it, None)
+    for f in files:
+        key = f"{prefix}{f.rel}"
+        while rec is not None and rec.key < key:
+            rec = next(it, None)
+        yield f, (rec if rec is not None and rec.key == key else None)
+
+
+def upload_by_mask(
+    s3_client,
+    src_root: str | Path,
+    bucket: str,
+    prefix: str = "",
+    suffix: str = "",
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    skip_if: UploadSkipMode = "none",
+    max_workers: int = 8,
+    scan_workers: int = 8,
+    progress: bool = False,
+    dry_run: bool = False,
+    extra_args: Optional[Dict] = None,
+    list_shards: int = 1,
+    transfer_config: Optional[TransferConfig] = None,
+    uploader: Optional[MultipartUploader] = None,
+    adaptive: bool = False,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, List]:
+    """
+    Upload files under src_root (matching suffix and include/exclude globs on
+    their relative path) to bucket/prefix, keeping the relative layout.
+
+    The tree is scanned in parallel and files stream into a pool of
+    max_workers uploads (at most 2 * max_workers in flight); files above the
+    multipart threshold are split into parts on one shared part pool (see
+    transfer.MultipartUploader). skip_if="size"/"mtime" compares against one
+    listing of bucket/prefix, so unchanged files cost no requests: the tree
+    is then walked in key order (walk_sorted, one directory at a time) and
+    merge-joined with the listing as both stream, so neither is held in memory.
+    Content-Type is guessed from the file name unless extra_args sets it.
+    With a metrics.Metrics, its report for the upload is in stats["metrics"].
+    """
+    matcher = compile_patterns(includes=include, excludes=exclude) if (include or exclude) else None
+    src_root = Path(src_root)
+
+    counts = {"total": 0, "total_bytes": 0, "skipped": 0}
+
+    def _files() -> Iterator[Tuple[LocalFile, Optional[ObjectRecord]]]:
+        if skip_if == "none":
+            for f in scan_files(src_root, workers=scan_workers, matcher=matcher):
+                yield f, None
+            return
+        remote = prefetch(list_object_records(s3_client, bucket, prefix=prefix, shards=list_shards, ordered=True))
+        try:
+            yield from _with_remote(walk_sorted(src_root, matcher=matcher), remote, prefix)
+        finally:
+            remote.close()
+
+    def _pairs() -> Iterator[Tuple[LocalFile, str]]:
+        for f, rec in _files():
+            if suffix and not f.rel.endswith(suffix):
+                continue
+            key = f"{prefix}{f.rel}"
+            counts["total"] += 1
+            if _unchanged(f, rec, skip_if):
+                counts["skipped"] += 1
+                continue
+            counts["total_bytes"] += f.size
+            yield f, key
+
+    stats = {
+        "src_root": str(src_root),
+        "bucket": bucket,
+        "prefix": prefix,
+        "suffix": suffix,
+        "skip_if": skip_if,
+        "dry_run": dry_run,
+    }
+
+    if dry_run:
+        planned = sorted((f.path, key) for f, key in _pairs())
+        return {
+            "uploaded": [],
+            "errors": [],
+            "stats": {**stats, **counts, "planned": planned},
+        }
+
+    uploaded: List[Tuple[str, str]] = []
+    errors: List[ErrorRecord] = []
+    bar = tqdm(desc="Upload", unit="obj") if progress else None
+
+    def _do(pair: Tuple[LocalFile, str]) -> None:
+        f, key = pair
+        upload_file(s3_client, f.path, bucket, key, size=f.size, extra_args=extra_args, uploader=job_uploader)
+
+    with uploader_scope(s3_client, uploader, transfer_config) as job_uploader, \
+            limiter_scope(s3_client, adaptive, max_workers) as limiter, \
+            metrics_scope(s3_client, metrics):
+        for (f, key), _, err in bounded_imap(_do, _pairs(), max_workers=max_workers, limiter=limiter):
+            if err is None:
+                uploaded.append((f.path, key))
+                if metrics is not None:
+                    metrics.count(1, f.size)
+            else:
+                errors.append(ErrorRecord.from_exception("upload", f.path, err, target=key, target_bucket=bucket))
+            if bar is not None:
+                bar.update(1)
+    if bar is not None:
+        bar.close()
+
+    uploaded.sort(key=lambda x: x[1])
+    return {
+        "uploaded": uploaded,
+        "errors": errors,
+        "stats": {
+            **stats,
+            **counts,
+            "uploaded": len(uploaded),
+            "errors_count": len(errors),
+            **({"concurrency": limiter.stats()} if limiter else {}),
+            **({"metrics": metrics.report()} if metrics is not None else {}),
+        },
+    }
@@ -5,6 +5,9 @@ import re
 import fnmatch
 import yaml
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 
@@ -46,12 +49,23 @@ def relativize_keys(keys: Iterable[str], prefix: str | None) -> set[str]:
     return rel
 
 
+def prefixes_overlap(bucket_a: str, prefix_a: str, bucket_b: str, prefix_b: str) -> bool:
+    """
+    True when writes under one location can show up in a listing of the other,
+    i.e. same bucket and one prefix contains the other.
+    """
+    return bucket_a == bucket_b and (prefix_a.startswith(prefix_b) or prefix_b.startswith(prefix_a))
+
+
+def prefix_group(key: str, depth: int = 1) -> str:
+    """First `depth` "/"-separated segments of key."""
+    return "/".join(key.split("/")[:depth])
+
+
 def group_keys_by_prefix(keys: Iterable[str], depth: int = 1) -> Dict[str, List[str]]:
     groups: Dict[str, List[str]] = {}
     for key in keys:
-        parts = key.split("/")
-        group = "/".join(parts[:depth]) if parts else ""
-        groups.setdefault(group, []).append(key)
+        groups.setdefault(prefix_group(key, depth), []).append(key)
     return groups
 
 
@@ -105,3 +119,98 @@ def get_s3_head(s3_client, bucket: str, key: str) -> Dict[str, Any]:
     size = h.get("ContentLength")
     lm = h.get("LastModified")  # datetime with tz
     return {"ETag": etag, "ContentLength": size, "LastModified": lm}
+
+
+_END = object()
+
+
+def prefetch(items: Iterable[Any], size: int = 1000) -> Iterator[Any]:
+    """
+    Iterate `items` in a background thread, keeping up to `size` of them
+    buffered, so a slow producer (e.g. a paginator) overlaps with the consumer.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(int(size), 1))
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run() -> None:
+        try:
+            for item in items:
+                if not _put(item):
+                    return
+            _put(_END)
+        except BaseException as e:  # re-raised in the consumer
+            _put(e)
+
+    t = threading.Thread(target=_run, name="s3prefetch", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        t.join()
+
+
+def prefetch_many(iterables: Iterable[Iterable[Any]], workers: int = 8, size: int = 1000) -> Iterator[Any]:
+    """
+    Like prefetch, for many sources at once: iterate up to `workers` of them
+    concurrently on a thread pool and yield their items as they arrive, in no
+    particular order across sources. An exception in any source is re-raised
+    in the consumer.
+    """
+    sources = list(iterables)
+    if not sources:
+        return
+    q: "queue.Queue" = queue.Queue(maxsize=max(int(size), 1))
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(items: Iterable[Any]) -> None:
+        if stop.is_set():
+            return
+        try:
+            for item in items:
+                if not _put(item):
+                    return
+            _put(_END)
+        except BaseException as e:  # re-raised in the consumer
+            _put(e)
+
+    ex = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix="s3prefetch")
+    for items in sources:
+        ex.submit(_run, items)
+    remaining = len(sources)
+    try:
+        while remaining:
+            item = q.get()
+            if item is _END:
+                remaining -= 1
+                continue
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        ex.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.fake_s3 import FakeS3
+
+
+@pytest.fixture
+def fake():
+    # small pages, so listings take several requests
+    return FakeS3(page_size=100)
+
+
+@pytest.fixture
+def s3(fake):
+    return fake.client()
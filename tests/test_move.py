@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from s3_utils.move import move_by_mask
+from s3_utils.state import MoveJournal, move_job_id
+
+
+def _keys(fake, bucket, prefix):
+    return [k for k in fake.bucket(bucket).iter_from(prefix) if k.startswith(prefix)]
+
+
+def test_move_resumes_from_journal(fake, s3, tmp_path):
+    fake.seed("src", 120, prefix="data/")
+    fake.bucket("dst")
+    job = move_job_id("src", "data/", "", "dst", "moved/")
+
+    # First run: every copy succeeds but no source can be deleted, as if the
+    # move had died between its copies and their deletes.
+    delete_objects = fake._DeleteObjects
+    fake._DeleteObjects = lambda request, *args: fake._error(request, 403, "AccessDenied", "Access Denied")
+    with MoveJournal(tmp_path / "move.db") as journal:
+        first = move_by_mask(s3, "src", "dst", prefix="data/", prefix_dst="moved/", journal=journal)
+        pending = journal.pending(job)
+
+    assert len(first["moved"]) == 120
+    assert len(first["errors_delete"]) == 120
+    keys = _keys(fake, "src", "data/")
+    assert sorted(pending) == keys
+    assert pending[keys[0]][0] == "moved/" + keys[0][len("data/"):]
+
+    # One source object is overwritten before the rerun: its journal entry no
+    # longer matches and it is copied again; the rest are only deleted.
+    fake.bucket("src").put(keys[7], (3, '"changed"', datetime.now(timezone.utc)))
+    fake._DeleteObjects = delete_objects
+    fake.reset_counts()
+    with MoveJournal(tmp_path / "move.db") as journal:
+        second = move_by_mask(s3, "src", "dst", prefix="data/", prefix_dst="moved/", journal=journal)
+        assert journal.pending(job) == {}
+
+    assert second["stats"]["resumed"] == 119
+    assert fake.requests["CopyObject"] == 1
+    assert len(second["moved"]) == 120
+    assert second["errors_copy"] == [] and second["errors_delete"] == []
+    assert _keys(fake, "src", "data/") == []
+    assert len(_keys(fake, "dst", "moved/")) == 120
@@ -0,0 +1,41 @@
+import threading
+
+from s3_utils.state import SyncState, side_id
+from s3_utils.sync import sync_prefix
+
+
+def test_sync_caches_copies_before_source_rows_are_saved(fake, s3, tmp_path):
+    # 250 keys stay in one unsaved tap() batch until the source listing ends;
+    # hold its last page until the first copies have been recorded.
+    fake.seed("src", 250, prefix="data/")
+    fake.bucket("dst")
+    recorded = threading.Event()
+    list_page = fake._ListObjectsV2
+
+    def _list(request, b, bucket, *args):
+        if bucket == "src" and "continuation-token=data%2F199" in request.url:
+            recorded.wait(5)
+        return list_page(request, b, bucket, *args)
+
+    fake._ListObjectsV2 = _list
+    with SyncState(tmp_path / "state.db") as state:
+        record_copies = state.record_copies
+
+        def _record(*args):
+            record_copies(*args)
+            recorded.set()
+
+        state.record_copies = _record
+        first = sync_prefix(s3, "src", "dst", "data/", "data/", state=state, max_workers=16)
+        cached = list(state.records(side_id("dst", "data/")))
+        src = {r.key: r for r in state.records(side_id("src", "data/"))}
+
+        assert len(first["copied"]) == 250
+        assert [r.key for r in cached] == sorted(src)
+        assert all((r.size, r.etag) == (src[r.key].size, src[r.key].etag) for r in cached)
+
+        fake.bucket("src").put("data/new", (10, '"new"', cached[0].last_modified))
+        second = sync_prefix(s3, "src", "dst", "data/", "data/", state=state, compare_mode="etag")
+
+    assert second["stats"]["state"]["mode"] == "incremental"
+    assert second["copied"] == [("data/new", "data/new")]